@@ -0,0 +1,374 @@
+"""OpenAI-compatible stand-in for a vLLM TranslateGemma server, CPU only.
+
+Serves what the translategemma provider and the benchmarks use:
+
+- POST /v1/chat/completions (optionally streamed over SSE, with
+  `stream_options.include_usage`; assistant prefill with
+  `continue_final_message`)
+- POST /v1/completions (multi-prompt batches)
+- POST /tokenize (chat `messages`, Gemma turn template), POST /detokenize:
+  tokens are code points
+- GET /health, GET /metrics (`vllm:num_requests_waiting`/`_running`)
+
+Latency is simulated by a continuous-batching engine fitted on
+`results/latency_results.csv`: a request waits in queue while
+`max_num_seqs` sequences are running, pays `base_ms` (prefill + request
+overhead), then gets one token per engine step; a step takes `decode_ms`
+with one running sequence and `batch_overhead` more per extra sequence.
+Defaults: 70 ms + 31 ms/token at c=1, ~1.7x slower decode at c=16.
+
+Translations are pseudo-translated (each word reversed, same length as the
+source, so token counts stay realistic) or echoed. Token counts use the
+translator's chars-per-token estimate. A client disconnecting aborts its
+sequences, as vLLM does.
+
+Usage:
+  .venv/bin/python -m benchmark.fake_vllm --port 8001 [--mode echo] [--max-num-seqs 16]
+  TRANSLATION_PROVIDER=translategemma TRANSLATEGEMMA_ENDPOINT=http://127.0.0.1:8001 ...
+"""
+
+import argparse
+import asyncio
+import re
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from translator import codec  # noqa: E402
+from translator.budget import CHARS_PER_TOKEN, est_tokens  # noqa: E402
+
+_TEXT_RE = re.compile(r"<<<text>>>(.*?)(?:<end_of_turn>|$)", re.DOTALL)
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found"}
+_CHAT_TURN = "<bos><start_of_turn>user\n{content}<end_of_turn>\n<start_of_turn>model\n"
+
+
+@dataclass
+class LatencyModel:
+    base_ms: float = 70.0
+    decode_ms: float = 31.0
+    batch_overhead: float = 0.045  # step slowdown per extra running sequence
+    max_num_seqs: int = 16
+
+
+@dataclass
+class _Sequence:
+    pieces: list[str]
+    out: asyncio.Queue = field(default_factory=asyncio.Queue)
+    ready_at: float = 0.0  # end of prefill
+    emitted: int = 0
+    aborted: bool = False
+
+
+class Engine:
+    """Continuous batching: every step, each running sequence emits one token."""
+
+    def __init__(self, model: LatencyModel) -> None:
+        self.model = model
+        self._waiting: deque[_Sequence] = deque()
+        self._running: list[_Sequence] = []
+        self._task: asyncio.Task | None = None
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    async def generate(self, pieces: list[str]) -> AsyncIterator[str]:
+        seq = _Sequence(pieces)
+        self._waiting.append(seq)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            while (piece := await seq.out.get()) is not None:
+                yield piece
+        finally:
+            seq.aborted = True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._waiting or self._running:
+            while self._waiting and len(self._running) < self.model.max_num_seqs:
+                seq = self._waiting.popleft()
+                if not seq.aborted:
+                    seq.ready_at = loop.time() + self.model.base_ms / 1000
+                    self._running.append(seq)
+            step = self.model.decode_ms / 1000 * (
+                1 + self.model.batch_overhead * max(0, len(self._running) - 1)
+            )
+            await asyncio.sleep(step)
+            now = loop.time()
+            for seq in list(self._running):
+                if seq.aborted:
+                    self._running.remove(seq)
+                elif now >= seq.ready_at:
+                    if seq.emitted < len(seq.pieces):
+                        seq.out.put_nowait(seq.pieces[seq.emitted])
+                        seq.emitted += 1
+                    if seq.emitted >= len(seq.pieces):
+                        seq.out.put_nowait(None)
+                        self._running.remove(seq)
+
+
+def _source_text(prompt: str) -> str:
+    m = _TEXT_RE.search(prompt)
+    return (m.group(1) if m else prompt).strip()
+
+
+class FakeVllmServer:
+    """Minimal HTTP/1.1 server (keep-alive, chunked SSE) around an Engine.
+
+    Args:
+        model: Latency model.
+        mode: "pseudo" (words reversed) or "echo" (source text).
+        model_name: Reported model name.
+    """
+
+    def __init__(
+        self,
+        model: LatencyModel | None = None,
+        mode: str = "pseudo",
+        model_name: str = "fake-translategemma",
+    ) -> None:
+        self.engine = Engine(model or LatencyModel())
+        self.mode = mode
+        self.model_name = model_name
+        self.requests = 0
+        self._server: asyncio.Server | None = None
+        self.url = ""
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._server = await asyncio.start_server(self._serve, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def _translate(self, text: str) -> str:
+        if self.mode == "echo":
+            return text
+        return " ".join(word[::-1] for word in text.split())
+
+    def _pieces(self, prompt: str, max_tokens: int, prefix: str = "") -> tuple[list[str], str]:
+        out = self._translate(_source_text(prompt))
+        if prefix:
+            # Assistant prefill: only the words after the prefix are decoded
+            words = out.split()[len(prefix.split()):]
+            out = " " + " ".join(words) if words else ""
+        step = int(CHARS_PER_TOKEN)
+        pieces = [out[i:i + step] for i in range(0, len(out), step)] or [""]
+        if len(pieces) > max_tokens:
+            return pieces[:max_tokens], "length"
+        return pieces, "stop"
+
+    # ------------------------------------------------------------------ http
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, path, _ = line.decode("latin-1").split(" ", 2)
+                headers: dict[str, str] = {}
+                while (header := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0")))
+                # A client that hangs up mid-generation aborts its sequences
+                handler = asyncio.ensure_future(self._route(method, path, body, writer))
+                hangup = asyncio.ensure_future(reader.read(1))
+                await asyncio.wait({handler, hangup}, return_when=asyncio.FIRST_COMPLETED)
+                if not handler.done():
+                    handler.cancel()
+                    await asyncio.gather(handler, return_exceptions=True)
+                    break
+                hangup.cancel()
+                await asyncio.gather(hangup, return_exceptions=True)
+                if hangup.done() and not hangup.cancelled():
+                    break  # EOF (or a pipelined request, unsupported)
+                # Final bytes only now: the client sends its next request after them
+                writer.write(handler.result())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _response(status: int, body: bytes, content_type: str = "application/json") -> bytes:
+        return (
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+
+    async def _route(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter) -> bytes:
+        """Handle one request; returns the (remaining) bytes of its response."""
+        if method == "GET" and path == "/health":
+            return self._response(200, b"")
+        if method == "GET" and path == "/metrics":
+            metrics = (
+                f'vllm:num_requests_waiting{{model_name="{self.model_name}"}} {self.engine.waiting}\n'
+                f'vllm:num_requests_running{{model_name="{self.model_name}"}} {self.engine.running}\n'
+            )
+            return self._response(200, metrics.encode(), "text/plain")
+        if method != "POST" or path not in (
+            "/v1/chat/completions", "/v1/completions", "/tokenize", "/detokenize",
+        ):
+            return self._response(404, b'{"error": "not found"}')
+        try:
+            request = codec.loads(body)
+        except codec.DecodeError:
+            return self._response(400, b'{"error": "invalid JSON"}')
+        if path == "/tokenize":
+            return self._tokenize(request)
+        if path == "/detokenize":
+            prompt = "".join(chr(t) for t in request["tokens"])
+            return self._response(200, codec.dumps({"prompt": prompt}))
+        self.requests += 1
+        if path == "/v1/completions":
+            return await self._completions(request)
+        if request.get("stream"):
+            return await self._chat_stream(request, writer)
+        return await self._chat(request)
+
+    def _tokenize(self, request: dict) -> bytes:
+        if "messages" in request:
+            prompt = _CHAT_TURN.format(content=request["messages"][-1]["content"])
+        else:
+            prompt = request["prompt"]
+        tokens = [ord(c) for c in prompt]
+        return self._response(200, codec.dumps({"tokens": tokens, "count": len(tokens)}))
+
+    def _envelope(self, kind: str) -> dict:
+        return {
+            "id": f"cmpl-{self.requests}",
+            "object": kind,
+            "created": int(time.time()),
+            "model": self.model_name,
+        }
+
+    @staticmethod
+    def _usage(prompt: str | list[str], completion_tokens: int) -> dict:
+        prompts = prompt if isinstance(prompt, list) else [prompt]
+        prompt_tokens = sum(est_tokens(len(p)) for p in prompts)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    @staticmethod
+    def _chat_prompt(request: dict) -> tuple[str, str]:
+        """User prompt, and the assistant prefill (`continue_final_message`)."""
+        messages = request["messages"]
+        prefix = ""
+        if request.get("continue_final_message") and messages[-1].get("role") == "assistant":
+            prefix = messages[-1]["content"]
+            messages = messages[:-1]
+        return messages[-1]["content"], prefix
+
+    async def _chat(self, request: dict) -> bytes:
+        prompt, prefix = self._chat_prompt(request)
+        pieces, finish = self._pieces(prompt, request.get("max_tokens") or 512, prefix)
+        text = "".join([piece async for piece in self.engine.generate(pieces)])
+        response = self._envelope("chat.completion") | {
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": finish,
+            }],
+            "usage": self._usage(prompt, len(pieces)),
+        }
+        return self._response(200, codec.dumps(response))
+
+    async def _chat_stream(self, request: dict, writer: asyncio.StreamWriter) -> bytes:
+        prompt, prefix = self._chat_prompt(request)
+        pieces, finish = self._pieces(prompt, request.get("max_tokens") or 512, prefix)
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+
+        async def event(data: bytes) -> None:
+            chunk = b"data: " + data + b"\n\n"
+            writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            await writer.drain()
+
+        envelope = self._envelope("chat.completion.chunk")
+        async for piece in self.engine.generate(pieces):
+            await event(codec.dumps(envelope | {
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }))
+        await event(codec.dumps(envelope | {
+            "choices": [{"index": 0, "delta": {}, "finish_reason": finish}],
+        }))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            await event(codec.dumps(envelope | {
+                "choices": [], "usage": self._usage(prompt, len(pieces)),
+            }))
+        await event(b"[DONE]")
+        return b"0\r\n\r\n"
+
+    async def _completions(self, request: dict) -> bytes:
+        prompts = request["prompt"]
+        if isinstance(prompts, str):
+            prompts = [prompts]
+        max_tokens = request.get("max_tokens") or 16
+        plans = [self._pieces(p, max_tokens) for p in prompts]
+
+        async def one(pieces: list[str]) -> str:
+            return "".join([piece async for piece in self.engine.generate(pieces)])
+
+        texts = await asyncio.gather(*(one(pieces) for pieces, _ in plans))
+        response = self._envelope("text_completion") | {
+            "choices": [
+                {"index": i, "text": text, "finish_reason": finish}
+                for i, (text, (_, finish)) in enumerate(zip(texts, plans))
+            ],
+            "usage": self._usage(prompts, sum(len(pieces) for pieces, _ in plans)),
+        }
+        return self._response(200, codec.dumps(response))
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8001)
+    ap.add_argument("--mode", choices=["pseudo", "echo"], default="pseudo")
+    ap.add_argument("--model", default="fake-translategemma")
+    ap.add_argument("--base-ms", type=float, default=LatencyModel.base_ms)
+    ap.add_argument("--decode-ms", type=float, default=LatencyModel.decode_ms)
+    ap.add_argument("--batch-overhead", type=float, default=LatencyModel.batch_overhead)
+    ap.add_argument("--max-num-seqs", type=int, default=LatencyModel.max_num_seqs)
+    args = ap.parse_args()
+
+    server = FakeVllmServer(
+        LatencyModel(args.base_ms, args.decode_ms, args.batch_overhead, args.max_num_seqs),
+        mode=args.mode,
+        model_name=args.model,
+    )
+    url = await server.start(args.host, args.port)
+    print(f"fake vLLM listening on {url} ({args.mode}, max_num_seqs={args.max_num_seqs})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,32 @@
+"""CPU-bound stand-in for a local MT model (local provider), no model needed.
+
+Burns CPU in proportion to the source length, as a small CPU model would,
+so that the worker pool, batching and event-loop isolation of the local
+provider can be exercised (tests, benchmarks) without a model download.
+
+Usage:
+  TRANSLATION_PROVIDER=local LOCAL_MODEL_FACTORY=benchmark.local_model:DummyModel ...
+"""
+
+import time
+
+from translator.providers.base import InvalidRequestError
+
+
+class DummyModel:
+    """CPU-bound stand-in for a local MT model.
+
+    Burns `cost_us_per_char` microseconds of CPU per source character and
+    returns the text tagged with the target language.
+    """
+
+    def __init__(self, cost_us_per_char: float = 20.0) -> None:
+        self.cost_s_per_char = cost_us_per_char / 1e6
+
+    def translate(self, text: str, source_lang: str | None, target_lang: str) -> str:
+        if not source_lang:
+            raise InvalidRequestError("source_lang is required for translation")
+        deadline = time.perf_counter() + self.cost_s_per_char * len(text)
+        while time.perf_counter() < deadline:
+            pass
+        return f"[{target_lang}] {text}"
@@ -25,13 +25,14 @@ Examples:
   ... replay_capture.py mqtt_live.log --min-new-chars 40 --debounce-ms 1000
   # lower bound: finals only (future TRANSLATE_PARTIALS=false)
   ... replay_capture.py mqtt_live.log --finals-only
+  # real model timing and outputs, from a provider journal (TRANSLATION_JOURNAL_PATH)
+  ... replay_capture.py mqtt_live.log --provider-journal journal.jsonl.gz
 """
 
 import argparse
 import asyncio
 import contextvars
 import json
-import math
 import selectors
 import statistics
 import sys
@@ -41,15 +42,11 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+from translator.budget import CALL_OVERHEAD_TOKENS, est_tokens  # noqa: E402
+from translator.codec import DecodeError, Transcription, decode_transcription  # noqa: E402
 from translator.pipeline import Pipeline  # noqa: E402
 from translator.providers.base import TranslationProvider  # noqa: E402
-
-CHARS_PER_TOKEN = 4.0
-CALL_OVERHEAD_TOKENS = 10  # chat template (<start_of_turn> etc.), constant per request
-
-
-def est_tokens(chars: int) -> int:
-    return math.ceil(chars / CHARS_PER_TOKEN)
+from translator.providers.replay import ReplayProvider  # noqa: E402
 
 
 # ---------------------------------------------------------------------------
@@ -102,7 +99,7 @@ class Event:
     ts: float
     channel: str
     action: str  # "partial" | "final"
-    payload: dict
+    payload: Transcription
 
 
 def parse_capture(path: Path, translator_name: str, channels: set[str] | None,
@@ -155,24 +152,20 @@ def parse_capture(path: Path, translator_name: str, channels: set[str] | None,
             if to_s is not None and rel > to_s:
                 continue
             try:
-                payload = json.loads(parts[2])
-            except json.JSONDecodeError:
+                payload = decode_transcription(parts[2], translator_name)
+            except DecodeError:
                 continue
 
             # Replicate mqtt_handler filtering, counting each skip
-            external = payload.get("externalTranslations")
-            targets = [e for e in external or [] if e.get("translator") == translator_name]
-            if not targets:
+            if not payload.targets:
                 skipped["no_target"] += 1
                 continue
-            text = payload.get("text", "")
-            if not text or not text.strip():
+            if not payload.text.strip():
                 skipped["empty_text"] += 1
                 continue
-            if not payload.get("lang"):
+            if not payload.lang:
                 skipped["no_lang"] += 1
                 continue
-            payload["_targets"] = targets
             events.append(Event(ts, channel, topic[4], payload))
 
     return events, capture_published, skipped
@@ -204,11 +197,19 @@ class MeterProvider(TranslationProvider):
     """Echo provider that meters every call and simulates request latency.
 
     latency = base_ms + out_tokens / decode_tps (if decode_tps > 0)
+
+    With `replay`, answers and latency come from a provider journal instead.
     """
 
-    def __init__(self, base_latency_ms: float = 0.0, decode_tps: float = 0.0) -> None:
+    def __init__(
+        self,
+        base_latency_ms: float = 0.0,
+        decode_tps: float = 0.0,
+        replay: ReplayProvider | None = None,
+    ) -> None:
         self.base_latency_s = base_latency_ms / 1000.0
         self.decode_tps = decode_tps
+        self.replay = replay
         self.calls: list[CallRecord] = []
         self.inflight = 0
         self.max_inflight = 0
@@ -241,6 +242,11 @@ class MeterProvider(TranslationProvider):
             inflight_at_start=self.inflight,
         )
         try:
+            if self.replay is not None:
+                result = await self.replay.translate(text, source_lang, target_lang)
+                rec.t_done = loop.time()
+                self.calls.append(rec)
+                return result
             latency = self.base_latency_s
             if self.decode_tps > 0:
                 latency += out_tokens / self.decode_tps
@@ -295,9 +301,8 @@ async def replay(events: list[Event], pipeline: Pipeline, publog: PublishLog,
             next_progress += progress_every_s
         if finals_only and ev.action != "final":
             continue
-        targets = ([{"targetLang": lg, "translator": "replay"} for lg in languages]
-                   if languages else ev.payload["_targets"])
-        CALL_CTX.set((ev.channel, ev.payload.get("segmentId"), ev.action))
+        targets = languages or ev.payload.targets
+        CALL_CTX.set((ev.channel, ev.payload.segment_id, ev.action))
         try:
             if ev.action == "final":
                 # mqtt_handler awaits handle_final in its message loop: a slow
@@ -307,7 +312,7 @@ async def replay(events: list[Event], pipeline: Pipeline, publog: PublishLog,
             else:
                 await pipeline.handle_partial(session, ev.channel, ev.payload, targets)
         except Exception as exc:  # mqtt_handler catches broadly: message dropped
-            k = f"{type(exc).__name__} (lang={ev.payload.get('lang')})"
+            k = f"{type(exc).__name__} (lang={ev.payload.lang})"
             handler_errors[k] = handler_errors.get(k, 0) + 1
 
     # Drain: let debounce timers, holds and in-flight calls finish (virtual time)
@@ -338,9 +343,9 @@ def summarize(args, events, calls: list[CallRecord], publog: PublishLog,
     final_text_by_seg: dict[tuple, str] = {}
     for e in events:
         if e.action == "final":
-            k = (e.channel, e.payload.get("segmentId"))
-            final_tokens_by_seg[k] = est_tokens(len(e.payload["text"]))
-            final_text_by_seg[k] = e.payload["text"]
+            k = (e.channel, e.payload.segment_id)
+            final_tokens_by_seg[k] = est_tokens(len(e.payload.text))
+            final_text_by_seg[k] = e.payload.text
 
     calls_partial = [c for c in calls if c.action == "partial"]
     calls_final = [c for c in calls if c.action == "final"]
@@ -481,6 +486,8 @@ def main() -> None:
     # provider latency model
     ap.add_argument("--latency-ms", type=float, default=0.0, help="base request latency")
     ap.add_argument("--decode-tps", type=float, default=0.0, help="per-request decode tok/s (0=off)")
+    ap.add_argument("--provider-journal", type=Path, default=None,
+                    help="replay answers and latency from a provider journal (overrides --latency-ms/--decode-tps)")
     ap.add_argument("--no-dedupe", action="store_true",
                     help="keep consecutive duplicate capture lines (default: dedupe)")
     ap.add_argument("--json", type=Path, default=None, help="write full JSON report here")
@@ -501,7 +508,8 @@ def main() -> None:
           f"{sum(1 for e in events if e.action == 'final')} finals), "
           f"window {(events[-1].ts - events[0].ts) / 60:.1f} min", file=sys.stderr)
 
-    provider = MeterProvider(args.latency_ms, args.decode_tps)
+    replay_provider = ReplayProvider(args.provider_journal) if args.provider_journal else None
+    provider = MeterProvider(args.latency_ms, args.decode_tps, replay_provider)
     publog = PublishLog()
     pipeline = Pipeline(
         provider=provider,
@@ -526,6 +534,9 @@ def main() -> None:
     finally:
         loop.close()
     wall_s = _time.monotonic() - wall0
+    if replay_provider is not None:
+        snap = replay_provider.replay_snapshot()
+        print(f"provider journal: {snap['requests']} requests, {snap['misses']} misses", file=sys.stderr)
 
     report = summarize(args, events, provider.calls, publog, pipeline,
                        capture_published, skipped, wall_s, handler_errors)
@@ -0,0 +1,143 @@
+"""Cold-start benchmark: process start -> subscribed to the transcriber topics.
+
+Launches `python -m translator.main` against a minimal in-process MQTT
+broker (just enough MQTT 3.1.1 for the service: CONNECT, PUBLISH QoS 1,
+SUBSCRIBE, PINGREQ, DISCONNECT) and times how long a fresh process takes to
+subscribe to both transcriber topics. Replicas are added by the autoscaler
+under load: until a new one has subscribed, it translates nothing.
+
+Exits non-zero when the median of the runs exceeds the budget.
+
+Usage:
+  .venv/bin/python -m benchmark.startup [--runs 5] [--budget-s 1.0] [--provider echo]
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_BUDGET_S = 1.0
+_TOPICS = {"transcriber/out/+/+/final", "transcriber/out/+/+/partial"}
+
+
+async def _read_packet(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+    header = (await reader.readexactly(1))[0]
+    length, shift = 0, 0
+    while True:
+        byte = (await reader.readexactly(1))[0]
+        length |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+    return header, await reader.readexactly(length)
+
+
+class FakeBroker:
+    """Accepts one client and records when it has subscribed to `_TOPICS`."""
+
+    def __init__(self) -> None:
+        self.subscribed = asyncio.Event()
+        self.subscribed_at = 0.0
+        self._topics: set[str] = set()
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                header, body = await _read_packet(reader)
+                kind = header & 0xF0
+                if kind == 0x10:  # CONNECT
+                    writer.write(b"\x20\x02\x00\x00")
+                elif kind == 0x30:  # PUBLISH
+                    if (header >> 1) & 0x03:
+                        topic_len = int.from_bytes(body[:2], "big")
+                        packet_id = body[2 + topic_len:4 + topic_len]
+                        writer.write(b"\x40\x02" + packet_id)
+                elif kind == 0x80:  # SUBSCRIBE
+                    packet_id, pos, granted = body[:2], 2, bytearray()
+                    while pos < len(body):
+                        size = int.from_bytes(body[pos:pos + 2], "big")
+                        self._topics.add(body[pos + 2:pos + 2 + size].decode())
+                        granted.append(body[pos + 2 + size])
+                        pos += 3 + size
+                    writer.write(bytes([0x90, 2 + len(granted)]) + packet_id + granted)
+                    if _TOPICS <= self._topics and not self.subscribed.is_set():
+                        self.subscribed_at = time.perf_counter()
+                        self.subscribed.set()
+                elif kind == 0xC0:  # PINGREQ
+                    writer.write(b"\xd0\x00")
+                elif kind == 0xE0:  # DISCONNECT
+                    break
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def measure_startup(provider: str = "echo", timeout_s: float = 30.0) -> float:
+    """Seconds from process launch to both transcriber subscriptions."""
+    broker = FakeBroker()
+    port = await broker.start()
+    env = {
+        **os.environ,
+        "TRANSLATOR_NAME": "startup-benchmark",
+        "BROKER_HOST": "127.0.0.1",
+        "BROKER_PORT": str(port),
+        "TRANSLATION_PROVIDER": provider,
+        "LOG_LEVEL": "WARNING",
+    }
+    t0 = time.perf_counter()
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "translator.main", cwd=ROOT, env=env,
+    )
+    try:
+        await asyncio.wait_for(broker.subscribed.wait(), timeout_s)
+        return broker.subscribed_at - t0
+    finally:
+        if proc.returncode is None:
+            proc.send_signal(signal.SIGTERM)
+            try:
+                await asyncio.wait_for(proc.wait(), 5)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+        await broker.stop()
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget-s", type=float, default=DEFAULT_BUDGET_S)
+    ap.add_argument("--provider", default="echo")
+    args = ap.parse_args()
+
+    samples = [await measure_startup(args.provider) for _ in range(args.runs)]
+    median = statistics.median(samples)
+    print(
+        f"cold start -> subscribed ({args.provider}): median {median * 1000:.0f} ms, "
+        f"min {min(samples) * 1000:.0f} ms, max {max(samples) * 1000:.0f} ms "
+        f"(budget {args.budget_s * 1000:.0f} ms)"
+    )
+    if median > args.budget_s:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,7 @@
+"""Shared test setup."""
+
+import os
+
+# translator.config requires it; the service reads it from .envdefault/.env,
+# loaded by translator.main only
+os.environ.setdefault("TRANSLATOR_NAME", "test")
@@ -0,0 +1,144 @@
+"""Tests for the translation memory (TranslationCache + CachedProvider)."""
+
+import asyncio
+
+import pytest
+
+from translator.cache import TranslationCache, cache_key
+from translator.providers.base import TranslationProvider
+from translator.providers.cache import CachedProvider
+from translator.scheduler import TranslationScheduler
+
+
+class CountingProvider(TranslationProvider):
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def translate(self, text, source_lang, target_lang):
+        self.calls.append(text)
+        return f"T({text})"
+
+
+def key(text, src="fr", tgt="en"):
+    return cache_key(text, src, tgt)
+
+
+class TestCacheKey:
+    def test_whitespace_and_case_normalized(self):
+        assert cache_key("  Merci   beaucoup. ", "FR-fr", "EN") == cache_key(
+            "Merci beaucoup.", "fr-FR", "en"
+        )
+
+    def test_text_case_kept(self):
+        assert cache_key("merci.", "fr", "en") != cache_key("Merci.", "fr", "en")
+
+    def test_uncacheable(self):
+        assert cache_key("Merci.", None, "en") is None
+        assert cache_key("   ", "fr", "en") is None
+
+
+class TestTranslationCache:
+    def test_hit_and_miss_counted(self):
+        c = TranslationCache(max_entries=10)
+        assert c.get(key("Oui.")) is None
+        c.put(key("Oui."), "Yes.")
+        assert c.get(key("Oui.")) == "Yes."
+        snap = c.snapshot()
+        assert (snap["hits"], snap["misses"], snap["entries"]) == (1, 1, 1)
+
+    def test_entry_bound_evicts_lru(self):
+        c = TranslationCache(max_entries=2)
+        for text in ("a", "b", "c"):
+            c.get(key(text))
+            c.get(key(text))
+        c.put(key("a"), "A")
+        c.put(key("b"), "B")
+        c.get(key("a"))  # a is now most recent
+        c.get(key("c"))  # c is now more popular than b
+        assert c.put(key("c"), "C")
+        assert c.peek(key("b")) is None
+        assert c.peek(key("a")) == "A"
+        assert c.snapshot()["evictions"] == 1
+
+    def test_byte_bound(self):
+        c = TranslationCache(max_entries=1000, max_bytes=400)
+        for i in range(20):
+            k = key(f"phrase numéro {i}")
+            c.get(k)
+            c.get(k)
+            c.put(k, "x" * 50)
+        assert c.bytes <= 400
+        assert len(c) < 20
+
+    def test_admission_protects_frequent_entries(self):
+        c = TranslationCache(max_entries=1)
+        for _ in range(5):
+            c.get(key("D'accord."))
+        c.put(key("D'accord."), "OK.")
+        c.get(key("Une phrase longue dite une seule fois."))
+        assert not c.put(key("Une phrase longue dite une seule fois."), "...")
+        assert c.peek(key("D'accord.")) == "OK."
+        assert c.snapshot()["rejected"] == 1
+
+    def test_oversized_value_not_cached(self):
+        c = TranslationCache(max_entries=10, max_bytes=100)
+        assert not c.put(key("x"), "y" * 200)
+        assert len(c) == 0
+
+
+class TestCachedProvider:
+    async def test_repeat_served_from_cache(self):
+        inner = CountingProvider()
+        prov = CachedProvider(inner, TranslationCache())
+        assert await prov.translate("Merci.", "fr-FR", "en") == "T(Merci.)"
+        assert await prov.translate(" Merci. ", "fr-FR", "en") == "T(Merci.)"
+        assert inner.calls == ["Merci."]
+        assert prov.cache_snapshot()["hits"] == 1
+
+    async def test_errors_not_cached(self):
+        class Failing(CountingProvider):
+            async def translate(self, text, source_lang, target_lang):
+                self.calls.append(text)
+                raise RuntimeError("down")
+
+        inner = Failing()
+        prov = CachedProvider(inner, TranslationCache())
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await prov.translate("Merci.", "fr", "en")
+        assert len(inner.calls) == 2
+
+    async def test_stream_remembered_once_complete(self):
+        inner = CountingProvider()
+        prov = CachedProvider(inner, TranslationCache())
+        assert [p async for p in prov.translate_stream("Merci.", "fr", "en")] == ["T(Merci.)"]
+        assert [p async for p in prov.translate_stream("Merci.", "fr", "en")] == ["T(Merci.)"]
+        assert inner.calls == ["Merci."]
+
+    async def test_batch_only_sends_misses(self):
+        inner = CountingProvider()
+        prov = CachedProvider(inner, TranslationCache())
+        await prov.translate("Oui.", "fr", "en")
+        out = await prov.translate_batch([("Oui.", "fr", "en"), ("Non.", "fr", "en")])
+        assert out == ["T(Oui.)", "T(Non.)"]
+        assert inner.calls == ["Oui.", "Non."]
+
+    async def test_scheduler_hit_skips_admission(self):
+        inner = CountingProvider()
+        prov = CachedProvider(inner, TranslationCache())
+        sched = TranslationScheduler(prov, max_concurrent=1, batch_window_ms=1000)
+        await prov.translate("Oui.", "fr", "en")
+        # A hit never waits for the 1 s batch window nor a concurrency slot
+        out = await asyncio.wait_for(sched.freeze("k", "Oui.", "fr", "en"), timeout=0.1)
+        assert out == "T(Oui.)"
+        snap = prov.cache_snapshot()
+        assert (snap["hits"], snap["misses"]) == (1, 1)
+
+    def test_wrapper_exposes_inner_capabilities(self):
+        class WithUsage(CountingProvider):
+            def usage_snapshot(self):
+                return {"requests": 3}
+
+        prov = CachedProvider(WithUsage(), TranslationCache())
+        assert prov.usage_snapshot() == {"requests": 3}
+        assert getattr(prov, "not_a_capability", None) is None
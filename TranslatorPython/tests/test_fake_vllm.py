@@ -0,0 +1,102 @@
+"""End-to-end: TranslateGemmaProvider against the fake vLLM server."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from benchmark.fake_vllm import FakeVllmServer, LatencyModel
+from translator.providers.translategemma import TranslateGemmaProvider
+
+FAST = LatencyModel(base_ms=5, decode_ms=2, batch_overhead=0.1, max_num_seqs=4)
+
+
+@pytest.fixture
+async def server():
+    srv = FakeVllmServer(FAST)
+    await srv.start()
+    yield srv
+    await srv.close()
+
+
+@pytest.fixture
+async def provider(server):
+    p = TranslateGemmaProvider(endpoint=server.url, max_tokens=64)
+    yield p
+    await p.close()
+
+
+async def test_translate_reports_usage(provider):
+    assert await provider.translate("Bonjour le monde", "fr", "en") == "ruojnoB el ednom"
+    usage = provider.usage_snapshot()
+    assert usage["requests"] == 1
+    assert usage["prompt_tokens"] > 0 and usage["completion_tokens"] == 4
+
+
+async def test_stream_yields_token_pieces(provider):
+    pieces = [p async for p in provider.translate_stream("Bonjour le monde", "fr", "en")]
+    assert len(pieces) == 4
+    assert "".join(pieces) == "ruojnoB el ednom"
+    assert provider.usage_snapshot()["streams"] == 1
+
+
+async def test_batch_is_one_request(provider, server):
+    items = [("un deux", "fr", "en"), ("trois", "fr", "en"), ("quatre cinq six", "fr", "de")]
+    assert await provider.translate_batch(items) == ["nu xued", "siort", "ertauq qnic xis"]
+    assert server.requests == 1
+
+
+async def test_truncation_at_max_tokens(server):
+    p = TranslateGemmaProvider(endpoint=server.url, max_tokens=2, adaptive_max_tokens=False)
+    try:
+        assert await p.translate("a much longer sentence", "fr", "en") == "a hcum r"
+        assert p.usage_snapshot()["truncated"] == 1
+    finally:
+        await p.close()
+
+
+async def test_health_and_metrics(server):
+    async with httpx.AsyncClient(base_url=server.url) as client:
+        assert (await client.get("/health")).status_code == 200
+        metrics = (await client.get("/metrics")).text
+        assert "vllm:num_requests_waiting" in metrics
+
+
+async def test_latency_grows_with_concurrency_and_queueing(server, provider):
+    text = "mot " * 20
+
+    async def timed(n: int) -> float:
+        t0 = time.monotonic()
+        await asyncio.gather(*(provider.translate(f"{text}{i}", "fr", "en") for i in range(n)))
+        return time.monotonic() - t0
+
+    single = await timed(1)
+    # 8 requests over max_num_seqs=4: two waves, each decoding slower
+    assert await timed(8) > 2 * single
+
+
+async def test_client_disconnect_aborts_sequence(server, provider):
+    task = asyncio.create_task(provider.translate("mot " * 200, "fr", "en"))
+    await asyncio.sleep(0.05)
+    assert server.engine.running == 1
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await asyncio.sleep(0.05)
+    assert server.engine.running == 0
+
+
+async def test_prefill_decodes_only_the_continuation(provider):
+    text = "un deux trois quatre cinq six sept huit"
+    full = await provider.translate(text, "fr", "en")
+    full_tokens = provider.usage_snapshot()["completion_tokens"]
+    prefix = " ".join(full.split()[:6])
+    assert await provider.translate_continue(text, "fr", "en", prefix) == full
+    usage = provider.usage_snapshot()
+    assert usage["prefills"] == 1
+    assert usage["completion_tokens"] - full_tokens < full_tokens / 2
+
+
+async def test_warm_up_opens_a_connection(provider, server):
+    await provider.warm_up()
+    assert provider.transport_snapshot()["connections_opened"] >= 1
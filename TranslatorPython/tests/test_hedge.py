@@ -0,0 +1,123 @@
+"""Tests for HedgedProvider (duplicates of slow requests, load budget)."""
+
+import asyncio
+
+from translator.providers.base import TranslationProvider
+from translator.providers.endpoints import sibling_urls
+from translator.providers.hedge import HedgedProvider, _size_bucket
+
+
+class ScriptedProvider(TranslationProvider):
+    """Latency per call taken from a script (default: fast)."""
+
+    def __init__(self, latencies=None, fast: float = 0.001) -> None:
+        self.latencies = list(latencies or [])
+        self.fast = fast
+        self.calls = 0
+        self.cancelled = 0
+        self.siblings: list = []
+
+    async def translate_continue(self, text, source_lang, target_lang, prefix):
+        return await self.translate(text, source_lang, target_lang)
+
+    async def translate(self, text, source_lang, target_lang):
+        self.calls += 1
+        n = self.calls
+        self.siblings.append(sibling_urls.get())
+        latency = self.latencies.pop(0) if self.latencies else self.fast
+        try:
+            await asyncio.sleep(latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"T{n}({text})"
+
+
+async def warm(prov: HedgedProvider, n: int = 40) -> None:
+    for _ in range(n):
+        await prov.translate("Bonjour.", "fr", "en")
+
+
+async def test_no_hedge_before_enough_samples():
+    inner = ScriptedProvider(latencies=[0.05])
+    prov = HedgedProvider(inner, budget=1.0)
+    await prov.translate("Bonjour.", "fr", "en")
+    assert inner.calls == 1
+    assert prov.hedge_snapshot()["hedged"] == 0
+
+
+async def test_slow_request_hedged_and_loser_cancelled():
+    inner = ScriptedProvider()
+    prov = HedgedProvider(inner, budget=1.0, min_delay_s=0.005)
+    await warm(prov)
+    calls = inner.calls
+    inner.latencies = [1.0]  # the next primary hangs
+    out = await asyncio.wait_for(prov.translate("Bonjour.", "fr", "en"), 0.5)
+    assert out == f"T{calls + 2}(Bonjour.)"  # the duplicate's answer
+    assert inner.cancelled == 1
+    snap = prov.hedge_snapshot()
+    assert snap["hedged"] == 1 and snap["hedge_wins"] == 1
+    # Both copies saw the same sibling list (routed apart by an EndpointPool)
+    assert inner.siblings[-1] is inner.siblings[-2] is not None
+
+
+async def test_budget_caps_hedges():
+    inner = ScriptedProvider()
+    prov = HedgedProvider(inner, budget=0.05, min_delay_s=0.005)
+    await warm(prov, 20)  # earns 1 credit
+    inner.latencies = [0.05, 0.05, 0.05, 0.05]
+    await prov.translate("Bonjour.", "fr", "en")
+    await prov.translate("Bonjour.", "fr", "en")
+    snap = prov.hedge_snapshot()
+    assert snap["hedged"] == 1
+    assert snap["budget_denied"] == 1
+
+
+async def test_failed_primary_falls_back_to_hedge():
+    class FailingFirst(ScriptedProvider):
+        async def translate(self, text, source_lang, target_lang):
+            if self.calls == 40:
+                self.calls += 1
+                await asyncio.sleep(0.01)
+                raise RuntimeError("boom")
+            return await super().translate(text, source_lang, target_lang)
+
+    inner = FailingFirst()
+    prov = HedgedProvider(inner, budget=1.0, min_delay_s=0.005)
+    await warm(prov)
+    inner.latencies = [0.05]  # the duplicate, still running when the primary fails
+    assert await prov.translate("Bonjour.", "fr", "en") == "T42(Bonjour.)"
+
+
+async def test_prefilled_tails_hedged_in_their_own_buckets():
+    inner = ScriptedProvider()
+    prov = HedgedProvider(inner, budget=1.0, min_delay_s=0.005)
+    await warm(prov)
+    inner.latencies = [1.0]
+    # No prefill samples yet: the slow prefill is not hedged
+    with_no_samples = asyncio.ensure_future(prov.translate_continue("Bonjour.", "fr", "en", "Hel"))
+    await asyncio.sleep(0.05)
+    assert prov.hedge_snapshot()["hedged"] == 0
+    with_no_samples.cancel()
+    for _ in range(40):
+        await prov.translate_continue("Bonjour.", "fr", "en", "Hel")
+    inner.latencies = [1.0]
+    await asyncio.wait_for(prov.translate_continue("Bonjour.", "fr", "en", "Hel"), 0.5)
+    assert prov.hedge_snapshot()["hedged"] == 1
+
+
+async def test_samples_follow_the_backend_tail_not_the_winners():
+    inner = ScriptedProvider()
+    prov = HedgedProvider(inner, budget=1.0, min_delay_s=0.005)
+    await warm(prov)
+    samples = prov._latencies[_size_bucket("Bonjour.")]
+    # Beaten primary: the sample is what the caller waited, from its start
+    inner.latencies = [1.0]
+    await asyncio.wait_for(prov.translate("Bonjour.", "fr", "en"), 0.5)
+    assert samples[-1] >= 0.005
+    # Beaten duplicate: a censored sample (the time it had run) is added
+    count = len(samples)
+    inner.latencies = [0.03, 1.0]
+    await prov.translate("Bonjour.", "fr", "en")
+    assert len(samples) == count + 2
+    assert samples[-2] >= 0.03 and samples[-1] > 0
@@ -0,0 +1,177 @@
+"""Tests for the provider journal (Journal, JournalProvider) and ReplayProvider."""
+
+import asyncio
+import gzip
+import time
+
+import pytest
+
+from translator.journal import Journal, journal_files, read_journal
+from translator.providers import load_provider
+from translator.providers.base import TranslationProvider, UntranslatedText, report_usage
+from translator.providers.journal import JournalProvider
+from translator.providers.replay import ReplayedError, ReplayProvider
+
+
+class UsageProvider(TranslationProvider):
+    """Uppercases after 10 ms, reporting usage; fails on "boom"."""
+
+    async def translate(self, text, source_lang, target_lang):
+        await asyncio.sleep(0.01)
+        report_usage(len(text), len(text) // 2)
+        if text == "boom":
+            raise RuntimeError("backend down")
+        if text == "OK":
+            return UntranslatedText(text)
+        return text.upper()
+
+
+def _record(text, result="R", latency_ms=50.0, **extra):
+    return {"text": text, "src": "fr", "tgt": "en", "latency_ms": latency_ms,
+            "prompt_tokens": 4, "completion_tokens": 2, "result": result, **extra}
+
+
+# ---------------------------------------------------------------------------
+# Journal
+# ---------------------------------------------------------------------------
+
+async def test_round_trip(tmp_path):
+    path = tmp_path / "sub" / "journal.jsonl.gz"
+    j = Journal(path, flush_interval_s=0.01)
+    for i in range(3):
+        j.write({"i": i, "text": "é"})
+    await asyncio.sleep(0.1)
+    j.write({"i": 3})
+    await j.close()
+    assert [r["i"] for r in read_journal(path)] == [0, 1, 2, 3]
+    assert j.snapshot() == {"records": 4, "rotations": 0, "errors": 0}
+    j.write({"i": 4})  # after close: dropped
+    assert len(list(read_journal(path))) == 4
+
+
+async def test_rotation_keeps_backups_in_order(tmp_path):
+    path = tmp_path / "journal.jsonl.gz"
+    j = Journal(path, max_bytes=200, backups=2, flush_batch=1)
+    for i in range(12):
+        j.write({"i": i, "pad": "x" * 100})
+        await asyncio.sleep(0.01)
+    await j.close()
+    assert [p.name for p in journal_files(path)][:2] == ["journal.jsonl.gz.2", "journal.jsonl.gz.1"]
+    assert len(journal_files(path)) <= 3
+    kept = [r["i"] for r in read_journal(path)]
+    assert kept == sorted(kept) and kept[-1] == 11 and kept[0] > 0
+    assert j.snapshot()["rotations"] >= 3
+
+
+async def test_damaged_tail_is_tolerated(tmp_path):
+    path = tmp_path / "journal.jsonl.gz"
+    j = Journal(path, flush_batch=1)
+    j.write({"i": 0})
+    await j.close()
+    with open(path, "ab") as f:
+        member = gzip.compress(b'{"i": 1}\n' * 50)
+        f.write(member[: len(member) // 2])
+    assert [r["i"] for r in read_journal(path)][:1] == [0]
+
+
+# ---------------------------------------------------------------------------
+# JournalProvider
+# ---------------------------------------------------------------------------
+
+async def test_records_usage_latency_and_errors(tmp_path):
+    path = tmp_path / "journal.jsonl.gz"
+    provider = JournalProvider(UsageProvider(), Journal(path))
+    assert await provider.translate("bonjour", "fr", "en") == "BONJOUR"
+    assert isinstance(await provider.translate("OK", "fr", "en"), UntranslatedText)
+    with pytest.raises(RuntimeError):
+        await provider.translate("boom", "fr", "en")
+    assert await provider.translate_continue("salut", "fr", "en", "HE") == "SALUT"
+    await provider.close()
+
+    ok, untranslated, failed, cont = read_journal(path)
+    assert ok["kind"] == "translate" and ok["result"] == "BONJOUR"
+    assert (ok["prompt_tokens"], ok["completion_tokens"]) == (7, 3)
+    assert ok["latency_ms"] >= 10
+    assert untranslated["untranslated"] is True
+    assert failed["error"] == "RuntimeError: backend down" and "result" not in failed
+    assert cont["kind"] == "continue" and cont["prefix"] == "HE"
+    assert provider.journal_snapshot()["records"] == 4
+
+
+async def test_batch_splits_usage_and_stream_records_ttft(tmp_path):
+    path = tmp_path / "journal.jsonl.gz"
+    provider = JournalProvider(UsageProvider(), Journal(path))
+    assert await provider.translate_batch([("ab", "fr", "en"), ("abcdef", "fr", "de")]) == ["AB", "ABCDEF"]
+    assert "".join([p async for p in provider.translate_stream("un deux", "fr", "en")]) == "UN DEUX"
+    await provider.close()
+
+    first, second, stream = read_journal(path)
+    assert first["batch"] == second["batch"] == 2
+    assert first["prompt_tokens"] + second["prompt_tokens"] == 8
+    assert second["prompt_tokens"] == 3 * first["prompt_tokens"]
+    assert stream["kind"] == "stream" and stream["result"] == "UN DEUX"
+    assert 0 < stream["ttft_ms"] <= stream["latency_ms"]
+
+
+# ---------------------------------------------------------------------------
+# ReplayProvider
+# ---------------------------------------------------------------------------
+
+def test_registered():
+    assert isinstance(load_provider("replay", records=[]), ReplayProvider)
+
+
+async def test_replays_answers_in_order_with_latency():
+    p = ReplayProvider(records=[
+        _record("bonjour", "hello", latency_ms=40),
+        _record("bonjour  ", "hi", latency_ms=40),
+        _record("boom", latency_ms=10, error="RuntimeError: backend down"),
+    ])
+    t0 = time.monotonic()
+    assert await p.translate(" bonjour", "fr", "en") == "hello"
+    assert time.monotonic() - t0 >= 0.035
+    assert await p.translate("bonjour", "fr", "en") == "hi"
+    assert await p.translate("bonjour", "fr", "en") == "hello"  # cycles
+    with pytest.raises(ReplayedError, match="backend down"):
+        await p.translate("boom", "fr", "en")
+    assert p.usage_snapshot()["prompt_tokens"] == 16
+    assert p.replay_snapshot() == {"requests": 4, "misses": 0}
+
+
+async def test_miss_is_echoed_after_fitted_latency():
+    p = ReplayProvider(records=[_record("a" * 10, latency_ms=20), _record("a" * 30, latency_ms=60)])
+    t0 = time.monotonic()
+    assert await p.translate("b" * 20, "fr", "en") == "b" * 20
+    assert 0.035 <= time.monotonic() - t0 < 0.2  # 40 ms
+    assert await p.translate("bonjour", "fr", "de") == "bonjour"
+    assert p.replay_snapshot() == {"requests": 2, "misses": 2}
+
+
+async def test_continue_and_stream():
+    p = ReplayProvider(records=[
+        _record("un deux", "ONE TWO"),
+        _record("un deux", "ONE TWO!", prefix="ONE"),
+        _record("trois", "three four five", latency_ms=40, ttft_ms=10),
+    ])
+    assert await p.translate_continue("un deux", "fr", "en", "ONE") == "ONE TWO!"
+    assert await p.translate_continue("un deux", "fr", "en", "UNKNOWN") == "ONE TWO"
+    t0 = time.monotonic()
+    pieces = [(piece, time.monotonic() - t0) async for piece in p.translate_stream("trois", "fr", "en")]
+    assert "".join(piece for piece, _ in pieces) == "three four five"
+    assert pieces[0][1] < 0.03 and pieces[-1][1] >= 0.035
+    assert p.replay_snapshot()["misses"] == 0
+
+
+async def test_journal_round_trip_through_replay(tmp_path):
+    path = tmp_path / "journal.jsonl.gz"
+    recorder = JournalProvider(UsageProvider(), Journal(path))
+    await recorder.translate("bonjour", "fr", "en")
+    with pytest.raises(RuntimeError):
+        await recorder.translate("boom", "fr", "en")
+    await recorder.close()
+
+    p = ReplayProvider(path=str(path))
+    assert await p.translate("bonjour", "fr", "en") == "BONJOUR"
+    with pytest.raises(ReplayedError):
+        await p.translate("boom", "fr", "en")
+    assert p.replay_snapshot()["misses"] == 0
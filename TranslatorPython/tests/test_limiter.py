@@ -0,0 +1,84 @@
+"""Tests for ConcurrencyLimiter (static FIFO cap, adaptive gradient limit)."""
+
+import asyncio
+
+from translator.limiter import ConcurrencyLimiter
+from translator.scheduler import TranslationScheduler
+from tests.test_scheduler import FakeProvider
+
+
+async def _cycle(limiter: ConcurrencyLimiter, n: int, latency_per_token) -> None:
+    """n requests held together, then completed with a synthetic latency."""
+    for _ in range(n):
+        await limiter.acquire()
+    busy = limiter.inflight
+    for _ in range(n):
+        limiter.release(latency_per_token(busy) * 10, tokens=10)
+
+
+async def test_static_limit_is_fifo():
+    limiter = ConcurrencyLimiter(2)
+    order = []
+
+    async def worker(i):
+        async with limiter.slot():
+            order.append(i)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(worker(i) for i in range(6)))
+    assert order == list(range(6))
+    assert limiter.limit == 2 and limiter.inflight == 0
+
+
+async def test_static_limit_ignores_latency():
+    limiter = ConcurrencyLimiter(4)
+    for _ in range(20):
+        await _cycle(limiter, 4, lambda busy: 0.01 * busy)
+    assert limiter.limit == 4
+
+
+async def test_adaptive_grows_while_latency_is_flat():
+    limiter = ConcurrencyLimiter(4, min_limit=1, max_limit=32)
+    for _ in range(50):
+        await _cycle(limiter, limiter.limit, lambda busy: 0.01)
+    assert limiter.limit == 32
+
+
+async def test_adaptive_settles_at_the_knee():
+    # Flat up to 8 in flight, then every extra request queues
+    knee = 8
+    limiter = ConcurrencyLimiter(4, min_limit=1, max_limit=64)
+    for _ in range(200):
+        await _cycle(limiter, limiter.limit, lambda busy: 0.01 * max(1, busy / knee))
+    assert knee <= limiter.limit <= 2 * knee
+
+
+async def test_adaptive_does_not_grow_when_app_limited():
+    limiter = ConcurrencyLimiter(8, min_limit=1, max_limit=64)
+    for _ in range(50):
+        await _cycle(limiter, 1, lambda busy: 0.01)
+    assert limiter.limit == 8
+
+
+async def test_cancelled_waiter_releases_nothing():
+    limiter = ConcurrencyLimiter(1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.sleep(0)
+    limiter.release()
+    assert limiter.inflight == 0
+    async with limiter.slot():
+        assert limiter.inflight == 1
+
+
+async def test_scheduler_exposes_adaptive_limit():
+    sched = TranslationScheduler(
+        FakeProvider(latency=0.001), max_concurrent=4,
+        adaptive_min_concurrent=2, adaptive_max_concurrent=16,
+    )
+    assert sched.snapshot()["limit"] == 4
+    for _ in range(10):
+        await asyncio.gather(*[sched.freeze(f"k{i}", f"t{i}", "fr", "en") for i in range(16)])
+    assert sched.snapshot()["limit"] > 4
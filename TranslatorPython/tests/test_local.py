@@ -0,0 +1,77 @@
+"""Tests for LocalProvider (synchronous models hosted in worker processes)."""
+
+import asyncio
+
+import pytest
+
+from translator.providers.local import LocalProvider
+
+DUMMY = "benchmark.local_model:DummyModel"
+
+
+async def test_translate_in_worker():
+    prov = LocalProvider(DUMMY, workers=1)
+    try:
+        assert await prov.translate("Bonjour.", "fr", "en") == "[en] Bonjour."
+    finally:
+        await prov.close()
+
+
+async def test_batch_split_across_workers_keeps_order():
+    prov = LocalProvider(DUMMY, workers=2)
+    try:
+        items = [(f"phrase {i}", "fr", "en") for i in range(5)]
+        out = await prov.translate_batch(items)
+        assert out == [f"[en] phrase {i}" for i in range(5)]
+        assert prov.local_snapshot() == {"workers": 2, "requests": 5, "chunks": 2}
+    finally:
+        await prov.close()
+
+
+async def test_batch_isolates_item_errors():
+    prov = LocalProvider(DUMMY, workers=1)
+    try:
+        ok, failed = await prov.translate_batch([("oui", "fr", "en"), ("non", None, "en")])
+        assert ok == "[en] oui"
+        assert isinstance(failed, ValueError)
+        with pytest.raises(ValueError):
+            await prov.translate("non", None, "en")
+    finally:
+        await prov.close()
+
+
+async def test_cpu_work_does_not_block_event_loop():
+    prov = LocalProvider(DUMMY, workers=1)
+    try:
+        await prov.translate("warm-up", "fr", "en")  # worker spawned, model loaded
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        await prov.translate("x" * 10_000, "fr", "en")  # ~200 ms of CPU
+        beat.cancel()
+        assert ticks >= 5
+    finally:
+        await prov.close()
+
+
+async def test_warm_up_spawns_every_worker():
+    prov = LocalProvider(DUMMY, workers=2)
+    try:
+        await prov.warm_up()
+        assert len(prov._executor._processes) == 2
+        assert prov.local_snapshot()["chunks"] == 0
+    finally:
+        await prov.close()
+
+
+def test_bad_factory_fails_fast():
+    with pytest.raises(ValueError):
+        LocalProvider("no_colon", workers=1)
+    with pytest.raises(AttributeError):
+        LocalProvider("translator.providers.local:Missing", workers=1)
@@ -7,9 +7,17 @@ import json
 
 import pytest
 
+from translator import codec
 from translator.pipeline import Pipeline
 
 
+def wire_payload(transcription, translated, target_lang, *, final):
+    """Transcription message in, translation message out, both as JSON."""
+    decoded = codec.decode_transcription(json.dumps(transcription), "gemma")
+    payload = Pipeline._build_payload(decoded, translated, target_lang, final=final)
+    return json.loads(codec.encode_translation(payload))
+
+
 class TestOutgoingTranslationPayload:
     """Verify outgoing translation payload has exact fields."""
 
@@ -29,7 +37,7 @@ class TestOutgoingTranslationPayload:
                 {"targetLang": "en", "translator": "gemma"}
             ],
         }
-        payload = Pipeline._build_payload(transcription, "Hello, welcome", "en", final=True)
+        payload = wire_payload(transcription, "Hello, welcome", "en", final=True)
 
         expected_keys = {
             "segmentId", "astart", "text", "start", "end",
@@ -52,7 +60,7 @@ class TestOutgoingTranslationPayload:
                 {"targetLang": "de", "translator": "test"}
             ],
         }
-        payload = Pipeline._build_payload(transcription, "Hallo Welt", "de", final=True)
+        payload = wire_payload(transcription, "Hallo Welt", "de", final=True)
 
         assert payload["segmentId"] == 42
         assert payload["astart"] == "2026-02-06T21:01:00.570Z"
@@ -76,7 +84,7 @@ class TestOutgoingTranslationPayload:
             "lang": "en-US",
             "externalTranslations": [],
         }
-        payload = Pipeline._build_payload(transcription, "Test", "fr", final=False)
+        payload = wire_payload(transcription, "Test", "fr", final=False)
         assert payload["locutor"] is None
         assert payload["final"] is False
 
@@ -92,10 +100,61 @@ class TestOutgoingTranslationPayload:
             "locutor": None,
             "externalTranslations": [],
         }
-        payload = Pipeline._build_payload(transcription, "Hello", "en", final=True)
-        serialized = json.dumps(payload)
-        deserialized = json.loads(serialized)
-        assert deserialized == payload
+        decoded = codec.decode_transcription(json.dumps(transcription), "gemma")
+        payload = Pipeline._build_payload(decoded, "Hello", "en", final=True)
+        deserialized = json.loads(codec.encode_translation(payload))
+        assert deserialized == payload.to_dict()
+
+    def test_stdlib_fallback_same_wire_format(self, monkeypatch):
+        """Without orjson, the same JSON document goes out."""
+        transcription = {
+            "segmentId": 3,
+            "astart": "2026-01-01T00:00:00Z",
+            "text": "Ça marche",
+            "start": 0,
+            "end": 1.0,
+            "lang": "fr-FR",
+            "locutor": "é",
+        }
+        fast = wire_payload(transcription, "Ça va", "en", final=True)
+        monkeypatch.setattr(codec, "orjson", None)
+        assert wire_payload(transcription, "Ça va", "en", final=True) == fast
+
+
+class TestIncomingTranscription:
+    """Decoding of transcriber messages."""
+
+    def test_keeps_only_own_targets(self):
+        message = json.dumps({
+            "segmentId": 7,
+            "text": "Bonjour",
+            "lang": "fr-FR",
+            "translations": {"en": "Hello"},
+            "externalTranslations": [
+                {"targetLang": "en", "translator": "gemma"},
+                {"targetLang": "de", "translator": "other"},
+                {"targetLang": "it", "translator": "gemma"},
+            ],
+        }).encode()
+        t = codec.decode_transcription(message, "gemma")
+        assert t.segment_id == 7
+        assert t.text == "Bonjour"
+        assert t.lang == "fr-FR"
+        assert t.targets == ["en", "it"]
+
+    def test_missing_fields(self):
+        t = codec.decode_transcription(b'{"segmentId": 1}', "gemma")
+        assert t.text == ""
+        assert t.lang is None
+        assert t.targets == []
+
+    @pytest.mark.parametrize("raw", [b"not json", b"[1, 2]", b"\xff\xfe"])
+    def test_invalid_payload_raises_decode_error(self, raw, monkeypatch):
+        with pytest.raises(codec.DecodeError):
+            codec.decode_transcription(raw, "gemma")
+        monkeypatch.setattr(codec, "orjson", None)
+        with pytest.raises(codec.DecodeError):
+            codec.decode_transcription(raw, "gemma")
 
 
 class TestStatusMessageFormat:
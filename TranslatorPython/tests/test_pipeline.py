@@ -4,8 +4,13 @@ import asyncio
 
 import pytest
 
+from translator.cache import TranslationCache
+from translator.codec import Transcription
+from translator.journal import Journal, read_journal
 from translator.pipeline import Pipeline
-from translator.providers.base import TranslationProvider
+from translator.providers.base import TranslationProvider, UntranslatedText
+from translator.providers.cache import CachedProvider
+from translator.providers.journal import JournalProvider
 
 
 class FakeProvider(TranslationProvider):
@@ -25,22 +30,22 @@ class PublishLog:
         self.events: list[tuple[str, dict]] = []
 
     async def publish(self, session_id, channel_id, action, payload, key):
-        self.events.append((action, payload))
+        self.events.append((action, payload.to_dict()))
 
 
 def trans(text, seg=1, lang="fr-FR"):
-    return {
-        "segmentId": seg,
-        "astart": "2026-01-01T00:00:00Z",
-        "text": text,
-        "start": 0,
-        "end": 1.0,
-        "lang": lang,
-        "locutor": None,
-    }
+    return Transcription(
+        segment_id=seg,
+        astart="2026-01-01T00:00:00Z",
+        text=text,
+        start=0,
+        end=1.0,
+        lang=lang,
+        locutor=None,
+    )
 
 
-TARGETS = [{"targetLang": "en", "translator": "test"}]
+TARGETS = ["en"]
 
 
 def make_pipeline(provider, publog, **kw):
@@ -135,6 +140,54 @@ class TestTailLive:
         assert prov.calls == ["Bonjour tout le monde"]
 
 
+class PrefillProvider(TranslationProvider):
+    """Word-by-word "translation" (uppercase), recording prefilled prefixes."""
+
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.prefixes: list[str] = []
+
+    async def translate(self, text, source_lang, target_lang):
+        self.calls.append(text)
+        return text.upper()
+
+    async def translate_continue(self, text, source_lang, target_lang, prefix):
+        self.prefixes.append(prefix)
+        rest = text.split()[len(prefix.split()):]
+        return " ".join([prefix, *(w.upper() for w in rest)])
+
+
+class TestTailPrefill:
+    async def _feed(self, p, texts):
+        for text in texts:
+            await p.handle_partial("s", "c", trans(text), TARGETS)
+            await drain(p)
+
+    async def test_agreed_prefix_is_prefilled(self):
+        prov, log = PrefillProvider(), PublishLog()
+        p = make_pipeline(prov, log, tail_live_ms=1, min_new_chars=1, tail_prefill=True)
+        await self._feed(p, ["un deux trois", "un deux trois quatre", "un deux trois quatre cinq six"])
+        # Two full translations agree on "UN DEUX TROIS": only the rest is decoded
+        assert prov.calls == ["un deux trois", "un deux trois quatre"]
+        assert prov.prefixes == ["UN DEUX TROIS"]
+        assert log.events[-1][1]["text"] == "UN DEUX TROIS QUATRE CINQ SIX"
+        assert p._stats.tail_prefilled == 1
+
+    async def test_rewritten_source_is_retranslated_in_full(self):
+        prov, log = PrefillProvider(), PublishLog()
+        p = make_pipeline(prov, log, tail_live_ms=1, min_new_chars=1, tail_prefill=True)
+        await self._feed(p, ["un deux trois", "un deux trois quatre", "un de trois quatre cinq"])
+        assert prov.prefixes == []
+        assert prov.calls[-1] == "un de trois quatre cinq"
+
+    async def test_off_by_default(self):
+        prov, log = PrefillProvider(), PublishLog()
+        p = make_pipeline(prov, log, tail_live_ms=1, min_new_chars=1)
+        await self._feed(p, ["un deux trois", "un deux trois quatre", "un deux trois quatre cinq"])
+        assert prov.prefixes == []
+        assert len(prov.calls) == 3
+
+
 class TestFinals:
     async def test_final_reuses_frozen_and_tail(self):
         prov, log = FakeProvider(), PublishLog()
@@ -148,6 +201,35 @@ class TestFinals:
         assert log.events[-1][0] == "final"
         assert log.events[-1][1]["text"] == "T(Une phrase.) T(Et la suite)"
 
+    async def test_final_reuses_inflight_tail(self):
+        # The final lands while its remainder is still being translated as a tail
+        prov, log = FakeProvider(latency=0.05), PublishLog()
+        p = make_pipeline(prov, log, tail_live_ms=100, min_new_chars=1)
+        text = "Bonjour. Tout le monde est là"
+        await p.handle_partial("s", "c", trans(text), TARGETS)
+        await asyncio.sleep(0.01)
+        await p.handle_final("s", "c", trans(text), TARGETS)
+        await drain(p, 0.2)
+        assert sorted(prov.calls) == ["Bonjour.", "Tout le monde est là"]
+        assert p.scheduler.stats.cancelled == 0
+        assert log.events[-1][1]["text"] == "T(Bonjour.) T(Tout le monde est là)"
+
+    async def test_final_aborts_inflight_tail_it_cannot_reuse(self):
+        class SlowTailProvider(FakeProvider):
+            async def translate(self, text, source_lang, target_lang):
+                if text == "Tout le monde":
+                    await asyncio.sleep(0.1)
+                return await super().translate(text, source_lang, target_lang)
+
+        prov, log = SlowTailProvider(latency=0.02), PublishLog()
+        p = make_pipeline(prov, log, tail_live_ms=100, min_new_chars=1)
+        await p.handle_partial("s", "c", trans("Bonjour. Tout le monde"), TARGETS)
+        await asyncio.sleep(0.01)
+        await p.handle_final("s", "c", trans("Bonjour. Tout le monde est là."), TARGETS)
+        await drain(p, 0.2)
+        assert p.scheduler.stats.cancelled == 1
+        assert log.events[-1][1]["text"] == "T(Bonjour.) T(Tout le monde est là.)"
+
     async def test_final_translates_only_remainder(self):
         prov, log = FakeProvider(), PublishLog()
         p = make_pipeline(prov, log)  # tail live OFF
@@ -172,6 +254,23 @@ class TestFinals:
         assert prov.calls == ["Une phrase.", "Et la suite"]  # remainder only
         assert log.events[-1][1]["text"] == "T(Une phrase.) T(Et la suite)"
 
+    async def test_final_retries_untranslated_placeholders(self):
+        class DownThenUp(FakeProvider):
+            async def translate(self, text, source_lang, target_lang):
+                self.calls.append(text)
+                if len(self.calls) == 1:
+                    return UntranslatedText(text)
+                return f"T({text})"
+
+        prov, log = DownThenUp(), PublishLog()
+        p = make_pipeline(prov, log)
+        await p.handle_partial("s", "c", trans("Une phrase. Et la suite"), TARGETS)
+        await drain(p)
+        assert log.events[-1][1]["text"] == "Une phrase."
+        await p.handle_final("s", "c", trans("Une phrase. Et la suite"), TARGETS)
+        await drain(p)
+        assert log.events[-1][1]["text"] == "T(Une phrase. Et la suite)"
+
     async def test_final_rewritten_full_retranslation(self):
         prov, log = FakeProvider(), PublishLog()
         p = make_pipeline(prov, log)
@@ -183,6 +282,16 @@ class TestFinals:
         assert prov.calls[-1] == rewritten  # one full retranslation
         assert log.events[-1][1]["text"] == f"T({rewritten})"
 
+    async def test_full_retranslation_cancels_pending_freezes(self):
+        prov, log = FakeProvider(latency=0.1), PublishLog()
+        p = make_pipeline(prov, log)
+        await p.handle_partial("s", "c", trans("Une phrase. Et la suite"), TARGETS)
+        await drain(p, 0.01)
+        await p.handle_final("s", "c", trans("Une phrase, et la suite."), TARGETS)
+        await drain(p, 0.25)
+        assert [e[0] for e in log.events] == ["final"]
+        assert p.scheduler.snapshot()["cancelled"] == 1
+
     async def test_final_does_not_block_caller(self):
         # D12 fix: handle_final must return immediately even with a slow provider
         prov, log = FakeProvider(latency=0.5), PublishLog()
@@ -197,16 +306,132 @@ class TestFinals:
     async def test_final_publishes_all_targets(self):
         prov, log = FakeProvider(), PublishLog()
         p = make_pipeline(prov, log)
-        targets = [
-            {"targetLang": "en", "translator": "t"},
-            {"targetLang": "de", "translator": "t"},
-        ]
-        await p.handle_final("s", "c", trans("Phrase."), targets)
+        await p.handle_final("s", "c", trans("Phrase."), ["en", "de"])
         await drain(p)
         finals = [e for e in log.events if e[0] == "final"]
         assert {e[1]["targetLang"] for e in finals} == {"en", "de"}
 
 
+class StreamingProvider(FakeProvider):
+    """Yields the translation word by word."""
+
+    async def translate_stream(self, text, source_lang, target_lang):
+        self.calls.append(text)
+        for word in text.split():
+            await asyncio.sleep(0.005)
+            yield f"{word.upper()} "
+
+
+class TestStreaming:
+    async def test_final_published_progressively(self):
+        prov, log = StreamingProvider(), PublishLog()
+        p = make_pipeline(prov, log, stream_publish_ms=1)
+        await p.handle_final("s", "c", trans("un deux trois quatre"), TARGETS)
+        await drain(p, 0.1)
+        partials = [e[1]["text"] for e in log.events if e[0] == "partial"]
+        assert partials == ["UN", "UN DEUX", "UN DEUX TROIS"]
+        assert log.events[-1] == ("final", log.events[-1][1])
+        assert log.events[-1][1]["text"] == "UN DEUX TROIS QUATRE"
+
+    async def test_final_remainder_streams_after_frozen_prefix(self):
+        prov, log = StreamingProvider(), PublishLog()
+        p = make_pipeline(prov, log, stream_publish_ms=1)
+        await p.handle_partial("s", "c", trans("Une phrase. Et la"), TARGETS)
+        await drain(p)
+        await p.handle_final("s", "c", trans("Une phrase. Et la suite"), TARGETS)
+        await drain(p, 0.1)
+        texts = [e[1]["text"] for e in log.events]
+        assert "UNE PHRASE. ET" in texts
+        assert texts[-1] == "UNE PHRASE. ET LA SUITE"
+
+    async def test_disabled_by_default(self):
+        prov, log = StreamingProvider(), PublishLog()
+        p = make_pipeline(prov, log)
+        await p.handle_final("s", "c", trans("un deux trois quatre"), TARGETS)
+        await drain(p, 0.1)
+        assert [e[0] for e in log.events] == ["final"]
+        assert log.events[0][1]["text"] == "T(un deux trois quatre)"  # translate()
+
+
+class TestLanguageCanonicalization:
+    async def test_regional_variants_share_one_translation(self):
+        prov, log = FakeProvider(), PublishLog()
+        p = make_pipeline(prov, log)
+        targets = ["en-US", "en-GB", "de"]
+        await p.handle_partial("s", "c", trans("Une phrase. Et"), targets)
+        await drain(p)
+        await p.handle_final("s", "c", trans("Une phrase. Et la suite."), targets)
+        await drain(p)
+        assert sorted(prov.calls) == ["Et la suite.", "Et la suite.", "Une phrase.", "Une phrase."]
+        finals = {e[1]["targetLang"]: e[1]["text"] for e in log.events if e[0] == "final"}
+        assert finals == {
+            "en-US": "T(Une phrase.) T(Et la suite.)",
+            "en-GB": "T(Une phrase.) T(Et la suite.)",
+            "de": "T(Une phrase.) T(Et la suite.)",
+        }
+        partials = [e[1]["targetLang"] for e in log.events if e[0] == "partial"]
+        assert sorted(partials) == ["de", "en-GB", "en-US"]
+        assert p._states == {}
+
+    async def test_same_language_passthrough(self):
+        prov, log = FakeProvider(), PublishLog()
+        p = make_pipeline(prov, log)
+        await p.handle_partial("s", "c", trans(" Bonjour à"), ["fr", "en"])
+        await p.handle_final("s", "c", trans("Bonjour à tous."), ["fr"])
+        await drain(p)
+        assert prov.calls == []
+        assert [(e[0], e[1]["targetLang"], e[1]["text"]) for e in log.events] == [
+            ("partial", "fr", "Bonjour à"),
+            ("final", "fr", "Bonjour à tous."),
+        ]
+        assert p._stats.passthrough == 2
+
+    async def test_provider_decides_what_is_shared(self):
+        class RegionalProvider(FakeProvider):
+            def canonical_lang(self, lang):
+                return lang.lower()
+
+        prov, log = RegionalProvider(), PublishLog()
+        p = make_pipeline(prov, log)
+        await p.handle_final("s", "c", trans("Phrase.", lang="en-US"), ["en-US", "en-GB"])
+        await drain(p)
+        assert prov.calls == ["Phrase."]
+        assert [(e[1]["targetLang"], e[1]["text"]) for e in log.events] == [
+            ("en-US", "Phrase."),
+            ("en-GB", "T(Phrase.)"),
+        ]
+
+
+class TestUntranslatableGate:
+    async def test_no_request_for_untranslatable_chunks(self):
+        prov, log = FakeProvider(), PublishLog()
+        p = make_pipeline(prov, log)
+        await p.handle_partial("s", "c", trans("Bonjour. Euh ! 42. Et"), TARGETS)
+        await drain(p)
+        assert prov.calls == ["Bonjour."]
+        assert log.events[-1][1]["text"] == "T(Bonjour.) Uh ! 42."
+        assert p._stats.untranslatable == 2
+
+    async def test_final_and_tail(self):
+        prov, log = FakeProvider(), PublishLog()
+        p = make_pipeline(prov, log, tail_live_ms=1, min_new_chars=1)
+        await p.handle_partial("s", "c", trans("Euh"), TARGETS)
+        await drain(p)
+        assert log.events[-1][1]["text"] == "Uh"
+        await p.handle_final("s", "c", trans("..."), TARGETS)
+        await drain(p)
+        assert prov.calls == []
+        assert log.events[-1][0] == "final" and log.events[-1][1]["text"] == "..."
+
+    async def test_disabled(self):
+        prov, log = FakeProvider(), PublishLog()
+        p = make_pipeline(prov, log, untranslatable_gate=False)
+        await p.handle_final("s", "c", trans("42."), TARGETS)
+        await drain(p)
+        assert prov.calls == ["42."]
+        assert p._stats.untranslatable == 0
+
+
 class TestSegmentLifecycle:
     async def test_new_segment_resets_state(self):
         prov, log = FakeProvider(), PublishLog()
@@ -230,6 +455,17 @@ class TestSegmentLifecycle:
         assert prov.calls == ["Bonjour monde.", "Bonsoir monde."]
         assert log.events[-1][1]["text"] == "T(Bonsoir monde.)"
 
+    async def test_asr_rewrite_cancels_inflight_freeze(self):
+        prov, log = FakeProvider(latency=0.2), PublishLog()
+        p = make_pipeline(prov, log)
+        await p.handle_partial("s", "c", trans("Bonjour monde."), TARGETS)
+        await drain(p, 0.01)
+        await p.handle_partial("s", "c", trans("Bonsoir monde."), TARGETS)  # rewrite
+        await drain(p, 0.3)
+        # The stale freeze never completed nor published
+        assert [e[1]["text"] for e in log.events] == ["T(Bonsoir monde.)"]
+        assert p.scheduler.snapshot()["cancelled"] == 1
+
 
 class TestRobustness:
     async def test_unsupported_lang_does_not_crash(self):
@@ -259,3 +495,45 @@ class TestRobustness:
         await asyncio.sleep(0)
         assert first.cancelled() or first.done()
         await p.stop()
+
+
+class TestWarmUp:
+    async def test_one_request_per_target_then_forgotten(self):
+        prov, log = FakeProvider(), PublishLog()
+        p = make_pipeline(prov, log)
+        report = await p.warm_up(["en", "fr", "de"], timeout_s=5)
+        assert report["ok"] == report["requests"] == 3
+        assert not report["timed_out"]
+        assert report["segmenters"] >= 2  # en, fr, de all have pySBD rules
+        assert len(prov.calls) == 3
+        assert log.events == []  # nothing published
+        assert p.scheduler._key_locks == {} and p.scheduler._tails == {}
+
+    async def test_regional_variants_warmed_once(self):
+        prov, log = FakeProvider(), PublishLog()
+        p = make_pipeline(prov, log)
+        report = await p.warm_up(["en-US", "en-GB", "en"], timeout_s=5)
+        assert report["ok"] == report["requests"] == 1
+
+    async def test_bounded_by_timeout(self):
+        prov, log = FakeProvider(latency=5), PublishLog()
+        p = make_pipeline(prov, log)
+        report = await p.warm_up(["en", "de"], timeout_s=0.05)
+        assert report["timed_out"] and report["ok"] == 0
+        assert report["seconds"] < 1
+        await drain(p)
+
+    async def test_bypasses_cache_and_journal(self, tmp_path):
+        prov, log = FakeProvider(), PublishLog()
+        journal = Journal(tmp_path / "journal.jsonl.gz")
+        cached = CachedProvider(JournalProvider(prov, journal), TranslationCache(100))
+        p = make_pipeline(cached, log)
+        await p.warm_up(["en", "de"], timeout_s=5)
+        await p.warm_up(["en", "de"], timeout_s=5)
+        assert len(prov.calls) == 4  # every warm-up reaches the backend
+        assert cached.cache_snapshot()["entries"] == 0
+        assert await cached.translate("Une phrase.", "fr", "en") == "T(Une phrase.)"
+        assert cached.cache_snapshot()["entries"] == 1  # real traffic is cached
+        await cached.close()
+        assert [r["text"] for r in read_journal(journal.path)] == ["Une phrase."]
+        assert p.scheduler.inflight == 0  # warm-up requests were cancelled
@@ -0,0 +1,230 @@
+"""Tests for the shared translation memory (RemoteCache backends + CachedProvider)."""
+
+import asyncio
+
+import pytest
+
+from translator.cache import TranslationCache, cache_key
+from translator.providers.base import TranslationProvider
+from translator.providers.cache import CachedProvider
+from translator.remote_cache import MemoryRemoteCache, RespCache, open_remote_cache
+
+
+class SlowProvider(TranslationProvider):
+    def __init__(self, latency: float = 0.05) -> None:
+        self.latency = latency
+        self.calls: list[str] = []
+        self.cancelled = 0
+
+    async def translate(self, text, source_lang, target_lang):
+        self.calls.append(text)
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"T({text})"
+
+    async def translate_stream(self, text, source_lang, target_lang):
+        self.calls.append(text)
+        for word in text.split():
+            await asyncio.sleep(self.latency)
+            yield f"{word.upper()} "
+
+
+def key(text, src="fr", tgt="en"):
+    return cache_key(text, src, tgt)
+
+
+def replica(shared: dict, provider=None, latency_s=0.0, deadline_s=0.02):
+    remote = MemoryRemoteCache(shared, latency_s=latency_s, deadline_s=deadline_s)
+    return CachedProvider(provider or SlowProvider(), TranslationCache(100), remote=remote)
+
+
+class FakeRespServer:
+    """Minimal Redis-protocol server: AUTH, SELECT, GET, MGET, SET [EX]."""
+
+    def __init__(self, password: str | None = None, delay: float = 0.0) -> None:
+        self.password = password
+        self.delay = delay
+        self.data: dict[int, dict[str, str]] = {}
+        self.commands: list[list[str]] = []
+        self._server: asyncio.AbstractServer | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}127.0.0.1:{port}/2"
+
+    async def close(self) -> None:
+        self._server.close()
+        for writer in self._writers:
+            writer.close()
+        await self._server.wait_closed()
+
+    @staticmethod
+    def _bulk(value: str | None) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        data = value.encode()
+        return b"$%d\r\n%s\r\n" % (len(data), data)
+
+    async def _handle(self, reader, writer) -> None:
+        db, authed = 0, self.password is None
+        self._writers.add(writer)
+        try:
+            while True:
+                count = int((await reader.readuntil(b"\r\n"))[1:-2])
+                args = []
+                for _ in range(count):
+                    size = int((await reader.readuntil(b"\r\n"))[1:-2])
+                    args.append((await reader.readexactly(size + 2))[:-2].decode())
+                self.commands.append(args)
+                cmd, store = args[0].upper(), self.data.setdefault(db, {})
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                if cmd == "AUTH":
+                    authed = args[1] == self.password
+                    writer.write(b"+OK\r\n" if authed else b"-WRONGPASS invalid password\r\n")
+                elif not authed:
+                    writer.write(b"-NOAUTH Authentication required.\r\n")
+                elif cmd == "SELECT":
+                    db = int(args[1])
+                    writer.write(b"+OK\r\n")
+                elif cmd == "GET":
+                    writer.write(self._bulk(store.get(args[1])))
+                elif cmd == "MGET":
+                    writer.write(b"*%d\r\n" % (len(args) - 1) + b"".join(
+                        self._bulk(store.get(k)) for k in args[1:]
+                    ))
+                elif cmd == "SET":
+                    store[args[1]] = args[2]
+                    writer.write(b"+OK\r\n")
+                else:
+                    writer.write(b"-ERR unknown command\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+
+class TestMemoryRemoteCache:
+    async def test_shared_between_replicas_and_counted(self):
+        shared: dict[str, str] = {}
+        a, b = MemoryRemoteCache(shared), MemoryRemoteCache(shared)
+        a.put(key("Merci."), "Thanks.")
+        await asyncio.sleep(0)
+        assert await b.get_many([key("Merci."), key("Oui.")]) == ["Thanks.", None]
+        snap = b.snapshot()
+        assert (snap["hits"], snap["misses"], snap["hit_rate"]) == (1, 1, 0.5)
+        assert a.snapshot()["writes"] == 1
+
+    async def test_slow_read_is_a_miss_at_the_deadline(self):
+        cache = MemoryRemoteCache({}, latency_s=1.0, deadline_s=0.02)
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        assert await cache.get(key("Oui.")) is None
+        assert loop.time() - t0 < 0.2
+        assert cache.snapshot()["timeouts"] == 1
+        assert cache.snapshot()["max_read_ms"] >= 15
+
+    async def test_writes_bounded(self):
+        cache = MemoryRemoteCache({}, latency_s=0.05, max_pending_writes=2)
+        for i in range(4):
+            cache.put(key(f"{i}."), "x")
+        await cache.close()
+        assert cache.snapshot()["writes"] == 2
+        assert cache.snapshot()["dropped_writes"] == 2
+
+    def test_open_by_url(self):
+        assert isinstance(open_remote_cache("memory://"), MemoryRemoteCache)
+        assert isinstance(open_remote_cache("redis://cache:6380/1"), RespCache)
+        with pytest.raises(ValueError):
+            open_remote_cache("http://cache")
+
+
+class TestCachedProviderRemote:
+    async def test_second_replica_served_remotely(self):
+        shared: dict[str, str] = {}
+        a, b = replica(shared), replica(shared)
+        assert await a.translate("Merci beaucoup.", "fr", "en") == "T(Merci beaucoup.)"
+        await asyncio.sleep(0)  # fire-and-forget write
+        assert await b.translate("Merci beaucoup.", "fr", "en") == "T(Merci beaucoup.)"
+        assert b.inner.cancelled == 1  # the racing provider call was aborted
+        assert b.remote_cache_snapshot()["hits"] == 1
+        # Now in b's memory: no more remote reads
+        await b.translate("Merci beaucoup.", "fr", "en")
+        assert b.remote_cache_snapshot()["hits"] + b.remote_cache_snapshot()["misses"] == 1
+
+    async def test_slow_cache_adds_no_latency(self):
+        provider = SlowProvider(latency=0.05)
+        p = replica({}, provider, latency_s=1.0, deadline_s=0.5)
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        assert await p.translate("Oui.", "fr", "en") == "T(Oui.)"
+        assert loop.time() - t0 < 0.15  # the provider call, not the cache deadline
+        await p.close()
+
+    async def test_stream_served_remotely(self):
+        shared: dict[str, str] = {}
+        a, b = replica(shared), replica(shared)
+        assert "".join([x async for x in a.translate_stream("un deux", "fr", "en")]) == "UN DEUX "
+        await asyncio.sleep(0)
+        assert [x async for x in b.translate_stream("un deux", "fr", "en")] == ["UN DEUX"]
+        # Misses still stream from the provider
+        assert [x async for x in b.translate_stream("trois", "fr", "en")] == ["TROIS "]
+
+    async def test_batch_consults_remote(self):
+        shared: dict[str, str] = {}
+        a, b = replica(shared), replica(shared)
+        await a.translate("Oui.", "fr", "en")
+        await asyncio.sleep(0)
+        results = await b.translate_batch([("Oui.", "fr", "en"), ("Non.", "fr", "en")])
+        assert results == ["T(Oui.)", "T(Non.)"]
+        assert b.inner.calls == ["Non."]
+
+
+class TestRespCache:
+    async def test_roundtrip_pipelined(self):
+        server = FakeRespServer(password="s3cret")
+        url = await server.start()
+        cache = RespCache(url, deadline_s=1.0, ttl_s=60)
+        cache.put(key("Oui."), "Yes.")
+        cache.put(key("Non."), "No.")
+        await asyncio.sleep(0.05)
+        assert await asyncio.gather(cache.get(key("Oui.")), cache.get(key("Peut-être."))) == [
+            "Yes.", None,
+        ]
+        assert await cache.get_many([key("Non."), key("Oui.")]) == ["No.", "Yes."]
+        assert server.commands[:2] == [["AUTH", "s3cret"], ["SELECT", "2"]]
+        assert ["EX", "60"] == server.commands[2][-2:]
+        assert list(server.data[2]) == [cache.remote_key(key("Oui.")), cache.remote_key(key("Non."))]
+        await cache.close()
+        await server.close()
+
+    async def test_late_reply_does_not_shift_the_next_ones(self):
+        server = FakeRespServer(delay=0.05)
+        url = await server.start()
+        cache = RespCache(url, deadline_s=0.02)
+        assert await cache.get(key("Oui.")) is None  # connect + deadline
+        cache.deadline_s = 1.0
+        cache.put(key("Oui."), "Yes.")
+        await asyncio.sleep(0.15)  # the late GET reply, then the SET reply
+        assert await cache.get(key("Oui.")) == "Yes."
+        assert cache.snapshot()["timeouts"] == 1
+        await cache.close()
+        await server.close()
+
+    async def test_unreachable_server_is_a_fast_miss(self):
+        server = FakeRespServer()
+        url = await server.start()
+        await server.close()
+        cache = RespCache(url, deadline_s=0.5)
+        assert await cache.get(key("Oui.")) is None
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        assert await cache.get(key("Oui.")) is None  # no reconnection storm
+        assert loop.time() - t0 < 0.01
+        assert cache.snapshot()["errors"] == 2
+        await cache.close()
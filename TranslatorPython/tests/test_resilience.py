@@ -0,0 +1,164 @@
+"""Tests for ResilientProvider (breaker, retry budget, fallback chain)."""
+
+import pytest
+
+from translator import codec
+from translator.cache import TranslationCache
+from translator.providers.base import InvalidRequestError, TranslationProvider, UntranslatedText
+from translator.providers.cache import CachedProvider
+from translator.providers.echo import PassthroughProvider
+from translator.providers.resilience import CircuitBreaker, CircuitOpenError, ResilientProvider
+
+
+class FlakyProvider(TranslationProvider):
+    """Fails the first `failures` calls (or always, with failures=-1)."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.calls = 0
+
+    async def translate(self, text, source_lang, target_lang):
+        self.calls += 1
+        if self.failures < 0 or self.calls <= self.failures:
+            raise RuntimeError("backend down")
+        return f"T({text})"
+
+
+def resilient(inner, **kw) -> ResilientProvider:
+    kw.setdefault("backoff_base_s", 0.0)
+    return ResilientProvider(inner, **kw)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        b = CircuitBreaker(failures=2, open_s=60)
+        b.failure()
+        assert b.allow()
+        b.failure()
+        assert b.state == "open" and not b.allow()
+
+    def test_half_open_single_trial(self):
+        b = CircuitBreaker(failures=1, open_s=0.0)
+        b.failure()
+        assert b.state == "half-open"
+        assert b.allow()
+        assert not b.allow()  # one trial at a time
+        b.success()
+        assert b.state == "closed"
+
+    def test_failed_trial_reopens(self):
+        b = CircuitBreaker(failures=1, open_s=0.0)
+        b.failure()
+        b.allow()
+        b.failure()
+        assert b.opens == 2
+
+
+class TestResilientProvider:
+    async def test_retry_within_budget(self):
+        inner = FlakyProvider(failures=1)
+        prov = resilient(inner, retry_budget=1.0)
+        assert await prov.translate("a", "fr", "en") == "T(a)"
+        assert inner.calls == 2
+        assert prov.resilience_snapshot()["retries"] == 1
+
+    async def test_retry_budget_exhausted(self):
+        inner = FlakyProvider(failures=-1)
+        prov = resilient(inner, retry_budget=0.1, breaker_failures=100)
+        for _ in range(15):
+            with pytest.raises(RuntimeError):
+                await prov.translate("a", "fr", "en")
+        snap = prov.resilience_snapshot()
+        assert snap["retries"] == 1  # ~10 requests earn one retry
+        assert inner.calls == 16
+
+    async def test_open_circuit_fails_fast(self):
+        inner = FlakyProvider(failures=-1)
+        prov = resilient(inner, max_retries=0, breaker_failures=2, breaker_open_s=60)
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await prov.translate("a", "fr", "en")
+        with pytest.raises(CircuitOpenError):
+            await prov.translate("a", "fr", "en")
+        assert inner.calls == 2
+        assert prov.resilience_snapshot()["rejected"] == 1
+
+    async def test_fallback_chain_ends_untranslated(self):
+        prov = resilient(
+            FlakyProvider(failures=-1), fallbacks=[FlakyProvider(failures=-1), PassthroughProvider()],
+            max_retries=0,
+        )
+        out = await prov.translate("Bonjour.", "fr", "en")
+        assert out == "Bonjour." and isinstance(out, UntranslatedText)
+        assert prov.resilience_snapshot()["fallbacks"] == 1
+
+    async def test_invalid_request_not_retried(self):
+        class Invalid(TranslationProvider):
+            calls = 0
+
+            async def translate(self, text, source_lang, target_lang):
+                self.calls += 1
+                raise InvalidRequestError("source_lang is required")
+
+        inner = Invalid()
+        prov = resilient(inner, retry_budget=1.0, fallbacks=[PassthroughProvider()])
+        with pytest.raises(InvalidRequestError):
+            await prov.translate("a", None, "en")
+        assert inner.calls == 1
+
+    async def test_malformed_response_is_a_backend_failure(self):
+        class Garbled(TranslationProvider):
+            calls = 0
+
+            async def translate(self, text, source_lang, target_lang):
+                self.calls += 1
+                return codec.loads(b'{"choices": [')  # truncated body
+
+        inner = Garbled()
+        prov = resilient(inner, retry_budget=1.0, fallbacks=[PassthroughProvider()])
+        out = await prov.translate("Bonjour.", "fr", "en")
+        assert isinstance(out, UntranslatedText)
+        assert inner.calls == 2  # retried (one credit), then the fallback
+
+    async def test_batch_failures_go_through_fallbacks(self):
+        class BatchDown(FlakyProvider):
+            async def translate_batch(self, items):
+                raise RuntimeError("batch endpoint down")
+
+        prov = resilient(BatchDown(failures=-1), fallbacks=[PassthroughProvider()], max_retries=0)
+        out = await prov.translate_batch([("a", "fr", "en"), ("b", "fr", "de")])
+        assert out == ["a", "b"]
+        assert all(isinstance(r, UntranslatedText) for r in out)
+
+    async def test_stream_falls_back_before_first_piece(self):
+        prov = resilient(FlakyProvider(failures=-1), fallbacks=[PassthroughProvider()])
+        pieces = [p async for p in prov.translate_stream("Bonjour.", "fr", "en")]
+        assert pieces == ["Bonjour."]
+
+    async def test_rejected_prefill_falls_back_to_full_translation(self):
+        class NoPrefill(FlakyProvider):
+            async def translate_continue(self, text, source_lang, target_lang, prefix):
+                raise RuntimeError("continue_final_message not supported")
+
+        inner = NoPrefill()
+        prov = resilient(inner, breaker_failures=1)
+        for _ in range(3):
+            assert await prov.translate_continue("Et la suite", "fr", "en", "And") == "T(Et la suite)"
+        assert inner.calls == 3
+        # A rejected prefill is no outage: the circuit stays closed
+        assert prov.resilience_snapshot()["circuits"] == "NoPrefill=closed"
+
+    async def test_prefill_skips_open_circuit(self):
+        inner = FlakyProvider(failures=-1)
+        prov = resilient(inner, fallbacks=[PassthroughProvider()], breaker_failures=1, max_retries=0)
+        await prov.translate("a", "fr", "en")  # opens the main circuit
+        calls = inner.calls
+        out = await prov.translate_continue("Et la suite", "fr", "en", "And")
+        assert out == "Et la suite" and isinstance(out, UntranslatedText)
+        assert inner.calls == calls  # neither the prefill nor a retry reached it
+
+    async def test_untranslated_never_cached(self):
+        inner = resilient(FlakyProvider(failures=1), fallbacks=[PassthroughProvider()], max_retries=0)
+        prov = CachedProvider(inner, TranslationCache())
+        assert isinstance(await prov.translate("a", "fr", "en"), UntranslatedText)
+        assert await prov.translate("a", "fr", "en") == "T(a)"
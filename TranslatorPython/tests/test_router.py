@@ -0,0 +1,134 @@
+"""Tests for RoutingProvider (per language pair providers and pools)."""
+
+import asyncio
+
+import pytest
+
+from translator.limiter import ConcurrencyLimiter
+from translator.providers.base import TranslationProvider
+from translator.providers.echo import EchoProvider
+from translator.providers.resilience import CircuitOpenError, ResilientProvider
+from translator.providers.router import Route, RouteSpec, RoutingProvider, parse_routes
+from translator.scheduler import TranslationScheduler
+
+
+class TaggedProvider(TranslationProvider):
+    def __init__(self, tag: str, latency: float = 0.0) -> None:
+        self.tag = tag
+        self.latency = latency
+        self.calls: list[str] = []
+        self.batches: list[int] = []
+
+    async def translate(self, text, source_lang, target_lang):
+        self.calls.append(text)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if text == "boom":
+            raise RuntimeError("down")
+        return f"{self.tag}({text})"
+
+    async def translate_batch(self, items):
+        self.batches.append(len(items))
+        return await super().translate_batch(items)
+
+
+def make_router(slow_latency=0.0, cap=2):
+    main, slow = TaggedProvider("main"), TaggedProvider("slow", slow_latency)
+    route = Route("*>mt,*>ga", [("*", "mt"), ("*", "ga")], slow, ConcurrencyLimiter(cap))
+    return RoutingProvider(main, [route]), main, slow
+
+
+def test_parse_routes():
+    routes = parse_routes(" *>mt, ga |translategemma|http://gpu-b:8000|2; fr>en|echo ;")
+    assert routes == [
+        RouteSpec([("*", "mt"), ("*", "ga")], "translategemma", "http://gpu-b:8000", 2),
+        RouteSpec([("fr", "en")], "echo", "", 8),
+    ]
+    assert routes[0].name == "*>mt,*>ga"
+    with pytest.raises(ValueError):
+        parse_routes("mt")
+    with pytest.raises(ValueError):
+        parse_routes("fr>|echo")
+
+
+def test_from_specs_loads_route_providers():
+    router = RoutingProvider.from_specs(EchoProvider(), parse_routes("mt|passthrough||3"))
+    assert router.routes[0].limiter.limit == 3
+    assert router.route_limiter("fr-FR", "mt") is router.routes[0].limiter
+    assert router.route_limiter("fr-FR", "en") is None
+
+
+async def test_pairs_go_to_their_route():
+    router, main, slow = make_router()
+    assert await router.translate("a", "fr-FR", "en") == "main(a)"
+    assert await router.translate("b", "fr-FR", "mt") == "slow(b)"
+    assert await router.translate_continue("c", "fr", "ga-IE", "") == "slow(c)"
+    assert "".join([p async for p in router.translate_stream("d", "fr", "mt")]) == "slow(d)"
+    with pytest.raises(RuntimeError):
+        await router.translate("boom", "fr", "mt")
+    assert main.calls == ["a"]
+    assert router.routes_snapshot() == {
+        "*>mt,*>ga": {"requests": 4, "errors": 1, "inflight": 0, "limit": 2},
+    }
+
+
+async def test_batch_split_per_route_in_order():
+    router, main, slow = make_router()
+    results = await router.translate_batch(
+        [("a", "fr", "en"), ("b", "fr", "mt"), ("c", "fr", "de"), ("boom", "fr", "ga")]
+    )
+    assert results[:3] == ["main(a)", "slow(b)", "main(c)"]
+    assert isinstance(results[3], RuntimeError)
+    assert main.batches == [2] and slow.batches == [2]
+    assert router.routes_snapshot()["*>mt,*>ga"]["errors"] == 1
+
+
+async def test_slow_route_never_takes_global_slots():
+    router, main, slow = make_router(slow_latency=0.2, cap=2)
+    sched = TranslationScheduler(router, max_concurrent=2, min_tail_interval_ms=0)
+    backlog = [
+        asyncio.create_task(sched.freeze(f"mt{i}", f"phrase {i}", "fr", "mt")) for i in range(6)
+    ]
+    await asyncio.sleep(0.01)
+    assert router.routes_snapshot()["*>mt,*>ga"]["inflight"] == 2
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+    assert await sched.freeze("en", "bonjour", "fr", "en") == "main(bonjour)"
+    assert loop.time() - t0 < 0.05  # not queued behind the slow pool
+    await asyncio.gather(*backlog)
+    assert len(slow.calls) == 6
+
+
+async def test_routed_requests_skip_the_global_token_budget():
+    router, main, slow = make_router()
+    sched = TranslationScheduler(router, max_concurrent=16, token_budget=100)
+    # 160 chars = 90 tokens each: routed requests never drain the bucket
+    for i in range(3):
+        await sched.freeze(f"mt{i}", f"{i}" + "x" * 159, "fr", "mt")
+    assert sched._bucket.admitted == 0
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+    await sched.freeze("en", "y" * 160, "fr", "en")
+    assert loop.time() - t0 < 0.05  # the main pairs' budget is intact
+    assert sched._bucket.admitted == 1
+
+
+async def test_failing_route_opens_its_own_circuit_only():
+    def stage(provider):
+        return ResilientProvider(provider, max_retries=0, breaker_failures=2, breaker_open_s=60)
+
+    wrapped = RoutingProvider.from_specs(EchoProvider(), parse_routes("mt|echo"), wrap=stage)
+    assert isinstance(wrapped.routes[0].provider, ResilientProvider)
+    failing = TaggedProvider("mt")
+    route = Route("*>mt", [("*", "mt")], stage(failing), ConcurrencyLimiter(2))
+    router = RoutingProvider(stage(TaggedProvider("main")), [route])
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await router.translate("boom", "fr", "mt")
+    with pytest.raises(CircuitOpenError):
+        await router.translate("a", "fr", "mt")
+    assert failing.calls == ["boom", "boom"]
+    # The other pairs still reach the default backend
+    assert await router.translate("b", "fr", "en") == "main(b)"
+    assert router.routes_snapshot()["*>mt"]["circuits"] == "TaggedProvider=open"
+    assert router.resilience_snapshot()["circuits"] == "TaggedProvider=closed"
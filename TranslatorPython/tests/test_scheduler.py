@@ -16,14 +16,18 @@ class FakeProvider(TranslationProvider):
         self.calls: list[str] = []
         self.inflight = 0
         self.max_inflight = 0
+        self.started = asyncio.Event()  # set once a call is running
 
     async def translate(self, text, source_lang, target_lang):
+        self.started.set()
         self.inflight += 1
         self.max_inflight = max(self.max_inflight, self.inflight)
         self.calls.append(text)
-        if self.latency:
-            await asyncio.sleep(self.latency)
-        self.inflight -= 1
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+        finally:
+            self.inflight -= 1
         return f"T({text})"
 
 
@@ -66,9 +70,10 @@ async def test_tail_latest_wins():
     async def on_done(version, src, dst):
         done.append((version, dst))
 
-    # v1 fires; v2-v4 are superseded while v1 is in flight; v5 fires last
+    # v1 fires and is cancelled by v2; v2-v4 are superseded in the pending
+    # slot; v5 fires last
     sched.submit_tail("k", "texte v1", "fr", "en", 1, on_done)
-    await asyncio.sleep(0.005)  # let v1 actually start
+    await asyncio.wait_for(prov.started.wait(), 1)  # v1 actually started
     for v in range(2, 6):
         sched.submit_tail("k", f"texte v{v}", "fr", "en", v, on_done)
     await asyncio.sleep(0.2)
@@ -76,8 +81,9 @@ async def test_tail_latest_wins():
     assert prov.calls[0] == "texte v1"
     assert prov.calls[-1] == "texte v5"
     assert len(prov.calls) == 2  # never more than first + latest
-    assert done[-1] == (5, "T(texte v5)")
-    assert sched.stats.tail_superseded == 3
+    assert done == [(5, "T(texte v5)")]
+    assert sched.stats.tail_superseded == 4
+    assert sched.stats.cancelled == 1
 
 
 @pytest.mark.asyncio
@@ -128,6 +134,51 @@ async def test_cancel_key_drops_pending():
     assert "jamais envoyé" not in prov.calls
 
 
+@pytest.mark.asyncio
+async def test_cancel_key_aborts_inflight_tail():
+    prov = FakeProvider(latency=0.1)
+    sched = TranslationScheduler(prov, max_concurrent=1, min_tail_interval_ms=0)
+    done = []
+
+    async def on_done(version, src, dst):
+        done.append(version)
+
+    sched.submit_tail("k", "en vol", "fr", "en", 1, on_done)
+    await asyncio.sleep(0.01)
+    sched.cancel_key("k")
+    # The slot is free again right away, not after the 100 ms call
+    await asyncio.wait_for(sched.freeze("k2", "ensuite", "fr", "en"), 0.15)
+    await asyncio.sleep(0.15)
+    assert done == []
+    assert sched.snapshot()["cancelled"] == 1
+    assert prov.inflight == 0
+
+
+@pytest.mark.asyncio
+async def test_settle_tail_waits_for_matching_inflight_tail():
+    prov = FakeProvider(latency=0.05)
+    sched = TranslationScheduler(prov, max_concurrent=8, min_tail_interval_ms=0)
+    done = []
+
+    async def on_done(version, src, dst):
+        done.append(dst)
+
+    sched.submit_tail("k", "en  vol", "fr", "en", 1, on_done)
+    await asyncio.sleep(0.01)
+    sched.drop_pending_tail("k")
+    await sched.settle_tail("k", "en vol")
+    assert done == ["T(en  vol)"]
+    assert prov.calls == ["en  vol"]
+    assert sched.snapshot()["cancelled"] == 0
+
+    sched.submit_tail("k", "autre chose", "fr", "en", 3, on_done)
+    await asyncio.sleep(0.01)
+    await sched.settle_tail("k", "pas pareil")
+    await asyncio.sleep(0.1)
+    assert sched.snapshot()["cancelled"] == 1
+    assert len(done) == 1
+
+
 @pytest.mark.asyncio
 async def test_provider_error_does_not_kill_runner():
     class FailOnce(FakeProvider):
@@ -149,3 +200,224 @@ async def test_provider_error_does_not_kill_runner():
     await asyncio.sleep(0.05)
     assert done == [2]
     assert sched.stats.errors == 1
+
+
+class BatchRecorder(FakeProvider):
+    """Records the size of every translate_batch() call."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        super().__init__(latency)
+        self.batches: list[int] = []
+
+    async def translate_batch(self, items):
+        self.batches.append(len(items))
+        return await super().translate_batch(items)
+
+
+@pytest.mark.asyncio
+async def test_batching_coalesces_fanout():
+    prov = BatchRecorder()
+    sched = TranslationScheduler(prov, max_concurrent=16, batch_window_ms=10)
+    langs = ["en", "de", "es", "it", "pt"]
+    out = await asyncio.gather(*[
+        sched.freeze(f"k/{lg}", "Bonjour.", "fr", lg) for lg in langs
+    ])
+    assert out == ["T(Bonjour.)"] * 5
+    assert prov.batches == [5]  # ONE provider call for the whole fan-out
+    assert sched.snapshot()["batches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batching_flushes_at_max_size():
+    prov = BatchRecorder()
+    sched = TranslationScheduler(prov, max_concurrent=16, batch_window_ms=1000, batch_max_size=3)
+    await asyncio.wait_for(asyncio.gather(*[
+        sched.freeze(f"k{i}", f"t{i}", "fr", "en") for i in range(6)
+    ]), timeout=0.5)  # never waits for the 1 s window
+    assert prov.batches == [3, 3]
+
+
+@pytest.mark.asyncio
+async def test_batching_isolates_item_errors():
+    class FailOne(BatchRecorder):
+        async def translate(self, text, source_lang, target_lang):
+            if text == "boom":
+                raise RuntimeError("bad item")
+            return await super().translate(text, source_lang, target_lang)
+
+    sched = TranslationScheduler(FailOne(), max_concurrent=8, batch_window_ms=5)
+    ok, failed = await asyncio.gather(
+        sched.freeze("a", "ok", "fr", "en"),
+        sched.freeze("b", "boom", "fr", "en"),
+        return_exceptions=True,
+    )
+    assert ok == "T(ok)"
+    assert isinstance(failed, RuntimeError)
+
+
+@pytest.mark.asyncio
+async def test_batching_respects_global_cap():
+    prov = BatchRecorder()
+    sched = TranslationScheduler(prov, max_concurrent=2, batch_window_ms=5)
+    await asyncio.gather(*[sched.freeze(f"k{i}", f"t{i}", "fr", "en") for i in range(6)])
+    assert max(prov.batches) <= 2
+
+
+@pytest.mark.asyncio
+async def test_singleflight_shares_identical_inflight():
+    prov = FakeProvider(latency=0.02)
+    sched = TranslationScheduler(prov, max_concurrent=8)
+    out = await asyncio.gather(*[
+        sched.freeze(f"session{i}/0/en", "Bonjour.", "fr", "en") for i in range(4)
+    ])
+    assert out == ["T(Bonjour.)"] * 4
+    assert prov.calls == ["Bonjour."]
+    assert sched.snapshot()["singleflight_hits"] == 3
+
+
+@pytest.mark.asyncio
+async def test_singleflight_distinct_targets_not_shared():
+    prov = FakeProvider(latency=0.01)
+    sched = TranslationScheduler(prov, max_concurrent=8)
+    await asyncio.gather(
+        sched.freeze("a", "Bonjour.", "fr", "en"),
+        sched.freeze("b", "Bonjour.", "fr", "de"),
+    )
+    assert len(prov.calls) == 2
+    assert sched.stats.singleflight_hits == 0
+
+
+@pytest.mark.asyncio
+async def test_singleflight_survives_one_waiter_cancelled():
+    prov = FakeProvider(latency=0.05)
+    sched = TranslationScheduler(prov, max_concurrent=8)
+    first = asyncio.create_task(sched.freeze("a", "Bonjour.", "fr", "en"))
+    second = asyncio.create_task(sched.freeze("b", "Bonjour.", "fr", "en"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == "T(Bonjour.)"  # the shared call kept running
+    assert prov.calls == ["Bonjour."]
+
+
+@pytest.mark.asyncio
+async def test_singleflight_cancelled_with_last_waiter():
+    prov = FakeProvider(latency=0.05)
+    sched = TranslationScheduler(prov, max_concurrent=8)
+    task = asyncio.create_task(sched.freeze("a", "Bonjour.", "fr", "en"))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.sleep(0.01)
+    assert sched.inflight == 0  # provider call aborted, no one left to wait for it
+    assert sched._limiter.inflight == 0
+    assert sched._limiter.limit == 8
+
+
+class StreamingProvider(FakeProvider):
+    async def translate_stream(self, text, source_lang, target_lang):
+        self.calls.append(text)
+        for piece in ["Hel", "lo ", "wor", "ld, ", "frie", "nds."]:
+            await asyncio.sleep(self.latency)
+            yield piece
+
+
+@pytest.mark.asyncio
+async def test_stream_progress_at_word_boundaries():
+    sched = TranslationScheduler(StreamingProvider(latency=0.001), stream_interval_ms=1)
+    seen = []
+
+    async def on_progress(partial):
+        seen.append(partial)
+
+    out = await sched.freeze("k", "Bonjour le monde, les amis.", "fr", "en", on_progress)
+    assert out == "Hello world, friends."
+    # Complete words only; the last piece is never a progress update
+    assert seen == ["Hello", "Hello world,"]
+    assert sched.snapshot()["streams"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_singleflight_shares_progress():
+    prov = StreamingProvider(latency=0.005)
+    sched = TranslationScheduler(prov, stream_interval_ms=1)
+    seen_a, seen_b = [], []
+
+    async def a(partial):
+        seen_a.append(partial)
+
+    async def b(partial):
+        seen_b.append(partial)
+
+    out = await asyncio.gather(
+        sched.freeze("k1", "t", "fr", "en", a),
+        sched.freeze("k2", "t", "fr", "en", b),
+    )
+    assert out == ["Hello world, friends."] * 2
+    assert prov.calls == ["t"]
+    assert seen_a == seen_b == ["Hello", "Hello world,"]
+
+
+@pytest.mark.asyncio
+async def test_stream_without_interval_uses_translate():
+    prov = StreamingProvider()
+    sched = TranslationScheduler(prov)
+
+    async def on_progress(partial):
+        raise AssertionError("not streaming")
+
+    assert await sched.freeze("k", "t", "fr", "en", on_progress) == "T(t)"
+
+
+@pytest.mark.asyncio
+async def test_token_budget_charges_estimated_tokens():
+    # 200 chars = 10 + 2 * 50 = 110 tokens; the bucket holds 1000 and
+    # refills 1000/s: the first 9 go at once, the 10th waits for the refill
+    prov = FakeProvider()
+    sched = TranslationScheduler(prov, max_concurrent=16, token_budget=1000)
+    t0 = asyncio.get_running_loop().time()
+    await asyncio.gather(*[sched.freeze(f"k{i}", f"{i}" + "x" * 199, "fr", "en") for i in range(10)])
+    elapsed = asyncio.get_running_loop().time() - t0
+    assert 0.08 <= elapsed < 0.3
+    assert sched.snapshot()["budget_throttled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_token_budget_is_fifo():
+    sched = TranslationScheduler(FakeProvider(), max_concurrent=16, token_budget=1000)
+    await sched.freeze("drain", "x" * 1800, "fr", "en")  # 910 tokens: 90 left
+    done = []
+
+    async def do(name, text):
+        await sched.freeze(name, text, "fr", "en")
+        done.append(name)
+
+    # The short request (12 tokens) would fit right away, but it queued
+    # behind the long one (210 tokens): no starvation of long finals
+    await asyncio.gather(do("long", "y" * 400), do("short", "Oui."))
+    assert done == ["long", "short"]
+
+
+@pytest.mark.asyncio
+async def test_token_budget_cancelled_waiter_spends_nothing():
+    sched = TranslationScheduler(FakeProvider(), max_concurrent=16, token_budget=100)
+    await sched.freeze("a", "x" * 160, "fr", "en")  # 90 tokens: bucket nearly empty
+    waiter = asyncio.create_task(sched.freeze("b", "x" * 160, "fr", "en"))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    await asyncio.sleep(0)
+    assert sched._bucket.admitted == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_while_queued_counted_apart():
+    prov = FakeProvider(latency=0.05)
+    sched = TranslationScheduler(prov, max_concurrent=1)
+    running = asyncio.create_task(sched.freeze("a", "un", "fr", "en"))
+    await asyncio.wait_for(prov.started.wait(), 1)
+    queued = asyncio.create_task(sched.freeze("b", "deux", "fr", "en"))
+    await asyncio.sleep(0.01)
+    queued.cancel()
+    await asyncio.gather(queued, return_exceptions=True)
+    await running
+    snap = sched.snapshot()
+    assert snap["cancelled_queued"] == 1 and snap["cancelled"] == 0
+    assert prov.calls == ["un"]
@@ -0,0 +1,71 @@
+"""Tests for SimulatedProvider (latency model, fault injection)."""
+
+import asyncio
+import statistics
+
+import pytest
+
+from translator.providers import load_provider
+from translator.providers.simulated import SimulatedError, SimulatedProvider
+
+
+def test_registered():
+    p = load_provider("simulated", base_ms=1, seed=0)
+    assert isinstance(p, SimulatedProvider)
+
+
+def test_unset_parameters_read_from_config(monkeypatch):
+    from translator import config
+
+    monkeypatch.setattr(config, "SIMULATED_BASE_MS", 50.0)
+    monkeypatch.setattr(config, "SIMULATED_JITTER_SIGMA", 0.3)
+    p = load_provider("simulated", per_token_ms=5, jitter_sigma=0)
+    assert p.per_token_s == pytest.approx(0.005)  # explicit values win
+    assert p.jitter_sigma == 0
+    assert p.base_s == pytest.approx(0.05)  # the others come from config
+
+
+def test_latency_grows_with_length_and_concurrency():
+    p = SimulatedProvider(base_ms=70, per_token_ms=31, concurrency_overhead=0.05, jitter_sigma=0)
+    short, long = "mot", "mot " * 100
+    assert p.latency(short) == pytest.approx(0.070 + 0.031)
+    assert p.latency(long) > 10 * p.latency(short)
+    assert p.latency(long, inflight=11) == pytest.approx(0.070 + 0.031 * 100 * 1.5)
+
+
+def test_jitter_is_lognormal_with_mean_one():
+    p = SimulatedProvider(base_ms=100, per_token_ms=0, jitter_sigma=0.5, seed=1)
+    draws = [p.latency("x") for _ in range(20000)]
+    assert statistics.fmean(draws) == pytest.approx(0.1, rel=0.03)
+    assert statistics.median(draws) < 0.1 < max(draws) / 2  # right-skewed
+
+
+async def test_echoes_and_counts_inflight():
+    p = SimulatedProvider(base_ms=20, per_token_ms=0, jitter_sigma=0)
+    task = asyncio.gather(*(p.translate(f"t{i}", "fr", "en") for i in range(5)))
+    await asyncio.sleep(0.005)
+    assert p.simulated_snapshot()["inflight"] == 5
+    assert await task == [f"t{i}" for i in range(5)]
+    assert p.simulated_snapshot() == {"inflight": 0, "requests": 5, "errors": 0, "stalls": 0}
+
+
+async def test_error_injection():
+    p = SimulatedProvider(base_ms=0, per_token_ms=0, jitter_sigma=0, error_rate=0.3, seed=2)
+    results = await asyncio.gather(
+        *(p.translate("x", "fr", "en") for _ in range(500)), return_exceptions=True
+    )
+    failures = [r for r in results if isinstance(r, SimulatedError)]
+    assert len(failures) == p.errors
+    assert 100 < p.errors < 200
+
+
+async def test_stall_injection():
+    p = SimulatedProvider(base_ms=0, per_token_ms=0, jitter_sigma=0, stall_rate=1.0, stall_s=10)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(p.translate("x", "fr", "en"), 0.05)
+    assert p.stalls == 1 and p.inflight == 0
+
+
+def test_rejects_bad_rates():
+    with pytest.raises(ValueError):
+        SimulatedProvider(base_ms=0, error_rate=1.5)
@@ -0,0 +1,59 @@
+"""Startup-time budget: a new replica must subscribe fast (autoscaling)."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmark.startup import DEFAULT_BUDGET_S, ROOT, measure_startup
+from translator.providers import (
+    available_providers,
+    builtin_providers,
+    load_provider,
+    load_provider_spec,
+)
+
+# Only imported once a provider/gate actually needs them
+HEAVY_MODULES = ["dotenv", "httpx", "multiprocessing", "pysbd", "rapidfuzz"]
+
+
+def test_echo_startup_skips_heavy_modules():
+    script = (
+        "import sys\n"
+        "import translator.config, translator.main, translator.mqtt_handler, translator.pipeline\n"
+        "from translator.providers import load_provider\n"
+        "load_provider('echo')\n"
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True,
+        env={**os.environ, "TRANSLATOR_NAME": "startup-test"},
+    )
+    assert out.stdout.strip() == "[]"
+
+
+@pytest.mark.benchmark
+async def test_cold_start_to_subscribed_within_budget():
+    assert await measure_startup("echo") < DEFAULT_BUDGET_S
+
+
+def test_registry_imports_provider_on_load():
+    assert load_provider("echo").__class__.__name__ == "EchoProvider"
+    assert set(builtin_providers()) <= set(available_providers())
+    # Built-ins are registered as entry points, like third-party providers
+    assert {"echo", "passthrough", "translategemma", "local"} <= set(builtin_providers())
+
+
+def test_unknown_provider_lists_available():
+    with pytest.raises(ValueError, match="translategemma"):
+        load_provider("nope")
+
+
+async def test_provider_spec_with_endpoint():
+    assert load_provider_spec("passthrough").__class__.__name__ == "PassthroughProvider"
+    prov = load_provider_spec("translategemma@http://gpu-b:8000")
+    try:
+        assert [e["url"] for e in prov.endpoints_snapshot()] == ["http://gpu-b:8000"]
+    finally:
+        await prov.close()
@@ -0,0 +1,146 @@
+"""Tests for the persistent translation memory (TranslationStore)."""
+
+import asyncio
+import sqlite3
+import threading
+
+from translator.cache import TranslationCache, cache_key
+from translator.providers.base import TranslationProvider
+from translator.providers.cache import CachedProvider
+from translator.store import TranslationStore
+
+
+class CountingProvider(TranslationProvider):
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def translate(self, text, source_lang, target_lang):
+        self.calls.append(text)
+        return f"T({text})"
+
+
+def key(text, tgt="en"):
+    return cache_key(text, "fr", tgt)
+
+
+async def test_roundtrip_survives_reopen(tmp_path):
+    path = tmp_path / "tm.db"
+    store = TranslationStore(path)
+    store.put(key("Merci."), "Thanks.")
+    assert await store.get(key("Merci.")) == "Thanks."  # served from the write buffer
+    await store.close()
+
+    reopened = TranslationStore(path)
+    assert await reopened.get(key("Merci.")) == "Thanks."
+    assert await reopened.get(key("Inconnu.")) is None
+    assert reopened.snapshot()["hits"] == 1
+    await reopened.close()
+
+
+async def test_writes_batched_off_loop(tmp_path):
+    store = TranslationStore(tmp_path / "tm.db", flush_interval_s=0.01)
+    for i in range(5):
+        store.put(key(f"Phrase {i}."), f"Sentence {i}.")
+    assert store.snapshot()["writes"] == 0  # put() never waits for the disk
+    await asyncio.sleep(0.1)
+    assert store.snapshot()["writes"] == 5
+    await store.close()
+
+
+async def test_reads_never_wait_for_the_writer(tmp_path):
+    store = TranslationStore(tmp_path / "tm.db")
+    store.put(key("Merci."), "Thanks.")
+    await store.close()
+    store = TranslationStore(tmp_path / "tm.db")
+    release = threading.Event()
+    busy = asyncio.ensure_future(store._run(release.wait))  # a long flush or compaction
+    try:
+        assert await asyncio.wait_for(store.get(key("Merci.")), 1.0) == "Thanks."
+        store.put(key("Oui."), "Yes.")
+        store._flush()  # queued behind the writer: served from memory meanwhile
+        assert await asyncio.wait_for(store.get(key("Oui.")), 1.0) == "Yes."
+    finally:
+        release.set()
+        await busy
+    await store.close()
+
+
+async def test_wal_mode(tmp_path):
+    path = tmp_path / "tm.db"
+    store = TranslationStore(path)
+    store.put(key("Oui."), "Yes.")
+    await store.close()
+    assert sqlite3.connect(path).execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+async def test_compaction_keeps_most_recent(tmp_path):
+    store = TranslationStore(tmp_path / "tm.db", max_entries=10, flush_batch=1)
+    for i in range(30):
+        store.put(key(f"Phrase {i}."), f"Sentence {i}.")
+        await asyncio.sleep(0.005)
+    await store.close()
+
+    reopened = TranslationStore(tmp_path / "tm.db", max_entries=10)
+    assert len(await reopened.load(100)) <= 10
+    assert await reopened.get(key("Phrase 29.")) == "Sentence 29."
+    assert await reopened.get(key("Phrase 0.")) is None
+    await reopened.close()
+    assert store.snapshot()["compactions"] >= 1
+
+
+async def test_read_phrases_survive_compaction(tmp_path):
+    store = TranslationStore(tmp_path / "tm.db", max_entries=10, flush_batch=1)
+    store.put(key("Merci."), "Thanks.")
+    await asyncio.sleep(0.01)
+    for i in range(30):
+        store.put(key(f"Phrase {i}."), f"Sentence {i}.")
+        await asyncio.sleep(0.005)
+        if i % 5 == 0:
+            assert await store.get(key("Merci.")) == "Thanks."  # read, never rewritten
+    await store.close()
+
+    reopened = TranslationStore(tmp_path / "tm.db", max_entries=10)
+    assert await reopened.get(key("Merci.")) == "Thanks."
+    assert (await reopened.load(1))[0] == (key("Merci."), "Thanks.")  # most read first
+    await reopened.close()
+
+
+async def test_memory_hits_touch_the_store(tmp_path):
+    path = tmp_path / "tm.db"
+    prov = CachedProvider(CountingProvider(), TranslationCache(), store=TranslationStore(path))
+    for text in ("Oui.", "Non.", "Non.", "Non."):
+        await prov.translate(text, "fr", "en")  # "Non." then twice from memory
+    assert prov.lookup("Non.", "fr", "en") == "T(Non.)"
+    await prov.close()
+    hits = dict(sqlite3.connect(path).execute("SELECT text, hits FROM translations").fetchall())
+    assert hits == {"Oui.": 1, "Non.": 4}
+
+
+async def test_cached_provider_warm_restart(tmp_path):
+    path = tmp_path / "tm.db"
+    inner = CountingProvider()
+    prov = CachedProvider(inner, TranslationCache(), store=TranslationStore(path))
+    await prov.translate("Merci beaucoup.", "fr", "en")
+    await prov.close()
+
+    inner2 = CountingProvider()
+    prov2 = CachedProvider(inner2, TranslationCache(), store=TranslationStore(path))
+    assert await prov2.translate("Merci beaucoup.", "fr", "en") == "T(Merci beaucoup.)"
+    assert inner2.calls == []  # no retranslation after restart
+    await asyncio.sleep(0.05)  # background warm load
+    assert prov2.lookup("Merci beaucoup.", "fr", "en") == "T(Merci beaucoup.)"
+    await prov2.close()
+
+
+async def test_batch_consults_store(tmp_path):
+    path = tmp_path / "tm.db"
+    store = TranslationStore(path)
+    store.put(key("Oui."), "Yes.")
+    await store.close()
+
+    inner = CountingProvider()
+    prov = CachedProvider(inner, TranslationCache(), store=TranslationStore(path))
+    out = await prov.translate_batch([("Oui.", "fr", "en"), ("Non.", "fr", "en")])
+    assert out == ["Yes.", "T(Non.)"]
+    assert inner.calls == ["Non."]
+    await prov.close()
@@ -0,0 +1,473 @@
+"""Tests for the TranslateGemma provider (HTTP mocked with httpx.MockTransport)."""
+
+import asyncio
+import json
+import re
+
+import httpx
+import pytest
+
+from translator.providers.endpoints import EndpointPool, parse_waiting, sibling_urls
+from translator.providers.max_tokens import TokenBudget
+from translator.providers.translategemma import TranslateGemmaProvider
+from translator.providers.transport import TransportSettings, build_client
+
+
+_LANG_NAMES = {"fr": "French", "en": "English", "de": "German", "es": "Spanish"}
+
+
+def chat_template(messages) -> str:
+    """Stand-in for the served TranslateGemma chat template (markers -> instructions)."""
+    content = messages[-1]["content"]
+    src, tgt, text = re.fullmatch(
+        r"<<<source>>>(\w+)<<<target>>>(\w+)<<<text>>>(.*)", content, re.DOTALL
+    ).groups()
+    return (
+        f"<bos><start_of_turn>user\nTranslate from {_LANG_NAMES[src]} to {_LANG_NAMES[tgt]}:"
+        f"\n\n{text}<end_of_turn>\n<start_of_turn>model\n"
+    )
+
+
+def serve_chat_template(handler):
+    """vLLM /tokenize (chat messages) and /detokenize in front of `handler`."""
+    def wrapped(request):
+        if request.url.path == "/tokenize":
+            rendered = chat_template(json.loads(request.content)["messages"])
+            return httpx.Response(200, json={"tokens": [ord(c) for c in rendered]})
+        if request.url.path == "/detokenize":
+            tokens = json.loads(request.content)["tokens"]
+            return httpx.Response(200, json={"prompt": "".join(chr(t) for t in tokens)})
+        return handler(request)
+    return wrapped
+
+
+def make_provider(handler, endpoint="http://vllm:8000", **kw) -> TranslateGemmaProvider:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(serve_chat_template(handler)))
+    return TranslateGemmaProvider(endpoint=endpoint, client=client, **kw)
+
+
+def chat_response(content: str, finish_reason: str = "stop") -> httpx.Response:
+    return httpx.Response(200, json={
+        "choices": [{"index": 0, "message": {"content": content}, "finish_reason": finish_reason}],
+        "usage": {"prompt_tokens": 12, "completion_tokens": 3},
+    })
+
+
+async def test_translate_sends_short_codes():
+    seen = []
+
+    def handler(request):
+        seen.append(json.loads(request.content))
+        return chat_response(" Hello. ")
+
+    prov = make_provider(handler)
+    assert await prov.translate("Bonjour.", "fr-FR", "en-GB") == "Hello."
+    assert seen[0]["messages"][0]["content"] == "<<<source>>>fr<<<target>>>en<<<text>>>Bonjour."
+    assert prov.usage_snapshot()["completion_tokens"] == 3
+
+
+async def test_translate_batch_single_request():
+    seen = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        seen.append((request.url.path, body))
+        # vLLM may return choices in any order: results are mapped by index
+        choices = [
+            {"index": i, "text": f" out{i}", "finish_reason": "stop"}
+            for i in reversed(range(len(body["prompt"])))
+        ]
+        return httpx.Response(200, json={
+            "choices": choices,
+            "usage": {"prompt_tokens": 30, "completion_tokens": 6},
+        })
+
+    prov = make_provider(handler)
+    out = await prov.translate_batch([
+        ("Bonjour.", "fr", "en"),
+        ("Bonjour.", "fr", "de"),
+        ("Bonjour.", "fr", "es"),
+    ])
+    assert out == ["out0", "out1", "out2"]
+    assert len(seen) == 1
+    path, body = seen[0]
+    assert path == "/v1/completions"
+    assert body["prompt"][1].startswith("<bos><start_of_turn>user\nTranslate from French to German")
+    assert body["add_special_tokens"] is False
+    usage = prov.usage_snapshot()
+    assert usage["requests"] == 3
+    assert usage["batches"] == 1
+
+
+async def test_batched_and_single_requests_build_the_same_prompt():
+    chat_prompts, batch_prompts, renders = [], [], []
+
+    def handler(request):
+        body = json.loads(request.content)
+        if request.url.path == "/v1/chat/completions":
+            # What the server feeds the model for a chat request
+            chat_prompts.append(chat_template(body["messages"]))
+            return chat_response("ok")
+        batch_prompts.extend(body["prompt"])
+        return httpx.Response(200, json={
+            "choices": [{"index": i, "text": "ok", "finish_reason": "stop"}
+                        for i in range(len(body["prompt"]))],
+            "usage": {},
+        })
+
+    def counting(request):
+        if request.url.path == "/tokenize":
+            renders.append(json.loads(request.content)["messages"][0]["content"])
+        return serve_chat_template(handler)(request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(counting))
+    prov = TranslateGemmaProvider(endpoint="http://vllm:8000", client=client)
+    items = [("Bonjour {à} tous.", "fr-FR", "en"), ("Oui.", "fr", "de"), ("Non.", "fr", "en-GB")]
+    for item in items:
+        await prov.translate(*item)
+    await prov.translate_batch(items)
+    await prov.translate_batch(items)
+    assert batch_prompts[:3] == chat_prompts
+    assert batch_prompts[3:] == chat_prompts
+    assert len(renders) == 2  # once per language pair
+
+
+async def test_batch_without_tokenize_endpoint_sends_single_requests():
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        if request.url.path in ("/tokenize", "/detokenize"):
+            return httpx.Response(404)
+        return chat_response("ok")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    prov = TranslateGemmaProvider(endpoint="http://vllm:8000", client=client)
+    for _ in range(2):
+        assert await prov.translate_batch([("a", "fr", "en"), ("b", "fr", "de")]) == ["ok", "ok"]
+    assert paths.count("/v1/chat/completions") == 4
+    assert "/v1/completions" not in paths
+    assert paths.count("/tokenize") == 2  # not retried once known unsupported
+
+
+async def test_translate_batch_missing_source_lang_isolated():
+    def handler(request):
+        body = json.loads(request.content)
+        return httpx.Response(200, json={
+            "choices": [{"index": 0, "text": "ok", "finish_reason": "stop"}],
+            "usage": {},
+        }) if len(body["prompt"]) == 1 else httpx.Response(500)
+
+    prov = make_provider(handler)
+    out = await prov.translate_batch([("a", None, "en"), ("b", "fr", "en")])
+    assert isinstance(out[0], ValueError)
+    assert out[1] == "ok"
+
+
+async def test_translate_batch_http_error_raises():
+    prov = make_provider(lambda request: httpx.Response(503))
+    with pytest.raises(httpx.HTTPStatusError):
+        await prov.translate_batch([("a", "fr", "en"), ("b", "fr", "de")])
+
+
+class TestEndpointPool:
+    async def test_least_outstanding_routing(self):
+        hosts = []
+        release = asyncio.Event()
+
+        async def handler(request):
+            if request.url.path == "/v1/chat/completions":
+                hosts.append(request.url.host)
+                await release.wait()
+                return chat_response("ok")
+            return httpx.Response(404)
+
+        prov = make_provider(handler, endpoint="http://a:8000,http://b:8000")
+        tasks = [asyncio.create_task(prov.translate(f"t{i}", "fr", "en")) for i in range(4)]
+        await asyncio.sleep(0.05)
+        assert sorted(hosts) == ["a", "a", "b", "b"]  # spread evenly, not all on a
+        release.set()
+        await asyncio.gather(*tasks)
+        await prov.close()
+
+    async def test_sibling_copies_routed_apart(self):
+        pool = EndpointPool(["http://a:8000", "http://b:8000"])
+        pool.endpoints[1].outstanding = 3  # b is the more loaded one
+        sibling_urls.set([])
+        first = await pool.acquire()
+        second = await pool.acquire()
+        assert (first.url, second.url) == ("http://a:8000", "http://b:8000")
+
+    async def test_per_endpoint_cap(self):
+        inflight = {"a": 0, "b": 0}
+        peak = {"a": 0, "b": 0}
+
+        async def handler(request):
+            if request.url.path != "/v1/chat/completions":
+                return httpx.Response(404)
+            h = request.url.host
+            inflight[h] += 1
+            peak[h] = max(peak[h], inflight[h])
+            await asyncio.sleep(0.01)
+            inflight[h] -= 1
+            return chat_response("ok")
+
+        prov = make_provider(handler, endpoint="http://a:8000,http://b:8000",
+                             endpoint_max_concurrent=2)
+        assert prov.capacity == 4
+        await asyncio.gather(*[prov.translate(f"t{i}", "fr", "en") for i in range(12)])
+        assert peak["a"] <= 2 and peak["b"] <= 2
+        await prov.close()
+
+    async def test_failing_endpoint_ejected(self):
+        def handler(request):
+            if request.url.path != "/v1/chat/completions":
+                return httpx.Response(503)  # health probe fails too
+            if request.url.host == "bad":
+                return httpx.Response(502)
+            return chat_response("ok")
+
+        prov = make_provider(handler, endpoint="http://bad:8000,http://good:8000",
+                             eject_after_failures=2)
+        results = await asyncio.gather(
+            *[prov.translate(f"t{i}", "fr", "en") for i in range(10)], return_exceptions=True
+        )
+        failures = [r for r in results if isinstance(r, Exception)]
+        assert len(failures) == 2  # then traffic only goes to the healthy endpoint
+        snap = {e["url"]: e for e in prov.endpoints_snapshot()}
+        assert snap["http://bad:8000"]["ejected"] is True
+        assert snap["http://good:8000"]["requests"] >= 8
+        await prov.close()
+
+    async def test_ejected_endpoint_reinstated_by_probe(self):
+        up = {"bad": False}
+
+        def handler(request):
+            if request.url.path == "/health":
+                return httpx.Response(200 if up[request.url.host] else 503) \
+                    if request.url.host in up else httpx.Response(200)
+            if request.url.path == "/metrics":
+                return httpx.Response(404)
+            if request.url.host == "bad" and not up["bad"]:
+                return httpx.Response(500)
+            return chat_response("ok")
+
+        prov = make_provider(handler, endpoint="http://bad:8000,http://good:8000",
+                             eject_after_failures=1, eject_seconds=0.01)
+        prov.pool.monitor_interval_s = 0.02
+        await asyncio.gather(*[prov.translate(f"t{i}", "fr", "en") for i in range(3)],
+                             return_exceptions=True)
+        bad = prov.pool.endpoints[0]
+        assert bad.ejected_until > 0
+        up["bad"] = True
+        await asyncio.sleep(0.2)
+        assert bad.ejected_until == 0.0
+        await prov.close()
+
+    def test_parse_waiting_gauge(self):
+        text = (
+            "# HELP vllm:num_requests_waiting Number of requests waiting.\n"
+            "# TYPE vllm:num_requests_waiting gauge\n"
+            'vllm:num_requests_waiting{model_name="gemma"} 7.0\n'
+            'vllm:num_requests_running{model_name="gemma"} 3.0\n'
+        )
+        assert parse_waiting(text) == 7.0
+
+    async def test_queue_gauge_steers_traffic(self):
+        prov = make_provider(lambda r: chat_response("ok"),
+                             endpoint="http://a:8000,http://b:8000")
+        a, b = prov.pool.endpoints
+        a.waiting = 10.0  # a's vLLM queue is deep
+        ep = await prov.pool.acquire()
+        assert ep is b
+        await prov.pool.release(ep, True)
+        await prov.close()
+
+
+async def test_translate_stream_parses_sse():
+    seen = []
+
+    def handler(request):
+        seen.append(json.loads(request.content))
+        chunks = [
+            {"choices": [{"index": 0, "delta": {"role": "assistant"}, "finish_reason": None}]},
+            {"choices": [{"index": 0, "delta": {"content": " Hello"}, "finish_reason": None}]},
+            {"choices": [{"index": 0, "delta": {"content": " world."}, "finish_reason": "stop"}]},
+            {"choices": [], "usage": {"prompt_tokens": 12, "completion_tokens": 2}},
+        ]
+        body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    prov = make_provider(handler)
+    pieces = [p async for p in prov.translate_stream("Bonjour le monde.", "fr", "en")]
+    assert pieces == [" Hello", " world."]
+    assert seen[0]["stream"] is True
+    usage = prov.usage_snapshot()
+    assert usage["completion_tokens"] == 2
+    assert usage["streams"] == 1
+    assert prov.endpoints_snapshot()[0]["outstanding"] == 0
+
+
+def sse_response(contents, finish_reason="stop", completion_tokens=2) -> httpx.Response:
+    chunks = [
+        {"choices": [{"index": 0, "delta": {"content": c}, "finish_reason": None}]} for c in contents
+    ] + [
+        {"choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}]},
+        {"choices": [], "usage": {"prompt_tokens": 12, "completion_tokens": completion_tokens}},
+    ]
+    body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+    return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+
+async def test_stream_gets_adaptive_budget_and_resumes_truncation():
+    seen = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        seen.append(body)
+        if len(seen) == 1:
+            return sse_response(["Hello", " wor"], "length", completion_tokens=2)
+        return sse_response(["ld."])
+
+    prov = make_provider(handler, max_tokens=512)
+    expected = prov.budget.budget(len("Bonjour le monde."), "fr", "en")
+    pieces = [p async for p in prov.translate_stream("Bonjour le monde.", "fr", "en")]
+    assert pieces == ["Hello", " wor", "ld."]
+    assert seen[0]["max_tokens"] == expected < 512
+    # Resumed, not restarted: the published pieces are prefilled
+    assert seen[1]["max_tokens"] == 512
+    assert seen[1]["continue_final_message"] is True
+    assert seen[1]["messages"][-1] == {"role": "assistant", "content": "Hello wor"}
+    usage = prov.usage_snapshot()
+    assert (usage["budget_retries"], usage["truncated"], usage["streams"]) == (1, 0, 1)
+
+
+async def test_static_budget_when_not_adaptive():
+    budgets = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        budgets.append(body["max_tokens"])
+        return sse_response(["ok"]) if body.get("stream") else chat_response(" ok")
+
+    prov = make_provider(handler, max_tokens=160, adaptive_max_tokens=False)
+    [p async for p in prov.translate_stream("x" * 400, "fr", "en")]
+    await prov.translate_continue("x" * 400, "fr", "en", "déjà")
+    assert budgets == [160, 160]
+
+
+async def test_translate_stream_error_releases_endpoint():
+    prov = make_provider(lambda request: httpx.Response(503))
+    with pytest.raises(httpx.HTTPStatusError):
+        async for _ in prov.translate_stream("Bonjour.", "fr", "en"):
+            pass
+    ep = prov.endpoints_snapshot()[0]
+    assert ep["outstanding"] == 0 and ep["errors"] == 1
+
+
+class TestTokenBudget:
+    def test_budget_scales_with_source_length(self):
+        budget = TokenBudget(ceiling=512)
+        short, long = budget.budget(10, "fr", "en"), budget.budget(400, "fr", "en")
+        assert budget.floor <= short < long <= 512
+
+    def test_learns_pair_expansion(self):
+        budget = TokenBudget(ceiling=512)
+        before = budget.budget(200, "fr-FR", "en")
+        for _ in range(50):
+            budget.observe(200, "fr-FR", "en", 50)  # 0.25 token/char, no variance
+        after = budget.budget(200, "fr", "EN")
+        assert after < before
+        assert after >= 50  # never below what was observed
+        assert budget.budget(200, "fr", "de") == before  # other pairs keep the prior
+
+    def test_clamped_to_ceiling(self):
+        assert TokenBudget(ceiling=64).budget(10000, "fr", "en") == 64
+
+
+async def test_adaptive_budget_retries_truncation_at_ceiling():
+    budgets = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        budgets.append(body["max_tokens"])
+        if body["max_tokens"] < 512:
+            return chat_response("Hello", finish_reason="length")
+        return chat_response("Hello world.")
+
+    prov = make_provider(handler, max_tokens=512)
+    assert await prov.translate("Bonjour le monde.", "fr", "en") == "Hello world."
+    assert budgets[0] < 512 and budgets[1] == 512
+    usage = prov.usage_snapshot()
+    assert usage["budget_retries"] == 1
+    assert usage["truncated"] == 0
+
+
+async def test_batch_budget_and_truncation_retry():
+    seen = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        seen.append((request.url.path, body["max_tokens"]))
+        if request.url.path == "/v1/chat/completions":
+            return chat_response("long out")
+        return httpx.Response(200, json={
+            "choices": [
+                {"index": 0, "text": "short", "finish_reason": "stop"},
+                {"index": 1, "text": "lo", "finish_reason": "length"},
+            ],
+            "usage": {"completion_tokens": 10},
+        })
+
+    prov = make_provider(handler, max_tokens=512)
+    expected = prov.budget.budget(300, "fr", "en")
+    out = await prov.translate_batch([("Oui.", "fr", "en"), ("x" * 300, "fr", "en")])
+    assert out == ["short", "long out"]
+    # Batch budget = the largest item budget; the truncated item retried at the ceiling
+    assert seen[0][1] == expected
+    assert seen[1] == ("/v1/chat/completions", 512)
+
+
+class TestTransport:
+    def test_read_timeout_scales_with_max_tokens(self):
+        settings = TransportSettings(read_timeout_base_s=2.0, read_timeout_per_token_s=0.05)
+        assert settings.timeout_for(0).read == 2.0
+        assert settings.timeout_for(200).read == 12.0
+        assert settings.timeout_for(200).pool == settings.pool_timeout_s
+
+    def test_pool_sized_from_concurrency(self):
+        client = build_client(TransportSettings(), concurrency=24)
+        pool = client._transport._pool
+        assert pool._max_connections == 26  # + monitor connections
+        assert pool._max_keepalive_connections == 26
+
+    def test_explicit_max_connections(self):
+        client = build_client(TransportSettings(max_connections=5), concurrency=24)
+        assert client._transport._pool._max_connections == 5
+
+    def test_http2_falls_back_without_h2(self, monkeypatch):
+        real = httpx.AsyncClient
+
+        def fake(*args, http2=False, **kw):
+            if http2:
+                raise ImportError("h2")
+            return real(*args, **kw)
+
+        monkeypatch.setattr("translator.providers.transport.httpx.AsyncClient", fake)
+        client = build_client(TransportSettings(http2=True), concurrency=4)
+        assert isinstance(client, real)
+
+    async def test_request_timeout_follows_max_tokens(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request.extensions["timeout"]["read"])
+            return chat_response("Hello.")
+
+        prov = make_provider(
+            handler, max_tokens=100, adaptive_max_tokens=False,
+            transport=TransportSettings(read_timeout_base_s=1.0, read_timeout_per_token_s=0.01),
+        )
+        await prov.translate("Bonjour.", "fr", "en")
+        assert seen == [2.0]
+        assert prov.transport_snapshot()["requests"] == 0  # MockTransport has no trace events
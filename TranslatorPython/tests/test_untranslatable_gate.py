@@ -0,0 +1,69 @@
+"""Tests for the untranslatable gate (chunks answered without a model)."""
+
+from translator.gates.untranslatable import zero_cost_translation
+
+
+class TestVerbatim:
+    """Chunks copied as they are, whatever the languages."""
+
+    def test_punctuation_and_ellipsis(self):
+        """Punctuation-only chunks are copied (stripped)."""
+        assert zero_cost_translation(" ... ", "fr-FR", "en") == "..."
+        assert zero_cost_translation("?!", "fr", "de") == "?!"
+        assert zero_cost_translation("…", "fr", "en") == "…"
+
+    def test_bare_digits(self):
+        """Digit strings are copied, trailing punctuation included."""
+        for text in ("42.", "2024", "7", "1000?"):
+            assert zero_cost_translation(text, "fr", "en") == text
+
+    def test_formatted_numbers_go_to_the_model(self):
+        """Separators, units and currencies depend on the locale."""
+        for text in ("3,5 %", "3.5", "1 000 €", "15 %", "12:30", "-3", "(7)", "$20"):
+            assert zero_cost_translation(text, "fr", "en") is None
+
+    def test_urls_and_emails(self):
+        """URLs and e-mail addresses are copied, trailing punctuation included."""
+        assert zero_cost_translation("https://linto.ai/docs.", "fr", "en") == "https://linto.ai/docs."
+        assert zero_cost_translation("www.linto.ai", "fr", "en") == "www.linto.ai"
+        assert zero_cost_translation("contact@linagora.com", "fr", "en") == "contact@linagora.com"
+
+    def test_universal_interjections(self):
+        """Interjections spelled the same everywhere are copied."""
+        assert zero_cost_translation("Ah !", "fr", "en") == "Ah !"
+        assert zero_cost_translation("Hmm.", "en", "fr") == "Hmm."
+        assert zero_cost_translation("OK.", "fr", "de") == "OK."
+
+    def test_language_specific_interjections_go_to_the_model(self):
+        """French "oups" is "oops" in English; "eh?" asks, it does not hesitate."""
+        assert zero_cost_translation("Oups !", "fr", "en") is None
+        assert zero_cost_translation("Eh?", "en", "fr") is None
+
+
+class TestHesitations:
+    """Fillers written the target language's way."""
+
+    def test_mapped_per_target(self):
+        """Case and surrounding punctuation are kept."""
+        assert zero_cost_translation("Euh...", "fr-FR", "en") == "Uh..."
+        assert zero_cost_translation("euh,", "fr", "de-DE") == "äh,"
+        assert zero_cost_translation("Um.", "en", "fr") == "Euh."
+
+    def test_unknown_target_goes_to_the_model(self):
+        """No table entry for the target: no guess."""
+        assert zero_cost_translation("Euh...", "fr", "ja") is None
+
+
+class TestNeedsModel:
+    """Anything with words to translate."""
+
+    def test_words(self):
+        """Regular words and sentences are never answered here."""
+        assert zero_cost_translation("Bonjour.", "fr", "en") is None
+        assert zero_cost_translation("Euh bonjour.", "fr", "en") is None
+        assert zero_cost_translation("42 personnes.", "fr", "en") is None
+        assert zero_cost_translation("Voir https://linto.ai", "fr", "en") is None
+
+    def test_empty(self):
+        """Whitespace is left to the caller."""
+        assert zero_cost_translation("  ", "fr", "en") is None
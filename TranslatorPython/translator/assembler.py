@@ -130,7 +130,7 @@ class SegmentAssembler:
         Never raises: any segmentation failure degrades to "one single span".
         """
         short = lang.split("-")[0] if lang else None
-        if short in sentence_gate.PYSBD_LANGUAGES:
+        if short in sentence_gate.pysbd_languages():
             try:
                 import pysbd
 
@@ -155,3 +155,14 @@ class SegmentAssembler:
 
 
 _span_segmenters: dict[str, object] = {}
+
+
+def warm_up(languages: list[str]) -> int:
+    """Build the span segmenters of these languages ahead of traffic.
+
+    Returns the number of languages with a pySBD segmenter ready (the others
+    use the regex fallback, which needs no warm-up).
+    """
+    for lang in languages:
+        SegmentAssembler._segment_spans("Warm up. Done.", lang)
+    return sum(f"span:{lang.split('-')[0]}" in _span_segmenters for lang in languages)
@@ -0,0 +1,97 @@
+"""Micro-batching dispatcher: coalesce concurrent provider requests.
+
+Requests submitted within a short window (`window_ms`) are sent to the
+provider as ONE `translate_batch()` call. A frozen sentence fanned out to 10
+target languages then costs one backend request instead of 10, each of which
+would pay the fixed per-request overhead (~130 ms on TranslateGemma).
+
+A batch is flushed when the window expires or as soon as it holds
+`max_batch` items, whichever comes first. Callers are admitted by the
+scheduler BEFORE they reach the batcher, so the total number of sequences
+sent to the backend stays bounded by the scheduler's global cap.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from translator.providers.base import TranslationItem, TranslationProvider
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatcherStats:
+    batches: int = 0
+    items: int = 0
+    max_size: int = 0
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        provider: TranslationProvider,
+        window_ms: int = 10,
+        max_batch: int = 16,
+    ) -> None:
+        self.provider = provider
+        self.window_s = window_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._pending: list[tuple[TranslationItem, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._runs: set[asyncio.Task] = set()
+        self.stats = BatcherStats()
+
+    async def submit(self, text: str, src_lang: str | None, tgt_lang: str) -> str:
+        """Queue one item for the next batch and wait for its translation."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append(((text, src_lang, tgt_lang), fut))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_s, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Callers cancelled while waiting for the window are not sent
+        batch = [(item, fut) for item, fut in self._pending if not fut.done()]
+        self._pending = []
+        if not batch:
+            return
+        task = asyncio.create_task(self._run(batch))
+        self._runs.add(task)
+        task.add_done_callback(self._runs.discard)
+
+    async def _run(self, batch: list[tuple[TranslationItem, asyncio.Future]]) -> None:
+        self.stats.batches += 1
+        self.stats.items += len(batch)
+        self.stats.max_size = max(self.stats.max_size, len(batch))
+        try:
+            results = await self.provider.translate_batch([item for item, _ in batch])
+        except Exception as exc:
+            results = [exc] * len(batch)
+        if len(results) != len(batch):
+            logger.error(
+                "[batcher] provider returned %d results for %d items", len(results), len(batch)
+            )
+            results = [RuntimeError("translate_batch result count mismatch")] * len(batch)
+        for (_, fut), result in zip(batch, results):
+            if fut.done():
+                continue
+            if isinstance(result, asyncio.CancelledError):
+                fut.cancel()
+            elif isinstance(result, BaseException):
+                fut.set_exception(result)
+            else:
+                fut.set_result(result)
+
+    def snapshot(self) -> dict[str, int]:
+        return {
+            "batches": self.stats.batches,
+            "batched_items": self.stats.items,
+            "max_batch_size": self.stats.max_size,
+        }
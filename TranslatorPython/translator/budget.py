@@ -0,0 +1,83 @@
+"""GPU budget: token-bucket admission control charged in estimated tokens.
+
+A request count cap (`MAX_CONCURRENT_TRANSLATIONS`) treats a one-word
+sentence and a 100-word final alike, though the latter costs ~40x more
+decode. The bucket instead refills at `rate` tokens/second (the throughput
+the backend sustains below its latency knee) and each request is admitted
+once it can pay its estimated prompt + completion tokens. Waiters are served
+in FIFO order, so a long final is not starved by a stream of short ones.
+
+Token estimate: Latin-script text is ~4 characters per token for gemma
+tokenizers, and a translation is about as long as its source.
+"""
+
+import asyncio
+import math
+import time
+
+CHARS_PER_TOKEN = 4.0
+CALL_OVERHEAD_TOKENS = 10  # chat template (<start_of_turn> etc.), constant per request
+
+
+def est_tokens(chars: int) -> int:
+    return math.ceil(chars / CHARS_PER_TOKEN)
+
+
+def request_tokens(text: str) -> int:
+    """Estimated prompt + completion tokens of one translation request."""
+    tokens = est_tokens(len(text))
+    return CALL_OVERHEAD_TOKENS + 2 * tokens
+
+
+class TokenBucket:
+    """FIFO token bucket.
+
+    Args:
+        rate: Refill rate, tokens/second.
+        burst: Bucket capacity (default: one second of refill). A request
+            costing more than this is charged the full bucket.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("token budget rate must be > 0")
+        self.rate = rate
+        self.burst = burst or rate
+        self._level = self.burst
+        self._stamp = time.monotonic()
+        self._lock = asyncio.Lock()  # FIFO: waiters are admitted in arrival order
+        self.admitted = 0
+        self.throttled = 0  # admissions that had to wait for a refill
+        self.wait_s = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.burst, self._level + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    async def acquire(self, tokens: float) -> None:
+        """Wait until `tokens` are available, then spend them."""
+        tokens = min(tokens, self.burst)
+        t0 = time.monotonic()
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._level >= tokens:
+                    break
+                await asyncio.sleep((tokens - self._level) / self.rate)
+            self._level -= tokens
+        self.admitted += 1
+        waited = time.monotonic() - t0
+        if waited > 0.001:
+            self.throttled += 1
+            self.wait_s += waited
+
+    def snapshot(self) -> dict[str, float]:
+        self._refill()
+        return {
+            "rate": self.rate,
+            "level": self._level,
+            "admitted": self.admitted,
+            "throttled": self.throttled,
+            "wait_s": self.wait_s,
+        }
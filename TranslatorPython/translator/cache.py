@@ -0,0 +1,151 @@
+"""Bounded in-memory translation memory (LRU eviction, TinyLFU admission).
+
+Meeting speech repeats short sentences constantly ("D'accord.", "Merci
+beaucoup."). The cache keeps their translations, bounded both in entries and
+in bytes.
+
+Eviction is LRU, but admission is frequency-gated (TinyLFU): when inserting
+would evict entries, the newcomer is only admitted if it has been requested
+more often than the entries it would push out. One-off long sentences can
+therefore not flush the frequent short phrases that make the hit rate.
+Frequencies are tracked approximately by a count-min sketch whose counters
+are halved periodically, so popularity ages out.
+
+Synchronous and I/O-free; one instance per process.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# Cache key: (normalized text, source lang, target lang)
+CacheKey = tuple[str, str, str]
+
+# Fixed per-entry overhead added to the UTF-8 size of key text + value
+_ENTRY_OVERHEAD_BYTES = 64
+_SKETCH_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+_MASK64 = (1 << 64) - 1
+_COUNTER_MAX = 15
+
+
+def cache_key(text: str, source_lang: str | None, target_lang: str) -> CacheKey | None:
+    """Normalized cache key, or None if the request must not be cached."""
+    if not source_lang:
+        return None
+    norm = " ".join(text.split())
+    if not norm:
+        return None
+    return (norm, source_lang.lower(), target_lang.lower())
+
+
+class _FrequencySketch:
+    """Count-min sketch (4 rows, saturating counters, periodic halving)."""
+
+    def __init__(self, capacity: int) -> None:
+        width = 64
+        while width < capacity:
+            width <<= 1
+        self._mask = width - 1
+        self._rows = [[0] * width for _ in _SKETCH_SEEDS]
+        self._additions = 0
+        self._sample_size = 10 * width
+
+    def _indexes(self, key: CacheKey) -> list[int]:
+        h = hash(key) & _MASK64
+        return [((h * seed) & _MASK64) >> 40 & self._mask for seed in _SKETCH_SEEDS]
+
+    def increment(self, key: CacheKey) -> None:
+        for row, i in zip(self._rows, self._indexes(key)):
+            if row[i] < _COUNTER_MAX:
+                row[i] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            for row in self._rows:
+                for i, c in enumerate(row):
+                    row[i] = c >> 1
+            self._additions //= 2
+
+    def estimate(self, key: CacheKey) -> int:
+        return min(row[i] for row, i in zip(self._rows, self._indexes(key)))
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    rejected: int = 0  # newcomers refused by the admission filter
+
+
+class TranslationCache:
+    """Size- and byte-bounded translation memory."""
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 8 * 1024 * 1024) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[CacheKey, tuple[str, int]] = OrderedDict()  # value, size
+        self._sketch = _FrequencySketch(max_entries)
+        self.bytes = 0
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _size(key: CacheKey, value: str) -> int:
+        return len(key[0].encode()) + len(value.encode()) + _ENTRY_OVERHEAD_BYTES
+
+    def get(self, key: CacheKey) -> str | None:
+        self._sketch.increment(key)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry[0]
+
+    def peek(self, key: CacheKey) -> str | None:
+        """Read without touching recency, frequency or stats."""
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def put(self, key: CacheKey, value: str) -> bool:
+        """Insert a translation. Returns False if it was not admitted."""
+        size = self._size(key, value)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return False
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+
+        # Victims that would have to go for the newcomer to fit (LRU order)
+        victims: list[CacheKey] = []
+        n, b = len(self._entries) + 1, self.bytes + size
+        it = iter(self._entries.items())
+        while n > self.max_entries or b > self.max_bytes:
+            victim, (_, vsize) = next(it)
+            victims.append(victim)
+            n -= 1
+            b -= vsize
+        if victims and old is None:
+            freq = self._sketch.estimate(key)
+            if any(self._sketch.estimate(v) >= freq for v in victims):
+                self.stats.rejected += 1
+                return False
+
+        for victim in victims:
+            self.bytes -= self._entries.pop(victim)[1]
+            self.stats.evictions += 1
+        self._entries[key] = (value, size)
+        self.bytes += size
+        return True
+
+    def snapshot(self) -> dict[str, int]:
+        return {
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "evictions": self.stats.evictions,
+            "rejected": self.stats.rejected,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+        }
@@ -0,0 +1,110 @@
+"""Message codec: typed MQTT payloads, orjson when installed.
+
+Ingress transcriptions are decoded ONCE into a slotted `Transcription`
+holding only the fields the pipeline reads (the `translations` map of the
+ASR message and the requests of other translators are dropped right away);
+outgoing translations are slotted `TranslationPayload`s, encoded straight
+to bytes. With the `json` extra (orjson) decoding and encoding run in C,
+several times faster than the stdlib; without it, the stdlib is used.
+"""
+
+import json
+from dataclasses import dataclass, field, fields
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback
+    orjson = None
+
+
+class DecodeError(ValueError):
+    """Raised on a payload that is not valid JSON of the expected shape."""
+
+
+def loads(data: bytes | bytearray | str) -> Any:
+    """Decode JSON, raising DecodeError."""
+    try:
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise DecodeError(str(exc)) from None
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode JSON to UTF-8 bytes (compact)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+@dataclass(slots=True)
+class Transcription:
+    """One transcriber partial/final, as read by the pipeline.
+
+    `targets` are the target languages requested from THIS translator.
+    """
+
+    segment_id: Any
+    text: str
+    lang: str | None
+    astart: Any = None
+    start: Any = None
+    end: Any = None
+    locutor: Any = None
+    targets: list[str] = field(default_factory=list)
+
+
+def decode_transcription(data: bytes | bytearray | str, translator_name: str) -> Transcription:
+    """Decode a `transcriber/out/+/+/{partial,final}` message."""
+    msg = loads(data)
+    if not isinstance(msg, dict):
+        raise DecodeError("transcription is not a JSON object")
+    external = msg.get("externalTranslations")
+    targets = [
+        entry["targetLang"]
+        for entry in external
+        if isinstance(entry, dict)
+        and entry.get("translator") == translator_name
+        and entry.get("targetLang")
+    ] if isinstance(external, list) else []
+    text = msg.get("text")
+    return Transcription(
+        segment_id=msg.get("segmentId"),
+        text=text if isinstance(text, str) else "",
+        lang=msg.get("lang") or None,
+        astart=msg.get("astart"),
+        start=msg.get("start"),
+        end=msg.get("end"),
+        locutor=msg.get("locutor"),
+        targets=targets,
+    )
+
+
+@dataclass(slots=True)
+class TranslationPayload:
+    """Outgoing translation. Field names are the MQTT contract's wire names."""
+
+    segmentId: Any
+    astart: Any
+    text: str
+    start: Any
+    end: Any
+    sourceLang: str | None
+    targetLang: str
+    locutor: Any
+    final: bool
+    mode: str = "external"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in _PAYLOAD_FIELDS}
+
+
+_PAYLOAD_FIELDS = tuple(f.name for f in fields(TranslationPayload))
+
+
+def encode_translation(payload: TranslationPayload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)  # dataclasses are serialized natively
+    return dumps(payload.to_dict())
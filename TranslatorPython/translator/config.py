@@ -1,15 +1,11 @@
-"""Environment variable loading with defaults."""
+"""Environment variable loading with defaults.
+
+Reads `os.environ` only: the service entry point (`translator.main`) loads
+.envdefault and .env into it before importing this module.
+"""
 
 import os
 import sys
-from pathlib import Path
-
-from dotenv import load_dotenv
-
-# Load .envdefault first (base defaults), then .env (overrides)
-_base_dir = Path(__file__).resolve().parent.parent
-load_dotenv(_base_dir / ".envdefault")
-load_dotenv(_base_dir / ".env", override=True)
 
 # Required
 TRANSLATOR_NAME: str = os.environ.get("TRANSLATOR_NAME", "")
@@ -23,23 +19,152 @@ BROKER_PORT: int = int(os.environ.get("BROKER_PORT", "1883"))
 
 # Provider
 TRANSLATION_PROVIDER: str = os.environ.get("TRANSLATION_PROVIDER", "echo")
+# Per language pair routing: "PAIRS|PROVIDER|ENDPOINT|MAX_CONCURRENT;..."
+# (translator.providers.router), each route with its own concurrency pool
+TRANSLATION_ROUTES: str = os.environ.get("TRANSLATION_ROUTES", "")
 
-# TranslateGemma
+# TranslateGemma (comma-separated endpoints = balanced pool)
 TRANSLATEGEMMA_ENDPOINT: str = os.environ.get("TRANSLATEGEMMA_ENDPOINT", "")
+# Per-endpoint concurrency cap (0 = MAX_CONCURRENT_TRANSLATIONS per endpoint)
+TRANSLATEGEMMA_ENDPOINT_MAX_CONCURRENT: int = int(
+    os.environ.get("TRANSLATEGEMMA_ENDPOINT_MAX_CONCURRENT", "0")
+)
+TRANSLATEGEMMA_EJECT_AFTER_FAILURES: int = int(
+    os.environ.get("TRANSLATEGEMMA_EJECT_AFTER_FAILURES", "3")
+)
+TRANSLATEGEMMA_EJECT_SECONDS: float = float(os.environ.get("TRANSLATEGEMMA_EJECT_SECONDS", "5"))
+# HTTP transport (0 connections = sized from the concurrency)
+TRANSLATEGEMMA_HTTP_MAX_CONNECTIONS: int = int(
+    os.environ.get("TRANSLATEGEMMA_HTTP_MAX_CONNECTIONS", "0")
+)
+TRANSLATEGEMMA_HTTP_KEEPALIVE_EXPIRY: float = float(
+    os.environ.get("TRANSLATEGEMMA_HTTP_KEEPALIVE_EXPIRY", "60")
+)
+TRANSLATEGEMMA_HTTP2: bool = os.environ.get("TRANSLATEGEMMA_HTTP2", "false").lower() in (
+    "true", "1", "yes", "on",
+)
+TRANSLATEGEMMA_HTTP_CONNECT_TIMEOUT: float = float(
+    os.environ.get("TRANSLATEGEMMA_HTTP_CONNECT_TIMEOUT", "5")
+)
+TRANSLATEGEMMA_HTTP_POOL_TIMEOUT: float = float(
+    os.environ.get("TRANSLATEGEMMA_HTTP_POOL_TIMEOUT", "10")
+)
+# Read timeout = base + per_token * max_tokens of the request
+TRANSLATEGEMMA_HTTP_READ_TIMEOUT_BASE: float = float(
+    os.environ.get("TRANSLATEGEMMA_HTTP_READ_TIMEOUT_BASE", "5")
+)
+TRANSLATEGEMMA_HTTP_READ_TIMEOUT_PER_TOKEN: float = float(
+    os.environ.get("TRANSLATEGEMMA_HTTP_READ_TIMEOUT_PER_TOKEN", "0.1")
+)
 TRANSLATEGEMMA_MODEL: str = os.environ.get(
     "TRANSLATEGEMMA_MODEL", "Infomaniak-AI/vllm-translategemma-4b-it"
 )
-# One sentence/chunk (<= SOFT_CHUNK_CHARS source chars) fits well within 160
-TRANSLATEGEMMA_MAX_TOKENS: int = int(os.environ.get("TRANSLATEGEMMA_MAX_TOKENS", "160"))
+# With the adaptive budget, each request gets max_tokens from its source
+# length and the learned expansion of its language pair, up to a ceiling of
+# 512; without, every request gets the static 160.
+TRANSLATEGEMMA_ADAPTIVE_MAX_TOKENS: bool = os.environ.get(
+    "TRANSLATEGEMMA_ADAPTIVE_MAX_TOKENS", "true"
+).lower() in ("true", "1", "yes", "on")
+TRANSLATEGEMMA_MAX_TOKENS: int = int(
+    os.environ.get("TRANSLATEGEMMA_MAX_TOKENS", "512" if TRANSLATEGEMMA_ADAPTIVE_MAX_TOKENS else "160")
+)
 TRANSLATEGEMMA_TEMPERATURE: float = float(os.environ.get("TRANSLATEGEMMA_TEMPERATURE", "0.0"))
 
+# Local provider: synchronous CPU model ("module:callable" factory) hosted in
+# a pool of worker processes (0 workers = one per CPU core)
+LOCAL_MODEL_FACTORY: str = os.environ.get("LOCAL_MODEL_FACTORY", "")
+LOCAL_WORKERS: int = int(os.environ.get("LOCAL_WORKERS", "0"))
+
+# Simulated provider: echo with production-like latency (defaults fitted on
+# the TranslateGemma benchmarks), error and stall injection
+SIMULATED_BASE_MS: float = float(os.environ.get("SIMULATED_BASE_MS", "70"))
+SIMULATED_PER_TOKEN_MS: float = float(os.environ.get("SIMULATED_PER_TOKEN_MS", "31"))
+SIMULATED_CONCURRENCY_OVERHEAD: float = float(
+    os.environ.get("SIMULATED_CONCURRENCY_OVERHEAD", "0.045")
+)
+SIMULATED_JITTER_SIGMA: float = float(os.environ.get("SIMULATED_JITTER_SIGMA", "0.2"))
+SIMULATED_ERROR_RATE: float = float(os.environ.get("SIMULATED_ERROR_RATE", "0"))
+SIMULATED_STALL_RATE: float = float(os.environ.get("SIMULATED_STALL_RATE", "0"))
+SIMULATED_STALL_S: float = float(os.environ.get("SIMULATED_STALL_S", "30"))
+
+# Replay provider: serves a provider journal back (recorded answers and latency)
+REPLAY_JOURNAL_PATH: str = os.environ.get("REPLAY_JOURNAL_PATH", "")
+
+# Provider journal: every backend call to rotating gzip JSONL (empty = off)
+TRANSLATION_JOURNAL_PATH: str = os.environ.get("TRANSLATION_JOURNAL_PATH", "")
+TRANSLATION_JOURNAL_MAX_BYTES: int = int(
+    os.environ.get("TRANSLATION_JOURNAL_MAX_BYTES", "67108864")
+)
+TRANSLATION_JOURNAL_BACKUPS: int = int(os.environ.get("TRANSLATION_JOURNAL_BACKUPS", "5"))
+
+# Translation memory (in-process cache in front of the provider; 0 = off,
+# opt-in)
+TRANSLATION_CACHE_SIZE: int = int(os.environ.get("TRANSLATION_CACHE_SIZE", "0"))
+TRANSLATION_CACHE_MAX_BYTES: int = int(os.environ.get("TRANSLATION_CACHE_MAX_BYTES", "8388608"))
+# Persistent translation memory (SQLite file; empty = off)
+TRANSLATION_STORE_PATH: str = os.environ.get("TRANSLATION_STORE_PATH", "")
+TRANSLATION_STORE_MAX_ENTRIES: int = int(os.environ.get("TRANSLATION_STORE_MAX_ENTRIES", "200000"))
+# Shared translation memory across replicas (redis://host:port/db; empty = off)
+TRANSLATION_REMOTE_CACHE_URL: str = os.environ.get("TRANSLATION_REMOTE_CACHE_URL", "")
+TRANSLATION_REMOTE_CACHE_DEADLINE_MS: float = float(
+    os.environ.get("TRANSLATION_REMOTE_CACHE_DEADLINE_MS", "20")
+)
+TRANSLATION_REMOTE_CACHE_TTL_S: float = float(
+    os.environ.get("TRANSLATION_REMOTE_CACHE_TTL_S", "604800")
+)
+
+# Warm-up before the first online status: segmenters, provider connections,
+# one request per target language, bounded (0 = off, opt-in: it delays the
+# online status and costs one backend request per target language)
+WARMUP_TIMEOUT_S: float = float(os.environ.get("WARMUP_TIMEOUT_S", "0"))
+
 # Pipeline (prefix freezing)
 TRANSLATE_PARTIALS: bool = os.environ.get("TRANSLATE_PARTIALS", "true").lower() not in (
     "false", "0", "no", "off",
 )
 SOFT_CHUNK_CHARS: int = int(os.environ.get("SOFT_CHUNK_CHARS", "220"))
+# Chunks needing no model (punctuation, numbers, URLs, lone interjections)
+# are answered without a provider request
+UNTRANSLATABLE_GATE: bool = os.environ.get("UNTRANSLATABLE_GATE", "true").lower() not in (
+    "false", "0", "no", "off",
+)
 TAIL_LIVE_MS: int = int(os.environ.get("TAIL_LIVE_MS", "0"))
+# Live tail: prefill the stable start of the previous tail translations
+TAIL_PREFILL: bool = os.environ.get("TAIL_PREFILL", "false").lower() in ("true", "1", "yes", "on")
+# Streaming: 0 = publish whole translations, > 0 = growing translations of
+# finals/frozen sentences at word boundaries, at most every N ms
+STREAM_PUBLISH_MS: int = int(os.environ.get("STREAM_PUBLISH_MS", "0"))
 MAX_CONCURRENT_TRANSLATIONS: int = int(os.environ.get("MAX_CONCURRENT_TRANSLATIONS", "8"))
+# Adaptive concurrency: the cap moves with observed latency between these
+# bounds, starting from MAX_CONCURRENT_TRANSLATIONS (max 0 = static cap)
+ADAPTIVE_CONCURRENCY_MIN: int = int(os.environ.get("ADAPTIVE_CONCURRENCY_MIN", "1"))
+ADAPTIVE_CONCURRENCY_MAX: int = int(os.environ.get("ADAPTIVE_CONCURRENCY_MAX", "0"))
+# GPU budget per endpoint, in estimated prompt + completion tokens/second
+# (0 = off; requests are then only capped by count)
+TRANSLATION_TOKEN_BUDGET: float = float(os.environ.get("TRANSLATION_TOKEN_BUDGET", "0"))
+# Micro-batching: 0 = off, > 0 = coalesce requests issued within this window
+TRANSLATION_BATCH_WINDOW_MS: int = int(os.environ.get("TRANSLATION_BATCH_WINDOW_MS", "0"))
+TRANSLATION_BATCH_MAX_SIZE: int = int(os.environ.get("TRANSLATION_BATCH_MAX_SIZE", "16"))
+# Resilience: retries (budgeted), circuit breaker, fallback chain. Opt-in
+# (breaker failures 0 = off): a fallback may publish untranslated text.
+TRANSLATION_RETRY_MAX: int = int(os.environ.get("TRANSLATION_RETRY_MAX", "2"))
+TRANSLATION_RETRY_BUDGET: float = float(os.environ.get("TRANSLATION_RETRY_BUDGET", "0.1"))
+TRANSLATION_BREAKER_FAILURES: int = int(os.environ.get("TRANSLATION_BREAKER_FAILURES", "0"))
+TRANSLATION_BREAKER_OPEN_SECONDS: float = float(
+    os.environ.get("TRANSLATION_BREAKER_OPEN_SECONDS", "10")
+)
+# Comma-separated providers tried in order when the main one fails, as
+# "name" or "name@endpoint" (e.g. "translategemma@http://gpu-b:8000,passthrough";
+# passthrough publishes the source text, tagged untranslated)
+TRANSLATION_FALLBACK_PROVIDERS: list[str] = [
+    name.strip()
+    for name in os.environ.get("TRANSLATION_FALLBACK_PROVIDERS", "").split(",")
+    if name.strip()
+]
+# Hedging: duplicate requests slower than the percentile latency of their
+# size bucket, within a budget of extra requests (0 = off)
+TRANSLATION_HEDGE_BUDGET: float = float(os.environ.get("TRANSLATION_HEDGE_BUDGET", "0"))
+TRANSLATION_HEDGE_PERCENTILE: float = float(os.environ.get("TRANSLATION_HEDGE_PERCENTILE", "95"))
 STATE_TTL_SECONDS: float = float(os.environ.get("STATE_TTL_SECONDS", "600"))
 
 # Gate thresholds (tail only)
@@ -1,7 +1,5 @@
 """Pre-translation gate: skip if source text barely changed (RapidFuzz)."""
 
-from rapidfuzz import fuzz
-
 
 def should_skip(
     last_source: str,
@@ -27,6 +25,8 @@ def should_skip(
     if not last_source:
         return False  # First partial always passes
 
+    from rapidfuzz import fuzz  # imported on first use, not at startup
+
     similarity = fuzz.ratio(last_source, new_source)
     chars_added = len(new_source) - len(last_source)
 
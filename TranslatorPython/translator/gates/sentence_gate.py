@@ -1,26 +1,48 @@
 """Pre-translation gate: detect sentence boundaries (pySBD)."""
 
 import re
+from typing import TYPE_CHECKING
 
-import pysbd
-from pysbd.languages import LANGUAGE_CODES
+if TYPE_CHECKING:
+    import pysbd
+
+# pySBD (and its per-language rule modules) is imported on first use, not at
+# startup
 
 # Cache segmenters per language to avoid repeated instantiation
-_segmenters: dict[str, pysbd.Segmenter] = {}
+_segmenters: dict[str, "pysbd.Segmenter"] = {}
+
+_pysbd_languages: set[str] | None = None
+
 
-# Languages actually supported by the installed pySBD, derived from pySBD
-# itself. A hardcoded list here used to include codes pySBD doesn't know
-# (pt, ro, cs, sv, fi, hu, hr, sl, et, lv, lt): Segmenter() then raised
-# ValueError and the whole message was dropped by the MQTT handler — the ASR
-# sometimes misdetects the language (e.g. pt-BR on French speech), so this
-# must fall back to the regex path, never raise.
-PYSBD_LANGUAGES: set[str] = set(LANGUAGE_CODES.keys())
+def pysbd_languages() -> set[str]:
+    """Languages actually supported by the installed pySBD.
+
+    Derived from pySBD itself. A hardcoded list here used to include codes
+    pySBD doesn't know (pt, ro, cs, sv, fi, hu, hr, sl, et, lv, lt):
+    Segmenter() then raised ValueError and the whole message was dropped by
+    the MQTT handler — the ASR sometimes misdetects the language (e.g. pt-BR
+    on French speech), so this must fall back to the regex path, never raise.
+    """
+    global _pysbd_languages
+    if _pysbd_languages is None:
+        from pysbd.languages import LANGUAGE_CODES
+
+        _pysbd_languages = set(LANGUAGE_CODES.keys())
+    return _pysbd_languages
+
+
+def __getattr__(name: str):
+    # PYSBD_LANGUAGES stays importable without importing pySBD up front
+    if name == "PYSBD_LANGUAGES":
+        return pysbd_languages()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Compiled fallback regex for unsupported languages
 _PUNCT_BOUNDARY_RE = re.compile(r"[.!?;]\s")
 
 
-def get_segmenter(lang: str | None) -> pysbd.Segmenter | None:
+def get_segmenter(lang: str | None) -> "pysbd.Segmenter | None":
     """Get a cached pySBD segmenter for the given language.
 
     Args:
@@ -32,9 +54,11 @@ def get_segmenter(lang: str | None) -> pysbd.Segmenter | None:
     if not lang:
         return None
     short = lang.split("-")[0]
-    if short not in PYSBD_LANGUAGES:
+    if short not in pysbd_languages():
         return None
     if short not in _segmenters:
+        import pysbd
+
         _segmenters[short] = pysbd.Segmenter(language=short, clean=False)
     return _segmenters[short]
 
@@ -0,0 +1,75 @@
+"""Pre-provider gate: chunks that need no model at all.
+
+The assembler freezes whatever the speaker punctuates, including chunks
+with nothing to translate: "...", "42.", a URL, a lone "Euh...".
+Each would cost a full provider round trip (~130 ms of fixed overhead on
+TranslateGemma) to get back what we can produce here:
+
+- punctuation only, bare digit strings, URLs and e-mail addresses are
+  copied verbatim. Formatted numbers ("1 000 €", "3,5", "15 %", "12:30")
+  go to the model: separators, units and currencies are written the target
+  locale's way;
+- a single interjection is copied verbatim when it is the same across
+  languages ("Ah !", "Hmm."), and a single hesitation ("euh", "uh", "äh")
+  is mapped to the target language's own; unknown targets go to the model.
+"""
+
+import re
+
+_PUNCTUATION_RE = re.compile(r"[\W_]+")
+_NUMBER_RE = re.compile(r"\d+[.!?…]*")
+_URL_RE = re.compile(r"(?:https?://|www\.)\S+?[.!?…]*|[\w.+-]+@[\w-]+(?:\.[\w-]+)+[.!?…]*")
+# One word, surrounded by punctuation and spaces only
+_WORD_RE = re.compile(r"([\W_]*)(\w+)([\W_]*)")
+
+# Interjections spelled the same in the supported languages
+_UNIVERSAL = frozenset({"ah", "oh", "ha", "haha", "hmm", "hm", "mm", "mmh", "mhm", "ok", "okay"})
+
+# Hesitations (any source language) and how each target language writes one
+_HESITATIONS = frozenset({
+    "euh", "heu", "euuh", "uh", "um", "umm", "er", "erm", "äh", "ähm", "öh", "ehm", "hum",
+})
+_HESITATION_BY_LANG = {
+    "fr": "euh", "en": "uh", "de": "äh", "es": "eh", "it": "ehm", "pt": "hum", "nl": "eh",
+}
+
+
+def _short(lang: str | None) -> str:
+    return (lang or "").replace("_", "-").split("-")[0].lower()
+
+
+def zero_cost_translation(text: str, source_lang: str | None, target_lang: str) -> str | None:
+    """Translation of `text` produced without a model, or None if it needs one.
+
+    Args:
+        text: Source chunk.
+        source_lang: Source language code (e.g. "fr-FR"), or None.
+        target_lang: Target language code.
+
+    Returns:
+        The translation (stripped), or None.
+    """
+    stripped = text.strip()
+    if not stripped:
+        return None
+    if _PUNCTUATION_RE.fullmatch(stripped):
+        return stripped
+    if _NUMBER_RE.fullmatch(stripped):
+        return stripped
+    if _URL_RE.fullmatch(stripped):
+        return stripped
+    match = _WORD_RE.fullmatch(stripped)
+    if match is None:
+        return None
+    before, word, after = match.groups()
+    lower = word.lower()
+    if lower in _UNIVERSAL:
+        return stripped
+    if lower in _HESITATIONS:
+        mapped = _HESITATION_BY_LANG.get(_short(target_lang))
+        if mapped is None:
+            return None
+        if word[0].isupper():
+            mapped = mapped.capitalize()
+        return f"{before}{mapped}{after}"
+    return None
@@ -0,0 +1,156 @@
+"""Provider request journal: rotating, gzip-compressed JSONL.
+
+One record per provider call (text, languages, latency, token usage, result
+or error), written by `JournalProvider` and served back by `ReplayProvider`.
+
+The event loop never touches the disk: records are buffered in memory and
+appended in batches on ONE dedicated worker thread, each batch as one gzip
+member (concatenated members are a valid gzip stream). Past `max_bytes`,
+the file is rotated like logging's RotatingFileHandler: `path` becomes
+`path.1`, `path.1` becomes `path.2`, ... and files beyond `backups` are
+deleted.
+"""
+
+import asyncio
+import gzip
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator
+
+from translator import codec
+
+logger = logging.getLogger(__name__)
+
+
+def journal_files(path: str | Path) -> list[Path]:
+    """The journal files of `path`, oldest first."""
+    path = Path(path)
+    rotated = sorted(
+        (p for p in path.parent.glob(f"{path.name}.*") if p.suffix[1:].isdigit()),
+        key=lambda p: int(p.suffix[1:]),
+        reverse=True,
+    )
+    return [*rotated, path] if path.exists() else rotated
+
+
+def read_journal(path: str | Path) -> Iterator[dict[str, Any]]:
+    """Records of a journal (rotated files included), in write order.
+
+    A truncated last member (process killed mid-write) ends the file.
+    """
+    for file in journal_files(path):
+        try:
+            with gzip.open(file, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        yield codec.loads(line)
+        except (EOFError, gzip.BadGzipFile, codec.DecodeError) as exc:
+            logger.warning("[journal] %s: stopped at a damaged record (%s)", file, exc)
+
+
+class Journal:
+    """Append-only record writer, off the event loop.
+
+    Args:
+        path: Journal file (created if missing, parent directory included).
+        max_bytes: Rotate once the file exceeds this size.
+        backups: Rotated files kept.
+        flush_interval_s: Max delay before buffered records hit the disk.
+        flush_batch: Flush immediately once this many records are buffered.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int = 64 * 1024 * 1024,
+        backups: int = 5,
+        flush_interval_s: float = 1.0,
+        flush_batch: int = 256,
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval_s = flush_interval_s
+        self.flush_batch = flush_batch
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal")
+        self._pending: list[bytes] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Future] = set()
+        self._closed = False
+        self.records = 0
+        self.rotations = 0  # worker thread only
+        self.errors = 0
+
+    # ---------------------------------------------------------- worker thread
+
+    def _write_sync(self, lines: list[bytes]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, "ab") as f:
+            f.write(b"".join(lines))
+        if self.path.stat().st_size > self.max_bytes:
+            self._rotate_sync()
+
+    def _rotate_sync(self) -> None:
+        for i in range(self.backups, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if not src.exists():
+                continue
+            if i == self.backups:
+                src.unlink()
+            else:
+                src.rename(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups > 0:
+            self.path.rename(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self.rotations += 1
+
+    # ------------------------------------------------------------- event loop
+
+    def write(self, record: dict[str, Any]) -> None:
+        """Buffer a record; it reaches the disk at the next flush."""
+        if self._closed:
+            return
+        self._pending.append(codec.dumps(record) + b"\n")
+        if len(self._pending) >= self.flush_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.flush_interval_s, self._flush
+            )
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        lines, self._pending = self._pending, []
+        loop = asyncio.get_running_loop()
+        fut = asyncio.ensure_future(loop.run_in_executor(self._executor, self._write_sync, lines))
+        self._flushes.add(fut)
+        fut.add_done_callback(lambda f, n=len(lines): self._flush_done(f, n))
+
+    def _flush_done(self, fut: asyncio.Future, n: int) -> None:
+        self._flushes.discard(fut)
+        if fut.cancelled():
+            return
+        if fut.exception() is not None:
+            self.errors += 1
+            logger.error("[journal] write of %d records failed: %s", n, fut.exception())
+        else:
+            self.records += n
+
+    async def close(self) -> None:
+        """Flush buffered records and stop the writer thread."""
+        if self._closed:
+            return
+        self._flush()
+        self._closed = True
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+
+    def snapshot(self) -> dict[str, int]:
+        return {"records": self.records, "rotations": self.rotations, "errors": self.errors}
@@ -0,0 +1,119 @@
+"""Concurrency limiter: static cap, or adaptive from observed latency.
+
+Static (default), it is a FIFO semaphore of `limit` slots. Adaptive (gradient
+style, as in TCP Vegas), the limit follows the backend:
+
+- every completed request yields a latency sample per estimated token, so
+  the text-length mix does not read as congestion;
+- the no-load baseline is the lowest per-token latency seen, drifting up by
+  1%/s so it can follow a slower model or GPU (by time, not per sample: at
+  high request rates it would otherwise forget the no-load latency within
+  seconds of overload);
+- gradient = clamp(tolerance * baseline / recent latency, 0.5, 1): 1 while
+  latency stays within `tolerance` of the baseline, < 1 once requests queue
+  inside the backend;
+- new limit = limit * gradient + sqrt(limit) (headroom to probe upwards),
+  smoothed, within [min_limit, max_limit]. The limit only grows while it is
+  actually used (at least half of it in flight).
+
+Failed and cancelled requests give no latency sample.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+_BASELINE_DRIFT_PER_S = 0.01
+_RECENT_ALPHA = 0.2  # EWMA weight of a sample in the recent latency
+
+
+class ConcurrencyLimiter:
+    """FIFO in-flight cap, adaptive when `max_limit > 0`.
+
+    Args:
+        limit: Static limit, or initial limit when adaptive.
+        min_limit / max_limit: Bounds of the adaptive limit.
+        tolerance: Latency increase over the baseline not read as queueing.
+        smoothing: Weight of each new limit estimate (0-1).
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        min_limit: int = 1,
+        max_limit: int = 0,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+    ) -> None:
+        self.adaptive = max_limit > 0
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(max_limit, self.min_limit) if self.adaptive else limit
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self._limit = float(min(max(limit, self.min_limit), self.max_limit))
+        self.inflight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._baseline: float | None = None
+        self._baseline_at = 0.0
+        self._recent: float | None = None
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    async def acquire(self) -> None:
+        if self.inflight < self.limit and not self._waiters:
+            self.inflight += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # the slot was handed over: pass it on
+            elif fut in self._waiters:
+                self._waiters.remove(fut)
+            raise
+
+    def release(self, latency_s: float | None = None, tokens: int = 1) -> None:
+        """Free a slot; `latency_s` of a successful request feeds the limit."""
+        self.inflight -= 1
+        if latency_s is not None and self.adaptive:
+            self._observe(latency_s / max(tokens, 1))
+        while self._waiters and self.inflight < self.limit:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self.inflight += 1
+                fut.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 1) -> AsyncIterator[None]:
+        """Hold a slot for one request of `tokens` estimated tokens."""
+        await self.acquire()
+        t0 = time.monotonic()
+        latency: float | None = None
+        try:
+            yield
+            latency = time.monotonic() - t0
+        finally:
+            self.release(latency, tokens)
+
+    def _observe(self, per_token_s: float) -> None:
+        now = time.monotonic()
+        if self._baseline is None:
+            self._baseline = self._recent = per_token_s
+        else:
+            drift = 1 + _BASELINE_DRIFT_PER_S * (now - self._baseline_at)
+            self._baseline = min(per_token_s, self._baseline * drift)
+            self._recent += _RECENT_ALPHA * (per_token_s - self._recent)
+        self._baseline_at = now
+        gradient = min(1.0, max(0.5, self.tolerance * self._baseline / self._recent))
+        estimate = self._limit * gradient + math.sqrt(self._limit)
+        if estimate > self._limit and self.inflight + 1 < self._limit / 2:
+            return  # app-limited: no evidence the backend takes more
+        limit = (1 - self.smoothing) * self._limit + self.smoothing * estimate
+        self._limit = min(float(self.max_limit), max(float(self.min_limit), limit))
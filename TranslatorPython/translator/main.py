@@ -4,15 +4,31 @@ import asyncio
 import logging
 import signal
 import sys
+import time
+
+
+def load_env() -> None:
+    """Load .envdefault (base defaults), then .env (overrides), into the
+    environment. Done here rather than on `translator.config` import: only
+    the service reads the files."""
+    from pathlib import Path
+
+    from dotenv import load_dotenv
+
+    base_dir = Path(__file__).resolve().parent.parent
+    load_dotenv(base_dir / ".envdefault")
+    load_dotenv(base_dir / ".env", override=True)
 
 
 def main() -> None:
     """Main entry point for the translator service."""
+    started_at = time.monotonic()
+    load_env()
     # Import config first to trigger TRANSLATOR_NAME validation
     from translator import config
     from translator.mqtt_handler import MqttHandler
     from translator.pipeline import Pipeline
-    from translator.providers import load_provider
+    from translator.providers import load_provider, load_provider_spec
 
     # Configure logging
     logging.basicConfig(
@@ -28,8 +44,88 @@ def main() -> None:
         config.TRANSLATION_PROVIDER,
     )
 
+    # Optional wrappers are imported only when enabled (startup time)
+    journal = None
+    if config.TRANSLATION_JOURNAL_PATH:
+        from translator.journal import Journal
+
+        journal = Journal(
+            config.TRANSLATION_JOURNAL_PATH,
+            max_bytes=config.TRANSLATION_JOURNAL_MAX_BYTES,
+            backups=config.TRANSLATION_JOURNAL_BACKUPS,
+        )
+
+    def backend_stage(provider):
+        """Journal, hedging and resilience of ONE backend: each route gets its
+        own, so a failing or slow pool never opens the circuit or skews the
+        hedge delay of the others."""
+        if journal is not None:
+            # Innermost: one record per real backend call
+            from translator.providers.journal import JournalProvider
+
+            provider = JournalProvider(provider, journal)
+        if config.TRANSLATION_HEDGE_BUDGET > 0:
+            from translator.providers.hedge import HedgedProvider
+
+            provider = HedgedProvider(
+                provider,
+                percentile=config.TRANSLATION_HEDGE_PERCENTILE,
+                budget=config.TRANSLATION_HEDGE_BUDGET,
+            )
+        if config.TRANSLATION_BREAKER_FAILURES > 0:
+            from translator.providers.resilience import ResilientProvider
+
+            provider = ResilientProvider(
+                provider,
+                fallbacks=[load_provider_spec(spec) for spec in config.TRANSLATION_FALLBACK_PROVIDERS],
+                max_retries=config.TRANSLATION_RETRY_MAX,
+                retry_budget=config.TRANSLATION_RETRY_BUDGET,
+                breaker_failures=config.TRANSLATION_BREAKER_FAILURES,
+                breaker_open_s=config.TRANSLATION_BREAKER_OPEN_SECONDS,
+            )
+        return provider
+
     # Instantiate provider
-    provider = load_provider(config.TRANSLATION_PROVIDER)
+    provider = backend_stage(load_provider(config.TRANSLATION_PROVIDER))
+    if config.TRANSLATION_ROUTES:
+        from translator.providers.router import RoutingProvider, parse_routes
+
+        provider = RoutingProvider.from_specs(
+            provider, parse_routes(config.TRANSLATION_ROUTES), wrap=backend_stage
+        )
+    if (
+        config.TRANSLATION_CACHE_SIZE > 0
+        or config.TRANSLATION_STORE_PATH
+        or config.TRANSLATION_REMOTE_CACHE_URL
+    ):
+        from translator.cache import TranslationCache
+        from translator.providers.cache import CachedProvider
+        from translator.remote_cache import open_remote_cache
+        from translator.store import TranslationStore
+
+        provider = CachedProvider(
+            provider,
+            TranslationCache(config.TRANSLATION_CACHE_SIZE, config.TRANSLATION_CACHE_MAX_BYTES),
+            store=(
+                TranslationStore(config.TRANSLATION_STORE_PATH, config.TRANSLATION_STORE_MAX_ENTRIES)
+                if config.TRANSLATION_STORE_PATH
+                else None
+            ),
+            remote=(
+                open_remote_cache(
+                    config.TRANSLATION_REMOTE_CACHE_URL,
+                    deadline_s=config.TRANSLATION_REMOTE_CACHE_DEADLINE_MS / 1000,
+                    namespace=f"linto-translator:{config.TRANSLATOR_NAME}",
+                    ttl_s=config.TRANSLATION_REMOTE_CACHE_TTL_S,
+                )
+                if config.TRANSLATION_REMOTE_CACHE_URL
+                else None
+            ),
+        )
+
+    # The token budget is per endpoint
+    endpoints = getattr(provider, "endpoints_snapshot", None)
+    endpoint_count = len(endpoints()) if endpoints is not None else 1
 
     # Create pipeline
     pipeline = Pipeline(
@@ -41,8 +137,18 @@ def main() -> None:
         max_consecutive_holds=config.MAX_CONSECUTIVE_HOLDS,
         translate_partials=config.TRANSLATE_PARTIALS,
         tail_live_ms=config.TAIL_LIVE_MS,
+        tail_prefill=config.TAIL_PREFILL,
+        stream_publish_ms=config.STREAM_PUBLISH_MS,
         soft_chunk_chars=config.SOFT_CHUNK_CHARS,
-        max_concurrent=config.MAX_CONCURRENT_TRANSLATIONS,
+        untranslatable_gate=config.UNTRANSLATABLE_GATE,
+        # A multi-endpoint provider caps concurrency per endpoint: the global
+        # cap is then the sum of the endpoint caps
+        max_concurrent=getattr(provider, "capacity", None) or config.MAX_CONCURRENT_TRANSLATIONS,
+        adaptive_min_concurrent=config.ADAPTIVE_CONCURRENCY_MIN,
+        adaptive_max_concurrent=config.ADAPTIVE_CONCURRENCY_MAX,
+        token_budget=config.TRANSLATION_TOKEN_BUDGET * endpoint_count,
+        batch_window_ms=config.TRANSLATION_BATCH_WINDOW_MS,
+        batch_max_size=config.TRANSLATION_BATCH_MAX_SIZE,
         state_ttl_s=config.STATE_TTL_SECONDS,
     )
 
@@ -53,6 +159,8 @@ def main() -> None:
         translator_name=config.TRANSLATOR_NAME,
         languages=config.EU_LANGUAGES,
         pipeline=pipeline,
+        warmup_timeout_s=config.WARMUP_TIMEOUT_S,
+        started_at=started_at,
     )
 
     # Wire publish function
@@ -67,7 +175,13 @@ def main() -> None:
         for sig in (signal.SIGINT, signal.SIGTERM):
             loop.add_signal_handler(sig, lambda: asyncio.ensure_future(handler.shutdown()))
 
-        await handler.run()
+        try:
+            await handler.run()
+        finally:
+            # Flushes persistent state (translation store) and HTTP pools
+            close = getattr(provider, "close", None)
+            if close is not None:
+                await close()
 
     try:
         loop.run_until_complete(run_with_shutdown())
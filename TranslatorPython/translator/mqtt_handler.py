@@ -1,12 +1,12 @@
 """MQTT client: subscriptions, LWT setup, message routing."""
 
 import asyncio
-import json
 import logging
-from typing import Any
+import time
 
 import aiomqtt
 
+from translator import codec
 from translator.pipeline import Pipeline
 
 logger = logging.getLogger(__name__)
@@ -21,6 +21,10 @@ class MqttHandler:
         translator_name: Unique translator identifier.
         languages: List of supported language codes.
         pipeline: Anti-flicker pipeline instance.
+        warmup_timeout_s: Bound of the warm-up run before the first online
+            status (0 = no warm-up).
+        started_at: time.monotonic() of the process start, for the
+            time-to-ready report (default: handler creation).
     """
 
     def __init__(
@@ -30,18 +34,23 @@ class MqttHandler:
         translator_name: str,
         languages: list[str],
         pipeline: Pipeline,
+        warmup_timeout_s: float = 0.0,
+        started_at: float | None = None,
     ) -> None:
         self.broker_host = broker_host
         self.broker_port = broker_port
         self.translator_name = translator_name
         self.languages = languages
         self.pipeline = pipeline
+        self.warmup_timeout_s = warmup_timeout_s
+        self.started_at = time.monotonic() if started_at is None else started_at
+        self._ready = False
 
         self.status_topic = f"translator/out/{translator_name}/status"
-        self.online_payload = json.dumps(
+        self.online_payload = codec.dumps(
             {"name": translator_name, "languages": languages, "online": True}
         )
-        self.offline_payload = json.dumps(
+        self.offline_payload = codec.dumps(
             {"name": translator_name, "languages": [], "online": False}
         )
 
@@ -53,7 +62,7 @@ class MqttHandler:
         session_id: str,
         channel_id: str,
         action: str,
-        payload: dict[str, Any],
+        payload: codec.TranslationPayload,
         key: str,
     ) -> None:
         """Publish a translation result to MQTT.
@@ -62,7 +71,7 @@ class MqttHandler:
             session_id: Session identifier from the topic.
             channel_id: Channel identifier from the topic.
             action: "partial" or "final".
-            payload: Translation payload dict.
+            payload: Translation payload.
             key: Pipeline state key (for logging).
         """
         if self._client is None:
@@ -72,14 +81,16 @@ class MqttHandler:
         topic = f"transcriber/out/{session_id}/{channel_id}/{action}/translations"
         try:
             await self._client.publish(
-                topic, json.dumps(payload), qos=1
+                topic, codec.encode_translation(payload), qos=1
             )
-            logger.debug("Published to %s: segmentId=%s", topic, payload.get("segmentId"))
+            logger.debug("Published to %s: segmentId=%s", topic, payload.segmentId)
         except Exception:
             logger.exception("Failed to publish to %s", topic)
 
     async def run(self) -> None:
-        """Run the MQTT client with reconnection loop."""
+        """Warm up, then run the MQTT client with reconnection loop."""
+        if self.warmup_timeout_s > 0:
+            await self.pipeline.warm_up(self.languages, self.warmup_timeout_s)
         while not self._shutdown_event.is_set():
             try:
                 await self._connect_and_listen()
@@ -121,6 +132,9 @@ class MqttHandler:
                 self.status_topic, self.online_payload, qos=1, retain=True
             )
             logger.info("Published online status to %s", self.status_topic)
+            if not self._ready:
+                self._ready = True
+                logger.info("Ready %.2fs after start", time.monotonic() - self.started_at)
 
             # Subscribe to transcription topics
             await client.subscribe("transcriber/out/+/+/final", qos=1)
@@ -180,43 +194,33 @@ class MqttHandler:
             return
 
         try:
-            payload = message.payload
-            if isinstance(payload, (bytes, bytearray)):
-                payload = payload.decode("utf-8")
-            transcription = json.loads(payload)
-        except (json.JSONDecodeError, UnicodeDecodeError):
+            # Keeps only our own targets (externalTranslations) and the fields
+            # the pipeline reads
+            transcription = codec.decode_transcription(message.payload, self.translator_name)
+        except codec.DecodeError:
             logger.warning("Invalid JSON on topic %s", topic_str)
             return
 
-        # Filter: check externalTranslations for our translator
-        external = transcription.get("externalTranslations")
-        if not external or not isinstance(external, list):
-            return
-
-        matching_targets = [
-            entry for entry in external
-            if entry.get("translator") == self.translator_name
-        ]
-        if not matching_targets:
+        # Filter: no externalTranslations entry for our translator
+        if not transcription.targets:
             return
 
         # Skip empty text
-        text = transcription.get("text", "")
-        if not text or not text.strip():
+        if not transcription.text.strip():
             return
 
         # Skip packets with no source language — can't translate without it
-        if not transcription.get("lang"):
+        if not transcription.lang:
             logger.debug("Skipping packet with no source lang on %s", topic_str)
             return
 
         if action == "final":
             await self.pipeline.handle_final(
-                session_id, channel_id, transcription, matching_targets
+                session_id, channel_id, transcription, transcription.targets
             )
         else:
             await self.pipeline.handle_partial(
-                session_id, channel_id, transcription, matching_targets
+                session_id, channel_id, transcription, transcription.targets
             )
 
     async def shutdown(self) -> None:
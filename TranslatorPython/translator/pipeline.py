@@ -9,7 +9,21 @@ Built around two invariants:
 - By default nothing is re-translated until new punctuation closes a
   sentence (finals excepted). Live tail updates between punctuation marks
   are opt-in (`tail_live_ms > 0`) and go through a latest-wins slot with a
-  minimum interval.
+  minimum interval. With `tail_prefill`, the part of the tail translation
+  that the last two tail translations agree on is prefilled, so only the
+  newly spoken part is decoded.
+
+With `stream_publish_ms > 0`, finals and frozen sentences are translated in
+streaming mode and their growing translation is published as partials, at
+word boundaries, while decoding continues.
+
+Target languages are canonicalized by the provider before fan-out: codes
+translated the same way (`en-US`, `en-GB`) share one translation stream,
+published under each requested code, and targets in the source language
+are passed through without any request.
+
+Chunks that need no model (punctuation, numbers, URLs, a lone interjection)
+are answered by the untranslatable gate, without any request either.
 
 Finals always win: they are translated with priority, reuse the frozen
 prefix (and the last tail translation when the remainder is identical —
@@ -24,13 +38,19 @@ import time
 from dataclasses import dataclass, field
 from typing import Any, Callable, Coroutine
 
+from translator import assembler
 from translator.assembler import SegmentAssembler
-from translator.gates import change_gate, stability_gate
-from translator.providers.base import TranslationProvider
-from translator.scheduler import TranslationScheduler
+from translator.codec import Transcription, TranslationPayload
+from translator.gates import change_gate, stability_gate, untranslatable
+from translator.providers.base import WARM_UP, TranslationProvider, UntranslatedText
+from translator.scheduler import ProgressCallback, TranslationScheduler
 
 logger = logging.getLogger(__name__)
 
+# Warm-up sentence per source language (targets are warmed from French,
+# French itself from English)
+_WARMUP_TEXTS = {"fr": "Bonjour à tous, merci d'être là.", "en": "Hello everyone, thanks for being here."}
+
 
 @dataclass
 class ChannelState:
@@ -43,13 +63,15 @@ class ChannelState:
 
 @dataclass
 class KeyState:
-    """Per (session, channel, targetLang) segment state."""
+    """Per (session, channel, canonical targetLang) segment state."""
 
     frozen_dst: dict[int, str] = field(default_factory=dict)
     pending_freezes: set[asyncio.Task] = field(default_factory=set)
     submitted_tail_src: str = ""   # change-gate reference, set at SUBMISSION (fixes D3)
     last_tail_src: str = ""        # last COMPLETED tail translation (P7 cache)
     last_tail_dst: str = ""
+    prev_tail_src: str = ""        # the one before (tail prefill agreement)
+    prev_tail_dst: str = ""
     tail_version: int = 0
     published_tail_version: int = -1
     last_published_text: str = ""
@@ -68,6 +90,7 @@ class PipelineStats:
     translated: int = 0
     freezes: int = 0
     tail_updates: int = 0
+    tail_prefilled: int = 0       # tail requests continuing an agreed prefix
     published: int = 0
     held: int = 0
     skipped_change: int = 0
@@ -75,6 +98,9 @@ class PipelineStats:
     finals_full_retranslated: int = 0
     assembler_resets: int = 0
     dropped_stale: int = 0
+    streamed: int = 0             # progressive publications of a growing translation
+    passthrough: int = 0          # same-language publications (no request)
+    untranslatable: int = 0       # chunks answered without a model call
 
     def reset(self) -> None:
         for f in self.__dataclass_fields__:
@@ -82,7 +108,7 @@ class PipelineStats:
 
 
 # Type alias for the publish callback
-PublishCallback = Callable[[str, str, str, dict[str, Any], str], Coroutine[Any, Any, None]]
+PublishCallback = Callable[[str, str, str, TranslationPayload, str], Coroutine[Any, Any, None]]
 
 
 class Pipeline:
@@ -100,8 +126,26 @@ class Pipeline:
         tail_live_ms: 0 = tail updates only at punctuation (default);
             > 0 = live tail updates through a latest-wins slot, at most one
             in flight per key and one per interval.
+        tail_prefill: Live tail only: prefill the agreed start of the last
+            two tail translations (`translate_continue`) instead of
+            retranslating the whole tail.
+        stream_publish_ms: 0 = translations are published once complete
+            (default); > 0 = finals and frozen sentences are streamed and
+            their growing translation is published at word boundaries, at
+            most once per interval.
         soft_chunk_chars: Freeze budget for unpunctuated speech.
-        max_concurrent: Global cap on in-flight provider requests.
+        max_concurrent: Global cap on in-flight provider requests (initial
+            cap when adaptive).
+        adaptive_min_concurrent / adaptive_max_concurrent: bounds of the
+            adaptive cap, moved by observed latency; max 0 = static cap.
+        token_budget: 0 = off (default); > 0 = GPU budget in estimated
+            tokens/second, requests wait for it before taking a slot.
+        batch_window_ms: 0 = one provider request per translation (default);
+            > 0 = requests issued within this window are coalesced into one
+            `translate_batch()` call.
+        batch_max_size: Flush a batch early once it holds this many items.
+        untranslatable_gate: Answer chunks that need no model (punctuation,
+            numbers, URLs, lone interjections) without a provider request.
         state_ttl_s: Purge state for keys inactive longer than this.
         debounce_ms / max_hold_seconds: deprecated, accepted and ignored.
     """
@@ -116,8 +160,16 @@ class Pipeline:
         max_consecutive_holds: int = 2,
         translate_partials: bool = True,
         tail_live_ms: int = 0,
+        tail_prefill: bool = False,
+        stream_publish_ms: int = 0,
         soft_chunk_chars: int = 220,
         max_concurrent: int = 8,
+        adaptive_min_concurrent: int = 1,
+        adaptive_max_concurrent: int = 0,
+        token_budget: float = 0.0,
+        batch_window_ms: int = 0,
+        batch_max_size: int = 16,
+        untranslatable_gate: bool = True,
         state_ttl_s: float = 600.0,
         debounce_ms: int | None = None,      # deprecated
         max_hold_seconds: float | None = None,  # deprecated
@@ -130,7 +182,10 @@ class Pipeline:
         self.max_consecutive_holds = max_consecutive_holds
         self.translate_partials = translate_partials
         self.tail_live_ms = tail_live_ms
+        self.tail_prefill = tail_prefill
+        self.stream_publish_ms = stream_publish_ms
         self.soft_chunk_chars = soft_chunk_chars
+        self.untranslatable_gate = untranslatable_gate
         self.state_ttl_s = state_ttl_s
         if debounce_ms is not None:
             logger.warning("[pipeline] debounce_ms is deprecated and ignored (use tail_live_ms)")
@@ -141,10 +196,16 @@ class Pipeline:
             provider,
             max_concurrent=max_concurrent,
             min_tail_interval_ms=tail_live_ms if tail_live_ms > 0 else 0,
+            batch_window_ms=batch_window_ms,
+            batch_max_size=batch_max_size,
+            stream_interval_ms=stream_publish_ms,
+            token_budget=token_budget,
+            adaptive_min_concurrent=adaptive_min_concurrent,
+            adaptive_max_concurrent=adaptive_max_concurrent,
         )
 
         self._channels: dict[str, ChannelState] = {}   # "{session}/{channel}"
-        self._states: dict[str, KeyState] = {}         # "{session}/{channel}/{lang}"
+        self._states: dict[str, KeyState] = {}         # "{session}/{channel}/{canonical lang}"
         self._stats = PipelineStats()
         self._stats_task: asyncio.Task[None] | None = None
         self._ttl_task: asyncio.Task[None] | None = None
@@ -160,6 +221,41 @@ class Pipeline:
         st.last_activity = time.monotonic()
         return st
 
+    def _fan_out(
+        self, source_lang: str | None, targets: list[str]
+    ) -> tuple[list[str], dict[str, list[str]]]:
+        """Requested target codes -> (same-language codes, {canonical language: codes}).
+
+        Each canonical language is translated once and published under every
+        code mapping to it; same-language codes are published untranslated.
+        """
+        source = self.provider.canonical_lang(source_lang) if source_lang else None
+        passthrough: list[str] = []
+        groups: dict[str, list[str]] = {}
+        for code in dict.fromkeys(targets):
+            lang = self.provider.canonical_lang(code)
+            if lang == source:
+                passthrough.append(code)
+            else:
+                groups.setdefault(lang, []).append(code)
+        return passthrough, groups
+
+    async def _publish(
+        self,
+        session_id: str,
+        channel_id: str,
+        action: str,
+        transcription: Transcription,
+        text: str,
+        codes: list[str],
+    ) -> None:
+        """Publish one translation under each requested target code."""
+        for code in codes:
+            payload = self._build_payload(transcription, text, code, final=action == "final")
+            key = f"{session_id}/{channel_id}/{code}"
+            await self.publish_fn(session_id, channel_id, action, payload, key)
+            self._stats.published += 1
+
     def _fire_task(self, coro) -> asyncio.Task:
         task = asyncio.create_task(coro)
         self._active_tasks.add(task)
@@ -178,11 +274,91 @@ class Pipeline:
             parts.append(tail_dst)
         return " ".join(parts)
 
+    def _zero_cost(self, text: str, source_lang: str | None, target_lang: str) -> str | None:
+        """Translation produced without a model (untranslatable gate), or None."""
+        if not self.untranslatable_gate:
+            return None
+        translated = untranslatable.zero_cost_translation(text, source_lang, target_lang)
+        if translated is not None:
+            self._stats.untranslatable += 1
+        return translated
+
+    async def _freeze(
+        self,
+        key: str,
+        text: str,
+        source_lang: str | None,
+        target_lang: str,
+        on_progress: ProgressCallback | None = None,
+    ) -> str:
+        """Scheduler freeze, unless the chunk needs no model at all."""
+        translated = self._zero_cost(text, source_lang, target_lang)
+        if translated is not None:
+            return translated
+        return await self.scheduler.freeze(key, text, source_lang, target_lang, on_progress)
+
     def _frozen_complete(self, st: KeyState, expected: int) -> bool:
         return all(i in st.frozen_dst for i in range(expected))
 
+    def _cancel_freezes(self, st: KeyState) -> None:
+        """Abort freezes whose result can no longer be published."""
+        for task in st.pending_freezes:
+            task.cancel()
+        st.pending_freezes.clear()
+
     # ------------------------------------------------------------ maintenance
 
+    async def warm_up(self, target_langs: list[str], timeout_s: float) -> dict[str, Any]:
+        """Make the first real sentences as fast as the next ones.
+
+        Builds the sentence segmenters of the configured languages, opens the
+        provider's connections (optional `warm_up()`: HTTP pool, local worker
+        processes), then translates one short sentence per target language
+        through the scheduler (cold backend caches), once per canonical
+        language. Bounded by `timeout_s`: whatever is not warm by then warms
+        up with traffic. The requests bypass the translation memory and the
+        journal (`WARM_UP`): they warm the backend, not the cache.
+        """
+        t0 = time.monotonic()
+        canonical = list(dict.fromkeys(self.provider.canonical_lang(t) for t in target_langs))
+        report: dict[str, Any] = {
+            "segmenters": assembler.warm_up(target_langs),
+            "requests": len(canonical),
+            "ok": 0,
+            "timed_out": False,
+        }
+
+        async def request(target_lang: str) -> None:
+            src = "en" if target_lang == "fr" else "fr"
+            key = f"warmup/{target_lang}"
+            # Local to this request's task (and the calls it spawns)
+            WARM_UP.set(True)
+            try:
+                await self.scheduler.freeze(key, _WARMUP_TEXTS[src], src, target_lang)
+                report["ok"] += 1
+            finally:
+                self.scheduler.purge_key(key)
+
+        async def provider_phase() -> None:
+            warm = getattr(self.provider, "warm_up", None)
+            if warm is not None:
+                await warm()
+            await asyncio.gather(*(request(tgt) for tgt in canonical), return_exceptions=True)
+
+        try:
+            await asyncio.wait_for(provider_phase(), max(0.0, timeout_s - (time.monotonic() - t0)))
+        except asyncio.TimeoutError:
+            report["timed_out"] = True
+        except Exception:
+            logger.exception("[warmup] provider warm-up failed")
+        report["seconds"] = time.monotonic() - t0
+        logger.info(
+            "[warmup] %s in %.2fs: segmenters=%d requests=%d/%d ok",
+            "timed out" if report["timed_out"] else "done", report["seconds"],
+            report["segmenters"], report["ok"], report["requests"],
+        )
+        return report
+
     async def start_stats_logger(self) -> None:
         """Start periodic stats logging (every 60s) and the TTL reaper.
 
@@ -203,15 +379,23 @@ class Pipeline:
                 sched = self.scheduler.snapshot()
                 logger.info(
                     "[stats] last 60s: partials=%d finals=%d translated=%d "
-                    "(freezes=%d tails=%d) published=%d held=%d skipped_change=%d "
-                    "finals_reused=%d finals_full=%d resets=%d stale=%d | "
-                    "inflight=%d superseded=%d errors=%d",
+                    "(freezes=%d tails=%d prefilled=%d) published=%d held=%d skipped_change=%d "
+                    "finals_reused=%d finals_full=%d resets=%d stale=%d streamed=%d "
+                    "passthrough=%d untranslatable=%d | "
+                    "inflight=%d limit=%d superseded=%d cancelled=%d cancelled_queued=%d errors=%d",
                     s.partials_received, s.finals_received, s.translated,
-                    s.freezes, s.tail_updates, s.published, s.held,
+                    s.freezes, s.tail_updates, s.tail_prefilled, s.published, s.held,
                     s.skipped_change, s.finals_reused, s.finals_full_retranslated,
-                    s.assembler_resets, s.dropped_stale,
-                    sched["inflight"], sched["tail_superseded"], sched["errors"],
+                    s.assembler_resets, s.dropped_stale, s.streamed, s.passthrough,
+                    s.untranslatable,
+                    sched["inflight"], sched["limit"], sched["tail_superseded"], sched["cancelled"],
+                    sched["cancelled_queued"], sched["errors"],
                 )
+                if "budget_throttled" in sched:
+                    logger.info(
+                        "[stats] token budget cumulative: throttled=%d wait_s=%.1f",
+                        sched["budget_throttled"], sched["budget_wait_s"],
+                    )
                 usage = getattr(self.provider, "usage_snapshot", None)
                 if usage is not None:
                     u = usage()
@@ -221,6 +405,102 @@ class Pipeline:
                         u["requests"], u["prompt_tokens"],
                         u["completion_tokens"], u["truncated"],
                     )
+                local = getattr(self.provider, "local_snapshot", None)
+                if local is not None:
+                    lo = local()
+                    logger.info(
+                        "[stats] local cumulative: workers=%d requests=%d chunks=%d",
+                        lo["workers"], lo["requests"], lo["chunks"],
+                    )
+                simulated = getattr(self.provider, "simulated_snapshot", None)
+                if simulated is not None:
+                    si = simulated()
+                    logger.info(
+                        "[stats] simulated cumulative: requests=%d errors=%d stalls=%d inflight=%d",
+                        si["requests"], si["errors"], si["stalls"], si["inflight"],
+                    )
+                routes = getattr(self.provider, "routes_snapshot", None)
+                if routes is not None:
+                    for name, r in routes().items():
+                        logger.info(
+                            "[stats] route %s cumulative: requests=%d errors=%d inflight=%d/%d%s",
+                            name, r["requests"], r["errors"], r["inflight"], r["limit"],
+                            f" | {r['circuits']}" if "circuits" in r else "",
+                        )
+                journal = getattr(self.provider, "journal_snapshot", None)
+                if journal is not None:
+                    j = journal()
+                    logger.info(
+                        "[stats] journal cumulative: records=%d rotations=%d errors=%d",
+                        j["records"], j["rotations"], j["errors"],
+                    )
+                replay = getattr(self.provider, "replay_snapshot", None)
+                if replay is not None:
+                    r = replay()
+                    logger.info(
+                        "[stats] replay cumulative: requests=%d misses=%d",
+                        r["requests"], r["misses"],
+                    )
+                cache = getattr(self.provider, "cache_snapshot", None)
+                if cache is not None:
+                    c = cache()
+                    logger.info(
+                        "[stats] cache cumulative: hits=%d misses=%d evictions=%d "
+                        "rejected=%d entries=%d bytes=%d",
+                        c["hits"], c["misses"], c["evictions"],
+                        c["rejected"], c["entries"], c["bytes"],
+                    )
+                transport = getattr(self.provider, "transport_snapshot", None)
+                if transport is not None:
+                    t = transport()
+                    logger.info(
+                        "[stats] http cumulative: requests=%d pool_wait_ms_avg=%.1f "
+                        "pool_wait_ms_max=%.1f connections_opened=%d",
+                        t["requests"], t["pool_wait_ms_avg"], t["pool_wait_ms_max"],
+                        t["connections_opened"],
+                    )
+                resilience = getattr(self.provider, "resilience_snapshot", None)
+                if resilience is not None:
+                    r = resilience()
+                    logger.info(
+                        "[stats] resilience cumulative: retries=%d retries_denied=%d "
+                        "fallbacks=%d rejected=%d | %s",
+                        r["retries"], r["retries_denied"], r["fallbacks"], r["rejected"],
+                        r["circuits"],
+                    )
+                hedge = getattr(self.provider, "hedge_snapshot", None)
+                if hedge is not None:
+                    h = hedge()
+                    logger.info(
+                        "[stats] hedging cumulative: requests=%d hedged=%d hedge_wins=%d "
+                        "budget_denied=%d",
+                        h["requests"], h["hedged"], h["hedge_wins"], h["budget_denied"],
+                    )
+                endpoints = getattr(self.provider, "endpoints_snapshot", None)
+                for e in endpoints() if endpoints is not None else []:
+                    logger.info(
+                        "[stats] endpoint %s: outstanding=%d waiting=%g requests=%d "
+                        "errors=%d ejected=%s ms_per_token=%.1f",
+                        e["url"], e["outstanding"], e["waiting"], e["requests"],
+                        e["errors"], e["ejected"], e["ms_per_token"],
+                    )
+                store = getattr(self.provider, "store_snapshot", None)
+                d = store() if store is not None else None
+                if d is not None:
+                    logger.info(
+                        "[stats] store cumulative: hits=%d misses=%d writes=%d "
+                        "compactions=%d errors=%d",
+                        d["hits"], d["misses"], d["writes"], d["compactions"], d["errors"],
+                    )
+                remote = getattr(self.provider, "remote_cache_snapshot", None)
+                rc = remote() if remote is not None else None
+                if rc is not None:
+                    logger.info(
+                        "[stats] remote cache cumulative: hits=%d misses=%d hit_rate=%.2f "
+                        "timeouts=%d errors=%d writes=%d dropped=%d read_ms avg=%.1f max=%.1f",
+                        rc["hits"], rc["misses"], rc["hit_rate"], rc["timeouts"], rc["errors"],
+                        rc["writes"], rc["dropped_writes"], rc["avg_read_ms"], rc["max_read_ms"],
+                    )
                 s.reset()
         except asyncio.CancelledError:
             pass
@@ -265,51 +545,64 @@ class Pipeline:
         self,
         session_id: str,
         channel_id: str,
-        transcription: dict[str, Any],
-        targets: list[dict[str, str]],
+        transcription: Transcription,
+        targets: list[str],
     ) -> None:
         """Handle a partial transcription event.
 
         Segmentation is done ONCE per event (shared across target languages);
-        newly frozen sentences are translated exactly once per language; the
-        unfrozen tail is only translated in live mode (`tail_live_ms > 0`).
+        newly frozen sentences are translated exactly once per canonical
+        language; the unfrozen tail is only translated in live mode
+        (`tail_live_ms > 0`).
         """
         self._stats.partials_received += 1
         if not self.translate_partials:
             return
 
-        source_lang = transcription.get("lang")
-        seg_id = transcription.get("segmentId")
+        source_lang = transcription.lang
+        seg_id = transcription.segment_id
         ch_key = f"{session_id}/{channel_id}"
+        passthrough, groups = self._fan_out(source_lang, targets)
+        if passthrough:
+            self._stats.passthrough += len(passthrough)
+            await self._publish(
+                session_id, channel_id, "partial", transcription,
+                transcription.text.strip(), passthrough,
+            )
+        if not groups:
+            return
 
         ch = self._channels.get(ch_key)
         if ch is None or ch.segment_id != seg_id:
             # New segment: fresh assembler. Old per-lang states were purged by
             # the final; if the final never came, void them now.
             if ch is not None:
-                for target in targets:
-                    stale_key = f"{ch_key}/{target['targetLang']}"
-                    self._states.pop(stale_key, None)
+                for target_lang in groups:
+                    stale_key = f"{ch_key}/{target_lang}"
+                    stale = self._states.pop(stale_key, None)
+                    if stale is not None:
+                        self._cancel_freezes(stale)
                     self.scheduler.purge_key(stale_key)
             ch = self._channels[ch_key] = ChannelState(
                 assembler=SegmentAssembler(self.soft_chunk_chars), segment_id=seg_id
             )
         ch.last_activity = time.monotonic()
 
-        result = ch.assembler.update(transcription["text"], source_lang)
+        result = ch.assembler.update(transcription.text, source_lang)
 
         if result.reset:
             self._stats.assembler_resets += 1
-            for target in targets:
-                key = f"{ch_key}/{target['targetLang']}"
+            for target_lang in groups:
+                key = f"{ch_key}/{target_lang}"
                 st = self._states.get(key)
                 if st is not None:
+                    # In-flight freezes translate sentences that no longer exist
+                    self._cancel_freezes(st)
                     st.frozen_dst.clear()
                     st.tail_version += 1  # invalidate in-flight tail completions
                 self.scheduler.cancel_key(key)
 
-        for target in targets:
-            target_lang = target["targetLang"]
+        for target_lang, codes in groups.items():
             key = f"{ch_key}/{target_lang}"
             st = self._get_key_state(key)
 
@@ -317,7 +610,7 @@ class Pipeline:
                 task = self._fire_task(
                     self._freeze_and_publish(
                         session_id, channel_id, key, st, idx, sentence,
-                        transcription, target_lang,
+                        transcription, target_lang, codes,
                     )
                 )
                 st.pending_freezes.add(task)
@@ -332,11 +625,47 @@ class Pipeline:
                     continue
                 st.submitted_tail_src = result.tail
                 st.tail_version += 1
+                on_done = self._make_tail_callback(
+                    session_id, channel_id, key, st, transcription, target_lang, codes
+                )
+                translated = self._zero_cost(result.tail, source_lang, target_lang)
+                if translated is not None:
+                    # Older tail requests could only be dropped as stale
+                    self.scheduler.cancel_key(key)
+                    self._fire_task(on_done(st.tail_version, result.tail, translated))
+                    continue
+                prefix = self._tail_prefix(st, result.tail) if self.tail_prefill else ""
+                if prefix:
+                    self._stats.tail_prefilled += 1
                 self.scheduler.submit_tail(
-                    key, result.tail, source_lang, target_lang, st.tail_version,
-                    self._make_tail_callback(session_id, channel_id, key, st, transcription, target_lang),
+                    key, result.tail, source_lang, target_lang, st.tail_version, on_done,
+                    prefix=prefix,
                 )
 
+    @staticmethod
+    def _tail_prefix(st: KeyState, tail: str) -> str:
+        """Stable start of the tail translation, to prefill ("" = full retranslation).
+
+        The words the last two tail translations agree on (local agreement),
+        provided the new tail still starts with both of their sources: once
+        the ASR rewrites words under the prefix, it is retranslated in full.
+        """
+        if not st.prev_tail_dst or not st.last_tail_dst or any(
+            isinstance(dst, UntranslatedText) for dst in (st.prev_tail_dst, st.last_tail_dst)
+        ):
+            return ""
+        words = tail.split()
+        for src in (st.prev_tail_src, st.last_tail_src):
+            src_words = src.split()
+            if not src_words or words[:len(src_words)] != src_words:
+                return ""
+        agreed: list[str] = []
+        for prev, last in zip(st.prev_tail_dst.split(), st.last_tail_dst.split()):
+            if prev != last:
+                break
+            agreed.append(prev)
+        return " ".join(agreed)
+
     async def _freeze_and_publish(
         self,
         session_id: str,
@@ -345,17 +674,33 @@ class Pipeline:
         st: KeyState,
         idx: int,
         sentence: str,
-        transcription: dict[str, Any],
+        transcription: Transcription,
         target_lang: str,
+        codes: list[str],
     ) -> None:
+        on_progress = None
+        if self.stream_publish_ms > 0:
+            async def on_progress(partial: str) -> None:
+                # Only the next sentence in line extends the displayed text
+                if (
+                    self._states.get(key) is not st
+                    or st.finalized
+                    or idx in st.frozen_dst
+                    or not self._frozen_complete(st, idx)
+                ):
+                    return
+                text = self._assemble(st, partial)
+                await self._publish_progress(session_id, channel_id, transcription, text, codes)
+                st.last_published_text = text
+                st.has_published = True
         try:
-            translated = await self.scheduler.freeze(
-                key, sentence, transcription.get("lang"), target_lang
+            translated = await self._freeze(
+                key, sentence, transcription.lang, target_lang, on_progress
             )
         except Exception:
             logger.exception(
                 "[pipeline] seg=%s ch=%s lang=%s freeze error idx=%d",
-                transcription.get("segmentId"), channel_id, target_lang, idx,
+                transcription.segment_id, channel_id, target_lang, idx,
             )
             return
         self._stats.translated += 1
@@ -370,15 +715,25 @@ class Pipeline:
             return  # the final task will assemble and publish
 
         text = self._assemble(st, st.last_tail_dst)
-        payload = self._build_payload(transcription, text, target_lang, final=False)
         logger.debug(
             "[pipeline] seg=%s ch=%s lang=%s action=PUBLISH reason=freeze idx=%d",
-            transcription.get("segmentId"), channel_id, target_lang, idx,
+            transcription.segment_id, channel_id, target_lang, idx,
         )
-        await self.publish_fn(session_id, channel_id, "partial", payload, key)
+        await self._publish(session_id, channel_id, "partial", transcription, text, codes)
         st.last_published_text = text
         st.has_published = True
-        self._stats.published += 1
+
+    async def _publish_progress(
+        self,
+        session_id: str,
+        channel_id: str,
+        transcription: Transcription,
+        text: str,
+        codes: list[str],
+    ) -> None:
+        """Publish a translation still being decoded (streaming mode)."""
+        await self._publish(session_id, channel_id, "partial", transcription, text, codes)
+        self._stats.streamed += len(codes)
 
     def _make_tail_callback(
         self,
@@ -386,12 +741,14 @@ class Pipeline:
         channel_id: str,
         key: str,
         st: KeyState,
-        transcription: dict[str, Any],
+        transcription: Transcription,
         target_lang: str,
+        codes: list[str],
     ):
         async def on_done(version: int, source_text: str, translated: str) -> None:
             self._stats.translated += 1
             self._stats.tail_updates += 1
+            st.prev_tail_src, st.prev_tail_dst = st.last_tail_src, st.last_tail_dst
             st.last_tail_src = source_text
             st.last_tail_dst = translated
             # Monotonicity guard: stale completions are recorded (cache) but never published
@@ -416,12 +773,10 @@ class Pipeline:
                     return
             st.consecutive_holds = 0
 
-            payload = self._build_payload(transcription, text, target_lang, final=False)
-            await self.publish_fn(session_id, channel_id, "partial", payload, key)
+            await self._publish(session_id, channel_id, "partial", transcription, text, codes)
             st.published_tail_version = version
             st.last_published_text = text
             st.has_published = True
-            self._stats.published += 1
 
         return on_done
 
@@ -431,8 +786,8 @@ class Pipeline:
         self,
         session_id: str,
         channel_id: str,
-        transcription: dict[str, Any],
-        targets: list[dict[str, str]],
+        transcription: Transcription,
+        targets: list[str],
     ) -> None:
         """Handle a final transcription event.
 
@@ -446,18 +801,20 @@ class Pipeline:
         ch = self._channels.pop(ch_key, None)
         frozen_src = list(ch.assembler.frozen_src) if ch else []
         consumed_text = ch.assembler.consumed_text if ch else ""
+        passthrough, groups = self._fan_out(transcription.lang, targets)
         lang_states: dict[str, KeyState | None] = {}
-        for target in targets:
-            key = f"{ch_key}/{target['targetLang']}"
+        for target_lang in groups:
+            key = f"{ch_key}/{target_lang}"
             st = self._states.pop(key, None)
             if st is not None:
                 st.finalized = True
-            self.scheduler.cancel_key(key)
-            lang_states[target["targetLang"]] = st
+            # An in-flight tail may be translating the final's remainder
+            self.scheduler.drop_pending_tail(key)
+            lang_states[target_lang] = st
 
         self._fire_task(
             self._finalize_all(
-                session_id, channel_id, transcription, targets,
+                session_id, channel_id, transcription, passthrough, groups,
                 frozen_src, consumed_text, lang_states,
             )
         )
@@ -466,54 +823,64 @@ class Pipeline:
         self,
         session_id: str,
         channel_id: str,
-        transcription: dict[str, Any],
-        targets: list[dict[str, str]],
+        transcription: Transcription,
+        passthrough: list[str],
+        groups: dict[str, list[str]],
         frozen_src: list[str],
         consumed_text: str,
         lang_states: dict[str, KeyState | None],
     ) -> None:
+        if passthrough:
+            self._stats.passthrough += len(passthrough)
+            await self._publish(
+                session_id, channel_id, "final", transcription,
+                transcription.text.strip(), passthrough,
+            )
         await asyncio.gather(*[
             self._finalize_target(
                 session_id, channel_id, transcription,
-                t["targetLang"], frozen_src, consumed_text,
-                lang_states.get(t["targetLang"]),
+                target_lang, codes, frozen_src, consumed_text,
+                lang_states.get(target_lang),
             )
-            for t in targets
+            for target_lang, codes in groups.items()
         ])
 
     async def _finalize_target(
         self,
         session_id: str,
         channel_id: str,
-        transcription: dict[str, Any],
+        transcription: Transcription,
         target_lang: str,
+        codes: list[str],
         frozen_src: list[str],
         consumed_text: str,
         st: KeyState | None,
     ) -> None:
         key = f"{session_id}/{channel_id}/{target_lang}"
-        final_text = transcription["text"]
-        source_lang = transcription.get("lang")
+        final_text = transcription.text
+        source_lang = transcription.lang
 
+        on_progress = None
+        if self.stream_publish_ms > 0:
+            async def on_progress(text: str) -> None:
+                await self._publish_progress(session_id, channel_id, transcription, text, codes)
         try:
             translated = await self._final_translation(
                 key, final_text, source_lang, target_lang,
-                frozen_src, consumed_text, st,
+                frozen_src, consumed_text, st, on_progress,
             )
         except Exception:
             logger.exception(
                 "[pipeline] seg=%s ch=%s lang=%s translation error on final",
-                transcription.get("segmentId"), channel_id, target_lang,
+                transcription.segment_id, channel_id, target_lang,
             )
             return
 
-        payload = self._build_payload(transcription, translated, target_lang, final=True)
         logger.debug(
             "[pipeline] seg=%s ch=%s lang=%s action=FORCE reason=\"final arrived\"",
-            transcription.get("segmentId"), channel_id, target_lang,
+            transcription.segment_id, channel_id, target_lang,
         )
-        await self.publish_fn(session_id, channel_id, "final", payload, key)
-        self._stats.published += 1
+        await self._publish(session_id, channel_id, "final", transcription, translated, codes)
         self.scheduler.purge_key(key)
 
     async def _final_translation(
@@ -525,8 +892,13 @@ class Pipeline:
         frozen_src: list[str],
         consumed_text: str,
         st: KeyState | None,
+        on_progress: ProgressCallback | None = None,
     ) -> str:
-        """Best-effort reuse of frozen/tail translations for the final text."""
+        """Best-effort reuse of frozen/tail translations for the final text.
+
+        `on_progress` receives the growing final translation (whole text,
+        frozen prefix included) when it is streamed.
+        """
         remainder = (
             self._word_prefix_remainder(final_text, consumed_text)
             if st is not None and frozen_src and consumed_text
@@ -535,23 +907,42 @@ class Pipeline:
         if remainder is not None:
             if st.pending_freezes:
                 await asyncio.gather(*st.pending_freezes, return_exceptions=True)
-            if self._frozen_complete(st, len(frozen_src)):
+            # Untranslated placeholders (degraded mode) get another chance
+            if self._frozen_complete(st, len(frozen_src)) and not any(
+                isinstance(dst, UntranslatedText) for dst in st.frozen_dst.values()
+            ):
                 if not remainder:
                     self._stats.finals_reused += 1
                     return self._assemble(st)
-                if remainder == " ".join(st.last_tail_src.split()) and st.last_tail_dst:
+                # A live tail still translating exactly the remainder is reused
+                await self.scheduler.settle_tail(key, remainder)
+                if (
+                    remainder == " ".join(st.last_tail_src.split())
+                    and st.last_tail_dst
+                    and not isinstance(st.last_tail_dst, UntranslatedText)
+                ):
                     self._stats.finals_reused += 1
                     return self._assemble(st, st.last_tail_dst)
-                remainder_dst = await self.scheduler.freeze(
-                    key, remainder, source_lang, target_lang
+                remainder_progress = None
+                if on_progress is not None:
+                    async def remainder_progress(partial: str) -> None:
+                        await on_progress(self._assemble(st, partial))
+                remainder_dst = await self._freeze(
+                    key, remainder, source_lang, target_lang, remainder_progress
                 )
                 self._stats.translated += 1
                 return self._assemble(st, remainder_dst)
 
         # The final rewrote the past (or nothing was frozen): one full
         # retranslation — the price of correction, once per segment per lang.
+        # Freezes and tails still running are now useless.
+        if st is not None and remainder is None:
+            self._cancel_freezes(st)
+        self.scheduler.cancel_key(key)
         self._stats.finals_full_retranslated += 1
-        translated = await self.scheduler.freeze(key, final_text, source_lang, target_lang)
+        translated = await self._freeze(
+            key, final_text, source_lang, target_lang, on_progress
+        )
         self._stats.translated += 1
         return translated
 
@@ -573,22 +964,21 @@ class Pipeline:
 
     @staticmethod
     def _build_payload(
-        transcription: dict[str, Any],
+        transcription: Transcription,
         translated_text: str,
         target_lang: str,
         *,
         final: bool,
-    ) -> dict[str, Any]:
+    ) -> TranslationPayload:
         """Build the outgoing translation payload matching the MQTT contract."""
-        return {
-            "segmentId": transcription["segmentId"],
-            "astart": transcription.get("astart"),
-            "text": translated_text,
-            "start": transcription.get("start"),
-            "end": transcription.get("end"),
-            "sourceLang": transcription.get("lang"),
-            "targetLang": target_lang,
-            "locutor": transcription.get("locutor"),
-            "final": final,
-            "mode": "external",
-        }
+        return TranslationPayload(
+            segmentId=transcription.segment_id,
+            astart=transcription.astart,
+            text=translated_text,
+            start=transcription.start,
+            end=transcription.end,
+            sourceLang=transcription.lang,
+            targetLang=target_lang,
+            locutor=transcription.locutor,
+            final=final,
+        )
@@ -1,17 +1,82 @@
-from translator.providers.echo import EchoProvider
-from translator.providers.translategemma import TranslateGemmaProvider
+"""Provider registry.
 
-PROVIDERS: dict[str, type] = {
-    "echo": EchoProvider,
-    "translategemma": TranslateGemmaProvider,
-}
+Providers are imported only when selected: `TRANSLATION_PROVIDER=echo` never
+pays for httpx or a model runtime. Every provider, built-in ones included,
+is registered in the `linto_translator.providers` entry point group, e.g. in
+a package's pyproject.toml:
+
+    [project.entry-points."linto_translator.providers"]
+    marian = "my_package.marian:MarianProvider"
+
+This package's own table is read first, and cheaply: from pyproject.toml in
+a source checkout, else from this distribution's metadata. Every installed
+distribution is only scanned for names it does not register.
+"""
+
+import functools
+import importlib
+from pathlib import Path
+
+ENTRY_POINT_GROUP = "linto_translator.providers"
+
+_DISTRIBUTION = "linto-translator"
+_PYPROJECT = Path(__file__).resolve().parents[2] / "pyproject.toml"
+
+
+@functools.cache
+def builtin_providers() -> dict[str, str]:
+    """This package's providers, as "module:Class" by name."""
+    if _PYPROJECT.is_file():
+        # Source checkout (tests, benchmarks): no metadata needed
+        import tomllib
+
+        with _PYPROJECT.open("rb") as f:
+            project = tomllib.load(f)["project"]
+        return dict(project.get("entry-points", {}).get(ENTRY_POINT_GROUP, {}))
+    from importlib.metadata import PackageNotFoundError, distribution
+
+    try:
+        eps = distribution(_DISTRIBUTION).entry_points
+    except PackageNotFoundError:
+        return {}
+    return {ep.name: ep.value for ep in eps if ep.group == ENTRY_POINT_GROUP}
+
+
+def _entry_points() -> dict:
+    # importlib.metadata scans every installed distribution: only done when
+    # a name is not built in
+    from importlib.metadata import entry_points
+
+    return {ep.name: ep for ep in entry_points(group=ENTRY_POINT_GROUP)}
+
+
+def available_providers() -> list[str]:
+    """Names of the built-in and installed providers."""
+    return sorted({*builtin_providers(), *_entry_points()})
 
 
 def load_provider(name: str, **kwargs):
     """Load a translation provider by name."""
-    cls = PROVIDERS.get(name)
-    if cls is None:
-        raise ValueError(
-            f"Unknown provider '{name}'. Available: {list(PROVIDERS.keys())}"
-        )
+    target = builtin_providers().get(name)
+    if target is not None:
+        module, _, attr = target.partition(":")
+        cls = getattr(importlib.import_module(module), attr)
+    else:
+        ep = _entry_points().get(name)
+        if ep is None:
+            raise ValueError(
+                f"Unknown provider '{name}'. Available: {available_providers()}"
+            )
+        cls = ep.load()
     return cls(**kwargs)
+
+
+def load_provider_spec(spec: str):
+    """Load a provider from "name" or "name@endpoint".
+
+    e.g. `translategemma@http://gpu-b:8000`: the same provider, on another
+    endpoint (fallback chains).
+    """
+    name, _, endpoint = spec.partition("@")
+    kwargs = {"endpoint": endpoint.strip()} if endpoint.strip() else {}
+    return load_provider(name.strip(), **kwargs)
@@ -1,6 +1,45 @@
 """Abstract translation provider interface."""
 
+import asyncio
 from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import AsyncIterator
+
+# (text, source_lang, target_lang), as passed to translate()
+TranslationItem = tuple[str, str | None, str]
+
+# Token usage of the current provider call, for wrappers accounting per call
+# (journal): providers that know their usage add it with report_usage()
+CALL_USAGE: ContextVar[dict[str, int] | None] = ContextVar("call_usage", default=None)
+
+
+# Set while the pipeline warms the backend up: these calls are not traffic,
+# wrappers keeping translations (cache, store, remote cache, journal) pass
+# them through without a lookup or a record
+WARM_UP: ContextVar[bool] = ContextVar("warm_up", default=False)
+
+
+def report_usage(prompt_tokens: int, completion_tokens: int) -> None:
+    usage = CALL_USAGE.get()
+    if usage is not None:
+        usage["prompt_tokens"] += prompt_tokens
+        usage["completion_tokens"] += completion_tokens
+
+
+class InvalidRequestError(ValueError):
+    """A request no backend can serve (e.g. no source language).
+
+    Not a backend failure: never retried, never counted by a circuit
+    breaker, never sent to a fallback.
+    """
+
+
+class UntranslatedText(str):
+    """Source text returned in place of a translation (degraded mode).
+
+    Published like any translation, but never cached and never reused by
+    the final: it is a placeholder, not an answer.
+    """
 
 
 class TranslationProvider(ABC):
@@ -19,3 +58,105 @@ class TranslationProvider(ABC):
             Translated text.
         """
         ...
+
+    async def translate_batch(self, items: list[TranslationItem]) -> list[str | BaseException]:
+        """Translate several independent items in one go.
+
+        Default: one translate() call per item, run concurrently. Providers
+        with a native multi-prompt API override this to send a single request.
+
+        Returns:
+            One entry per item, in order: the translation, or the exception
+            raised for that item (a failed item never fails its neighbours).
+        """
+        return await asyncio.gather(
+            *(self.translate(text, src, tgt) for text, src, tgt in items),
+            return_exceptions=True,
+        )
+
+    async def translate_stream(
+        self, text: str, source_lang: str | None, target_lang: str
+    ) -> AsyncIterator[str]:
+        """Translate text, yielding the translation as it is generated.
+
+        The concatenation of the yielded pieces is the translation (before
+        stripping). Default: the whole translate() result as one piece.
+        Providers that can decode incrementally override this.
+        """
+        yield await self.translate(text, source_lang, target_lang)
+
+    async def translate_continue(
+        self, text: str, source_lang: str | None, target_lang: str, prefix: str
+    ) -> str:
+        """Translate text, the translation being forced to start with `prefix`.
+
+        `prefix` is an already-known beginning of the translation (the stable
+        part of a previous translation of a shorter source): a provider that
+        can prefill it only decodes the rest. Returns the whole translation,
+        prefix included. Default: a full translate(), prefix ignored.
+        """
+        return await self.translate(text, source_lang, target_lang)
+
+    def lookup(self, text: str, source_lang: str | None, target_lang: str) -> str | None:
+        """Synchronous fast path: an already-known translation, or None.
+
+        Called by the scheduler before admission, so answers that need no
+        backend work never wait for a concurrency slot or a batch window.
+        """
+        return None
+
+    def canonical_lang(self, lang: str) -> str:
+        """The language `lang` is translated as by this provider.
+
+        Codes with the same canonical language get the same translation (the
+        pipeline translates them once), and a target canonically equal to the
+        source needs no translation at all. Default: the primary subtag
+        ("en-GB" -> "en"); providers that honour regional variants override it.
+        """
+        return lang.replace("_", "-").split("-")[0].lower()
+
+
+class ProviderWrapper(TranslationProvider):
+    """Base class for providers that decorate another provider.
+
+    Forwards every provider call to `inner`; attributes the wrapper does not
+    define (`usage_snapshot`, ...) are looked up on `inner`, so optional
+    capabilities stay visible through any stack of wrappers.
+    """
+
+    def __init__(self, inner: TranslationProvider) -> None:
+        self.inner = inner
+
+    def __getattr__(self, name: str):
+        # Only reached for attributes not found on the wrapper itself
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    async def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        return await self.inner.translate(text, source_lang, target_lang)
+
+    async def translate_batch(self, items: list[TranslationItem]) -> list[str | BaseException]:
+        return await self.inner.translate_batch(items)
+
+    async def translate_stream(
+        self, text: str, source_lang: str | None, target_lang: str
+    ) -> AsyncIterator[str]:
+        async for piece in self.inner.translate_stream(text, source_lang, target_lang):
+            yield piece
+
+    async def translate_continue(
+        self, text: str, source_lang: str | None, target_lang: str, prefix: str
+    ) -> str:
+        return await self.inner.translate_continue(text, source_lang, target_lang, prefix)
+
+    def lookup(self, text: str, source_lang: str | None, target_lang: str) -> str | None:
+        return self.inner.lookup(text, source_lang, target_lang)
+
+    def canonical_lang(self, lang: str) -> str:
+        return self.inner.canonical_lang(lang)
+
+    async def close(self) -> None:
+        close = getattr(self.inner, "close", None)
+        if close is not None:
+            await close()
@@ -0,0 +1,231 @@
+"""Caching provider: translation memory in front of any provider."""
+
+import asyncio
+import logging
+from typing import AsyncIterator
+
+from translator.cache import CacheKey, TranslationCache, cache_key
+from translator.providers.base import (
+    WARM_UP,
+    ProviderWrapper,
+    TranslationItem,
+    TranslationProvider,
+    UntranslatedText,
+)
+from translator.remote_cache import RemoteCache
+from translator.store import TranslationStore
+
+logger = logging.getLogger(__name__)
+
+
+class CachedProvider(ProviderWrapper):
+    """Serves repeated (text, src, tgt) requests from a TranslationCache.
+
+    Keys are whitespace-normalized, language codes case-folded. Only
+    successful translations are stored (never UntranslatedText).
+
+    With a `store`, memory misses are looked up on disk (off the event loop)
+    before reaching the provider, new translations are persisted
+    asynchronously, and the most used stored translations are loaded into
+    memory in the background on first use.
+
+    With a `remote` cache (shared by the replicas), the remaining misses are
+    looked up remotely while the provider call is already running: a remote
+    hit cancels the call, a miss or a slow cache costs nothing. Batches wait
+    for the remote answer (bounded by its deadline) before the provider.
+
+    Warm-up calls (`WARM_UP`) go straight to the provider: they must reach
+    the backend, and their translations are not remembered.
+    """
+
+    def __init__(
+        self,
+        inner: TranslationProvider,
+        cache: TranslationCache,
+        store: TranslationStore | None = None,
+        remote: RemoteCache | None = None,
+    ) -> None:
+        super().__init__(inner)
+        self.cache = cache
+        self.store = store
+        self.remote = remote
+        self._preload: asyncio.Task | None = None
+
+    def _ensure_preload(self) -> None:
+        if self.store is not None and self._preload is None:
+            self._preload = asyncio.get_running_loop().create_task(self._load_store())
+
+    async def _load_store(self) -> None:
+        rows = await self.store.load(self.cache.max_entries)
+        loaded = 0
+        for key, value in rows:
+            if self.cache.peek(key) is None and self.cache.put(key, value):
+                loaded += 1
+        logger.info("[cache] warmed with %d stored translations", loaded)
+
+    def _hit(self, key: CacheKey) -> None:
+        """A memory-tier hit: the store keeps it from ageing out."""
+        if self.store is not None:
+            self.store.touch(key)
+
+    def _remember(self, key: CacheKey, value: str, share: bool = True) -> None:
+        if isinstance(value, UntranslatedText):
+            return
+        self.cache.put(key, value)
+        if self.store is not None:
+            self.store.put(key, value)
+        if share and self.remote is not None:
+            self.remote.put(key, value)
+
+    async def _race_remote(self, key: CacheKey, call: asyncio.Task) -> tuple[str, bool]:
+        """(translation, from the remote cache): remote lookup vs provider call."""
+        remote = asyncio.ensure_future(self.remote.get(key))
+        try:
+            await asyncio.wait({remote, call}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            remote.cancel()
+            call.cancel()
+            raise
+        if remote.done() and remote.result() is not None:
+            call.cancel()
+            await asyncio.wait({call})  # unwound before the caller moves on
+            if not call.cancelled():
+                call.exception()  # finished meanwhile: its outcome is unused
+            return remote.result(), True
+        remote.cancel()
+        return await call, False
+
+    def lookup(self, text: str, source_lang: str | None, target_lang: str) -> str | None:
+        if WARM_UP.get():
+            return self.inner.lookup(text, source_lang, target_lang)
+        # A miss here is not counted: the translate() call that follows is
+        self._ensure_preload()
+        key = cache_key(text, source_lang, target_lang)
+        if key is not None and self.cache.peek(key) is not None:
+            self._hit(key)
+            return self.cache.get(key)
+        return self.inner.lookup(text, source_lang, target_lang)
+
+    async def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        if WARM_UP.get():
+            return await self.inner.translate(text, source_lang, target_lang)
+        self._ensure_preload()
+        key = cache_key(text, source_lang, target_lang)
+        if key is not None:
+            hit = self.cache.get(key)
+            if hit is not None:
+                self._hit(key)
+                return hit
+            if self.store is not None:
+                hit = await self.store.get(key)
+                if hit is not None:
+                    self.cache.put(key, hit)
+                    return hit
+            if self.remote is not None:
+                call = asyncio.ensure_future(self.inner.translate(text, source_lang, target_lang))
+                translated, shared = await self._race_remote(key, call)
+                self._remember(key, translated, share=not shared)
+                return translated
+        translated = await self.inner.translate(text, source_lang, target_lang)
+        if key is not None:
+            self._remember(key, translated)
+        return translated
+
+    async def translate_stream(
+        self, text: str, source_lang: str | None, target_lang: str
+    ) -> AsyncIterator[str]:
+        if WARM_UP.get():
+            async for piece in self.inner.translate_stream(text, source_lang, target_lang):
+                yield piece
+            return
+        self._ensure_preload()
+        key = cache_key(text, source_lang, target_lang)
+        if key is not None:
+            hit = self.cache.get(key)
+            if hit is not None:
+                self._hit(key)
+            elif self.store is not None:
+                hit = await self.store.get(key)
+                if hit is not None:
+                    self.cache.put(key, hit)
+            if hit is not None:
+                yield hit
+                return
+        stream = self.inner.translate_stream(text, source_lang, target_lang)
+        pieces: list[str] = []
+        if key is not None and self.remote is not None:
+            # The remote lookup races the first piece of the stream
+            first = asyncio.ensure_future(anext(stream))
+            try:
+                hit, shared = await self._race_remote(key, first)
+            except StopAsyncIteration:
+                return
+            if shared:
+                await stream.aclose()
+                self._remember(key, hit, share=False)
+                yield hit
+                return
+            pieces.append(hit)
+            yield hit
+        async for piece in stream:
+            pieces.append(piece)
+            yield piece
+        # Only complete, translated streams are remembered
+        if key is not None and not any(isinstance(p, UntranslatedText) for p in pieces):
+            self._remember(key, "".join(pieces).strip())
+
+    async def translate_batch(self, items: list[TranslationItem]) -> list[str | BaseException]:
+        if WARM_UP.get():
+            return await self.inner.translate_batch(items)
+        self._ensure_preload()
+        results: list[str | BaseException | None] = [None] * len(items)
+        keys = [cache_key(*item) for item in items]
+        misses: list[int] = []
+        for i, key in enumerate(keys):
+            hit = self.cache.get(key) if key is not None else None
+            if hit is None:
+                misses.append(i)
+            else:
+                self._hit(key)
+                results[i] = hit
+        if misses and self.store is not None:
+            stored_idx = [i for i in misses if keys[i] is not None]
+            stored = await self.store.get_many([keys[i] for i in stored_idx])
+            for i, hit in zip(stored_idx, stored):
+                if hit is not None:
+                    results[i] = hit
+                    self.cache.put(keys[i], hit)
+            misses = [i for i in misses if results[i] is None]
+        if misses and self.remote is not None:
+            shared_idx = [i for i in misses if keys[i] is not None]
+            shared = await self.remote.get_many([keys[i] for i in shared_idx])
+            for i, hit in zip(shared_idx, shared):
+                if hit is not None:
+                    results[i] = hit
+                    self._remember(keys[i], hit, share=False)
+            misses = [i for i in misses if results[i] is None]
+        if misses:
+            translated = await self.inner.translate_batch([items[i] for i in misses])
+            for i, result in zip(misses, translated):
+                results[i] = result
+                if keys[i] is not None and isinstance(result, str):
+                    self._remember(keys[i], result)
+        return results
+
+    def cache_snapshot(self) -> dict[str, int]:
+        return self.cache.snapshot()
+
+    def store_snapshot(self) -> dict[str, int] | None:
+        return self.store.snapshot() if self.store is not None else None
+
+    def remote_cache_snapshot(self) -> dict[str, float] | None:
+        return self.remote.snapshot() if self.remote is not None else None
+
+    async def close(self) -> None:
+        if self._preload is not None and not self._preload.done():
+            self._preload.cancel()
+        if self.store is not None:
+            await self.store.close()
+        if self.remote is not None:
+            await self.remote.close()
+        await super().close()
@@ -1,6 +1,6 @@
-"""Echo provider: returns input text unchanged. For testing."""
+"""Echo providers: return input text unchanged. For testing and degraded mode."""
 
-from translator.providers.base import TranslationProvider
+from translator.providers.base import TranslationProvider, UntranslatedText
 
 
 class EchoProvider(TranslationProvider):
@@ -8,3 +8,10 @@ class EchoProvider(TranslationProvider):
 
     async def translate(self, text: str, source_lang: str, target_lang: str) -> str:
         return text
+
+
+class PassthroughProvider(TranslationProvider):
+    """Last resort of a fallback chain: the source text, tagged as untranslated."""
+
+    async def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        return UntranslatedText(text)
@@ -0,0 +1,271 @@
+"""Endpoint pool: least-outstanding-requests balancing over several vLLM servers.
+
+Each request goes to the healthy endpoint with the lowest load score:
+
+    (outstanding requests + queue_weight * vLLM waiting queue) / max_concurrent
+
+where the waiting queue is the `vllm:num_requests_waiting` gauge polled from
+each server's `/metrics` (absent on non-vLLM servers: the term is then 0).
+Every endpoint has its own concurrency cap; a request waits for a slot when
+all healthy endpoints are full.
+
+Health:
+- `eject_after_failures` consecutive failures (5xx, timeouts, connection
+  errors) eject an endpoint for `eject_base_s`, doubling on each successive
+  ejection up to `eject_max_s`;
+- an endpoint whose per-token latency (EWMA) gets `slow_factor` times worse
+  than the fastest healthy one is ejected the same way;
+- once its ejection expires, the monitor probes `/health`: success reinstates
+  it, failure ejects it again for longer. Without a monitor (no HTTP
+  client), an expired ejection is half-open: the next request decides.
+
+If every endpoint is ejected the pool routes over all of them anyway (panic
+mode): a degraded answer beats no answer.
+
+Copies of one request (hedging) share a `sibling_urls` list through a context
+variable: each acquisition records its endpoint there, and the next copy is
+routed to another endpoint whenever one is available.
+"""
+
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_WAITING_GAUGE = "vllm:num_requests_waiting"
+_EWMA_ALPHA = 0.2
+_SLOW_MIN_SAMPLES = 20
+
+# URLs already serving a copy of the current request; set by a hedging
+# wrapper before it spawns the copies (they share the list).
+sibling_urls: ContextVar[list[str] | None] = ContextVar("sibling_urls", default=None)
+
+
+@dataclass
+class Endpoint:
+    url: str
+    max_concurrent: int
+    outstanding: int = 0
+    waiting: float = 0.0          # vLLM queue depth, from /metrics
+    failures: int = 0             # consecutive
+    ejected_until: float = 0.0
+    ejections: int = 0            # consecutive ejections (backoff exponent)
+    latency_ewma: float = 0.0     # seconds per generated token
+    samples: int = 0
+    requests: int = 0
+    errors: int = 0
+
+    def score(self, queue_weight: float) -> float:
+        return (self.outstanding + queue_weight * self.waiting) / self.max_concurrent
+
+
+def parse_waiting(metrics_text: str) -> float:
+    """Sum of the vLLM waiting-queue gauge(s) in a Prometheus exposition."""
+    total = 0.0
+    for line in metrics_text.splitlines():
+        if line.startswith(_WAITING_GAUGE):
+            try:
+                total += float(line.rsplit(" ", 1)[1])
+            except (IndexError, ValueError):
+                continue
+    return total
+
+
+class EndpointPool:
+    def __init__(
+        self,
+        urls: list[str],
+        max_concurrent: int = 8,
+        client: httpx.AsyncClient | None = None,
+        queue_weight: float = 1.0,
+        eject_after_failures: int = 3,
+        eject_base_s: float = 5.0,
+        eject_max_s: float = 60.0,
+        slow_factor: float = 3.0,
+        monitor_interval_s: float = 5.0,
+    ) -> None:
+        if not urls:
+            raise ValueError("at least one endpoint is required")
+        self.endpoints = [Endpoint(u.rstrip("/"), max_concurrent) for u in urls]
+        self.client = client
+        self.queue_weight = queue_weight
+        self.eject_after_failures = eject_after_failures
+        self.eject_base_s = eject_base_s
+        self.eject_max_s = eject_max_s
+        self.slow_factor = slow_factor
+        self.monitor_interval_s = monitor_interval_s
+        self._cond: asyncio.Condition | None = None
+        self._monitor: asyncio.Task | None = None
+
+    @property
+    def capacity(self) -> int:
+        return sum(ep.max_concurrent for ep in self.endpoints)
+
+    # ---------------------------------------------------------------- routing
+
+    @property
+    def _probes(self) -> bool:
+        return self.client is not None and self.monitor_interval_s > 0
+
+    def _is_ejected(self, ep: Endpoint, now: float) -> bool:
+        # Past its ejection, an endpoint waits for the monitor's health probe
+        return ep.ejected_until > 0.0 and (now < ep.ejected_until or self._probes)
+
+    def _pick(self, exclude: list[str]) -> Endpoint | None:
+        now = time.monotonic()
+        healthy = [ep for ep in self.endpoints if not self._is_ejected(ep, now)]
+        pool = healthy or self.endpoints  # panic mode: everything is ejected
+        pool = [ep for ep in pool if ep.url not in exclude] or pool
+        free = [ep for ep in pool if ep.outstanding < ep.max_concurrent]
+        if not free:
+            return None
+        return min(free, key=lambda ep: ep.score(self.queue_weight))
+
+    async def acquire(self) -> Endpoint:
+        """Reserve a slot on the least loaded healthy endpoint.
+
+        Endpoints already serving a copy of this request (`sibling_urls`) are
+        avoided, unless they are the only ones left.
+        """
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        self._ensure_monitor()
+        siblings = sibling_urls.get()
+        exclude = siblings if siblings is not None else []
+        async with self._cond:
+            ep = self._pick(exclude)
+            while ep is None:
+                await self._cond.wait()
+                ep = self._pick(exclude)
+            ep.outstanding += 1
+            ep.requests += 1
+            if siblings is not None:
+                siblings.append(ep.url)
+            return ep
+
+    async def release(
+        self,
+        ep: Endpoint,
+        ok: bool | None,
+        latency_s: float = 0.0,
+        tokens: int = 0,
+    ) -> None:
+        """Return a slot and record the outcome of the request.
+
+        `ok=None` = no health signal (request cancelled, client-side error).
+        """
+        ep.outstanding -= 1
+        if ok is None:
+            pass
+        elif ok:
+            ep.failures = 0
+            if ep.ejected_until and time.monotonic() >= ep.ejected_until:
+                ep.ejected_until = 0.0
+                ep.ejections = 0
+            if tokens > 0:
+                per_token = latency_s / tokens
+                ep.latency_ewma = (
+                    per_token if ep.samples == 0
+                    else _EWMA_ALPHA * per_token + (1 - _EWMA_ALPHA) * ep.latency_ewma
+                )
+                ep.samples += 1
+                self._check_slow(ep)
+        else:
+            ep.errors += 1
+            ep.failures += 1
+            # Requests already in flight when it was ejected don't extend the ejection
+            if ep.failures >= self.eject_after_failures and ep.ejected_until <= time.monotonic():
+                self._eject(ep, f"{ep.failures} consecutive failures")
+        if self._cond is not None:
+            async with self._cond:
+                self._cond.notify_all()
+
+    def _check_slow(self, ep: Endpoint) -> None:
+        if len(self.endpoints) < 2 or ep.samples < _SLOW_MIN_SAMPLES:
+            return
+        now = time.monotonic()
+        peers = [
+            p.latency_ewma for p in self.endpoints
+            if p is not ep and p.samples >= _SLOW_MIN_SAMPLES and not self._is_ejected(p, now)
+        ]
+        if peers and ep.latency_ewma > self.slow_factor * min(peers):
+            self._eject(ep, f"slow ({ep.latency_ewma * 1000:.0f} ms/token vs {min(peers) * 1000:.0f})")
+            ep.samples = 0  # re-measured from scratch once reinstated
+
+    def _eject(self, ep: Endpoint, reason: str) -> None:
+        ep.ejections += 1
+        duration = min(self.eject_max_s, self.eject_base_s * 2 ** (ep.ejections - 1))
+        ep.ejected_until = time.monotonic() + duration
+        logger.warning("[endpoints] ejecting %s for %.0fs: %s", ep.url, duration, reason)
+
+    # ---------------------------------------------------------------- monitor
+
+    def _ensure_monitor(self) -> None:
+        if not self._probes:
+            return
+        if self._monitor is None or self._monitor.done():
+            self._monitor = asyncio.get_running_loop().create_task(self._monitor_loop())
+
+    async def _monitor_loop(self) -> None:
+        try:
+            while True:
+                await asyncio.gather(*(self._probe(ep) for ep in self.endpoints))
+                await asyncio.sleep(self.monitor_interval_s)
+        except asyncio.CancelledError:
+            pass
+
+    async def _probe(self, ep: Endpoint) -> None:
+        now = time.monotonic()
+        if ep.ejected_until and now >= ep.ejected_until:
+            try:
+                r = await self.client.get(f"{ep.url}/health", timeout=2.0)
+                healthy = r.status_code < 500
+            except httpx.HTTPError:
+                healthy = False
+            if healthy:
+                logger.info("[endpoints] %s is back", ep.url)
+                ep.failures = 0
+                ep.ejected_until = 0.0
+                ep.ejections = 0
+                if self._cond is not None:
+                    async with self._cond:
+                        self._cond.notify_all()
+            else:
+                self._eject(ep, "health probe failed")
+            return
+        if self._is_ejected(ep, now):
+            return
+        try:
+            r = await self.client.get(f"{ep.url}/metrics", timeout=2.0)
+            if r.status_code == 200:
+                ep.waiting = parse_waiting(r.text)
+        except httpx.HTTPError:
+            pass  # /metrics is optional; request failures drive ejection
+
+    async def close(self) -> None:
+        if self._monitor is not None and not self._monitor.done():
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+
+    def snapshot(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "url": ep.url,
+                "outstanding": ep.outstanding,
+                "waiting": ep.waiting,
+                "requests": ep.requests,
+                "errors": ep.errors,
+                "ejected": self._is_ejected(ep, now),
+                "ms_per_token": round(ep.latency_ewma * 1000, 1),
+            }
+            for ep in self.endpoints
+        ]
@@ -0,0 +1,171 @@
+"""Hedged requests: tail-latency control for single translations.
+
+A request still running after the `percentile` latency observed for its size
+bucket gets a duplicate; the first answer wins and the other copy is
+cancelled (its HTTP request aborted, its endpoint slot released). With an
+EndpointPool underneath, the duplicate goes to another endpoint.
+
+Latency samples are what the caller waited, timed from the primary's start
+(a hedged request records its slow primary, not the fast duplicate), plus a
+censored sample for each cancelled duplicate (the time it had run): the
+percentile follows the backend's tail, not the winners'.
+
+Hedging costs backend work, so it is bounded by a budget: every request
+earns `budget` hedge credits (0.05 = at most 5% extra requests), a hedge
+spends one. Under overload, latencies rise uniformly, the credit runs out
+and hedging stops instead of amplifying the load.
+
+translate() and translate_continue() (prefilled tails, with their own
+latency buckets since they decode less) are hedged; batches and streams
+pass through.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from translator.providers.base import ProviderWrapper, TranslationProvider
+from translator.providers.endpoints import sibling_urls
+
+# Credit cap: a quiet period can't bank a burst of hedges
+_MAX_CREDIT = 10.0
+
+
+def _size_bucket(text: str, kind: str = "translate") -> tuple[str, int]:
+    """Source length bucket: <32, <64, <128, ... characters, per kind of call."""
+    return kind, max(0, math.ceil(math.log2(max(len(text), 1))) - 5)
+
+
+@dataclass
+class HedgeStats:
+    requests: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0      # the duplicate answered first
+    budget_denied: int = 0   # hedge due but no credit left
+
+
+class HedgedProvider(ProviderWrapper):
+    """Duplicates slow translate() / translate_continue() calls, within a load budget.
+
+    Args:
+        inner: Provider to hedge.
+        percentile: Latency percentile (0-100) after which a request is
+            hedged, per size bucket.
+        budget: Max extra requests, as a fraction of requests.
+        window: Latency samples kept per size bucket.
+        min_samples: No hedging in a bucket before this many samples.
+        min_delay_s: Never hedge earlier than this.
+    """
+
+    def __init__(
+        self,
+        inner: TranslationProvider,
+        percentile: float = 95.0,
+        budget: float = 0.05,
+        window: int = 200,
+        min_samples: int = 20,
+        min_delay_s: float = 0.05,
+    ) -> None:
+        super().__init__(inner)
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.min_delay_s = min_delay_s
+        self._window = window
+        self._latencies: dict[tuple[str, int], deque[float]] = {}
+        self._credit = 0.0
+        self.stats = HedgeStats()
+
+    def _delay(self, bucket: tuple[str, int]) -> float | None:
+        """Hedge delay for a bucket, or None while too few samples."""
+        samples = self._latencies.get(bucket)
+        if samples is None or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        rank = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(self.min_delay_s, ordered[rank])
+
+    def _record(self, bucket: tuple[str, int], latency_s: float) -> None:
+        samples = self._latencies.get(bucket)
+        if samples is None:
+            samples = self._latencies[bucket] = deque(maxlen=self._window)
+        samples.append(latency_s)
+
+    async def _attempt(self, call: Callable[[], Awaitable[str]], siblings: list[str]) -> str:
+        # Runs as its own task: the context variable is local to this copy
+        sibling_urls.set(siblings)
+        return await call()
+
+    async def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        return await self._hedged(
+            _size_bucket(text), lambda: self.inner.translate(text, source_lang, target_lang)
+        )
+
+    async def translate_continue(
+        self, text: str, source_lang: str | None, target_lang: str, prefix: str
+    ) -> str:
+        return await self._hedged(
+            _size_bucket(text, "continue"),
+            lambda: self.inner.translate_continue(text, source_lang, target_lang, prefix),
+        )
+
+    async def _hedged(self, bucket: tuple[str, int], call: Callable[[], Awaitable[str]]) -> str:
+        self.stats.requests += 1
+        self._credit = min(_MAX_CREDIT, self._credit + self.budget)
+        delay = self._delay(bucket)
+        t0 = time.monotonic()
+        if delay is None:
+            result = await call()
+            self._record(bucket, time.monotonic() - t0)
+            return result
+
+        # Copies share the sibling list: the pool routes them apart
+        siblings: list[str] = []
+        primary = asyncio.ensure_future(self._attempt(call, siblings))
+        tasks = {primary}
+        hedge_started: dict[asyncio.Future, float] = {}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                if self._credit >= 1.0:
+                    self._credit -= 1.0
+                    self.stats.hedged += 1
+                    hedge = asyncio.ensure_future(self._attempt(call, siblings))
+                    hedge_started[hedge] = time.monotonic()
+                    tasks.add(hedge)
+                else:
+                    self.stats.budget_denied += 1
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((t for t in done if t.exception() is None), None)
+                if winner is not None:
+                    break
+                tasks -= done
+                if not tasks:
+                    # Every copy failed: surface the primary's error
+                    raise primary.exception()
+            if winner is not primary:
+                self.stats.hedge_wins += 1
+            now = time.monotonic()
+            # A beaten primary's censored sample is this one: it ran from t0
+            self._record(bucket, now - t0)
+            for task, started in hedge_started.items():
+                if task in tasks and not task.done():
+                    self._record(bucket, now - started)
+            return winner.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def hedge_snapshot(self) -> dict[str, int]:
+        return {
+            "requests": self.stats.requests,
+            "hedged": self.stats.hedged,
+            "hedge_wins": self.stats.hedge_wins,
+            "budget_denied": self.stats.budget_denied,
+        }
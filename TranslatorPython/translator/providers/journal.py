@@ -0,0 +1,158 @@
+"""Journaling provider: records every backend call to a Journal."""
+
+import time
+from contextlib import contextmanager, suppress
+from typing import Any, AsyncIterator, Iterator
+
+from translator.journal import Journal
+from translator.providers.base import (
+    CALL_USAGE,
+    WARM_UP,
+    ProviderWrapper,
+    TranslationItem,
+    TranslationProvider,
+    UntranslatedText,
+)
+
+
+class JournalProvider(ProviderWrapper):
+    """Records each call reaching `inner`: text, languages, latency, token
+    usage (when the provider reports it) and result or error.
+
+    Meant to wrap the model provider directly (under hedging, retries and the
+    cache), so that each record is one real backend call. Cancelled calls
+    are not recorded (not an Exception): they have no answer to replay, nor
+    are warm-up calls (`WARM_UP`): they are not traffic.
+    """
+
+    def __init__(self, inner: TranslationProvider, journal: Journal) -> None:
+        super().__init__(inner)
+        self.journal = journal
+
+    @staticmethod
+    @contextmanager
+    def _usage() -> Iterator[dict[str, int]]:
+        usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        token = CALL_USAGE.set(usage)
+        try:
+            yield usage
+        finally:
+            # A stream finalized by the garbage collector closes in another context
+            with suppress(ValueError):
+                CALL_USAGE.reset(token)
+
+    def _record(
+        self,
+        kind: str,
+        item: TranslationItem,
+        latency_s: float,
+        usage: dict[str, int],
+        result: Any,
+        **extra: Any,
+    ) -> None:
+        if WARM_UP.get():
+            return
+        text, src, tgt = item
+        record: dict[str, Any] = {
+            "ts": round(time.time(), 3),
+            "kind": kind,
+            "text": text,
+            "src": src,
+            "tgt": tgt,
+            "latency_ms": round(latency_s * 1000, 1),
+            **usage,
+            **extra,
+        }
+        if isinstance(result, BaseException):
+            record["error"] = f"{type(result).__name__}: {result}"
+        else:
+            record["result"] = str(result)
+            if isinstance(result, UntranslatedText):
+                record["untranslated"] = True
+        self.journal.write(record)
+
+    async def _call(self, kind: str, item: TranslationItem, coro, **extra: Any) -> str:
+        t0 = time.monotonic()
+        with self._usage() as usage:
+            try:
+                result = await coro
+            except Exception as exc:
+                self._record(kind, item, time.monotonic() - t0, usage, exc, **extra)
+                raise
+        self._record(kind, item, time.monotonic() - t0, usage, result, **extra)
+        return result
+
+    async def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        return await self._call(
+            "translate", (text, source_lang, target_lang),
+            self.inner.translate(text, source_lang, target_lang),
+        )
+
+    async def translate_continue(
+        self, text: str, source_lang: str | None, target_lang: str, prefix: str
+    ) -> str:
+        return await self._call(
+            "continue", (text, source_lang, target_lang),
+            self.inner.translate_continue(text, source_lang, target_lang, prefix),
+            prefix=prefix,
+        )
+
+    async def translate_batch(self, items: list[TranslationItem]) -> list[str | BaseException]:
+        t0 = time.monotonic()
+        with self._usage() as usage:
+            try:
+                results = await self.inner.translate_batch(items)
+            except Exception as exc:
+                self._record_batch(items, time.monotonic() - t0, usage, [exc] * len(items))
+                raise
+        self._record_batch(items, time.monotonic() - t0, usage, results)
+        return results
+
+    def _record_batch(
+        self,
+        items: list[TranslationItem],
+        latency_s: float,
+        usage: dict[str, int],
+        results: list[str | BaseException],
+    ) -> None:
+        # Usage is per request: items get shares by source length
+        chars = sum(len(text) for text, _, _ in items) or 1
+        for item, result in zip(items, results):
+            share = len(item[0]) / chars
+            self._record(
+                "batch", item, latency_s,
+                {k: round(v * share) for k, v in usage.items()},
+                result, batch=len(items),
+            )
+
+    async def translate_stream(
+        self, text: str, source_lang: str | None, target_lang: str
+    ) -> AsyncIterator[str]:
+        item = (text, source_lang, target_lang)
+        t0 = time.monotonic()
+        ttft: float | None = None
+        pieces: list[str] = []
+        with self._usage() as usage:
+            try:
+                async for piece in self.inner.translate_stream(text, source_lang, target_lang):
+                    if ttft is None:
+                        ttft = time.monotonic() - t0
+                    pieces.append(piece)
+                    yield piece
+            except Exception as exc:
+                self._record("stream", item, time.monotonic() - t0, usage, exc)
+                raise
+        result = "".join(pieces).strip()
+        if any(isinstance(p, UntranslatedText) for p in pieces):
+            result = UntranslatedText(result)
+        self._record(
+            "stream", item, time.monotonic() - t0, usage, result,
+            ttft_ms=round((ttft or 0.0) * 1000, 1),
+        )
+
+    def journal_snapshot(self) -> dict[str, int]:
+        return self.journal.snapshot()
+
+    async def close(self) -> None:
+        await self.journal.close()
+        await super().close()
@@ -0,0 +1,147 @@
+"""Local provider: synchronous CPU models hosted in a pool of worker processes.
+
+For small MT models (CTranslate2, ONNX Runtime, ...) running on CPU nodes.
+A local model is any object with a synchronous
+
+    translate(text, source_lang, target_lang) -> str
+
+and optionally `translate_batch(items) -> list[str]`, built by a factory
+named "module:callable". Each worker process (spawned, so no state is
+inherited from the event loop process) builds the model ONCE, in its
+initializer; work items travel over the executor's pipes in batches, so
+CPU-bound decoding never blocks the asyncio loop and scales across cores.
+
+A batch is split into one chunk per worker. Cancelling a request drops it
+if no worker has picked it up yet; a chunk already being decoded runs to
+completion (a worker can't be interrupted mid-call).
+"""
+
+import asyncio
+import importlib
+import logging
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from translator.providers.base import TranslationItem, TranslationProvider
+
+logger = logging.getLogger(__name__)
+
+# Worker-process global: the model built by the initializer
+_model: Any = None
+
+
+def _load_factory(path: str):
+    module, _, name = path.partition(":")
+    if not module or not name:
+        raise ValueError(f"model factory must be 'module:callable', got {path!r}")
+    return getattr(importlib.import_module(module), name)
+
+
+def _init_worker(factory_path: str) -> None:
+    global _model
+    t0 = time.monotonic()
+    _model = _load_factory(factory_path)()
+    logger.info(
+        "[local] worker %d loaded %s in %.1fs", os.getpid(), factory_path, time.monotonic() - t0
+    )
+
+
+def _translate_chunk(items: list[TranslationItem]) -> list[str | Exception]:
+    """Runs in a worker: one result or exception per item."""
+    batch = getattr(_model, "translate_batch", None)
+    if batch is not None:
+        try:
+            return list(batch(items))
+        except Exception:
+            pass  # isolate the failing item(s) below
+    results: list[str | Exception] = []
+    for text, src, tgt in items:
+        try:
+            results.append(_model.translate(text, src, tgt))
+        except Exception as exc:
+            results.append(exc)
+    return results
+
+
+class LocalProvider(TranslationProvider):
+    """Runs a synchronous local model in a process pool.
+
+    Args:
+        model_factory: "module:callable" building the model, called once
+            per worker process.
+        workers: Worker processes (0 = one per CPU core).
+    """
+
+    def __init__(self, model_factory: str = "", workers: int = 0) -> None:
+        # Import here to allow non-local configs to skip validation
+        if not model_factory:
+            from translator.config import LOCAL_MODEL_FACTORY, LOCAL_WORKERS
+
+            model_factory = LOCAL_MODEL_FACTORY
+            workers = LOCAL_WORKERS
+        if not model_factory:
+            raise ValueError(
+                "LOCAL_MODEL_FACTORY is required (e.g. mypackage.models:load)"
+            )
+        _load_factory(model_factory)  # fail fast on a bad path, in this process
+        self.model_factory = model_factory
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: ProcessPoolExecutor | None = None
+        self.requests = 0
+        self.chunks = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_factory,),
+            )
+        return self._executor
+
+    async def _run_chunk(self, items: list[TranslationItem]) -> list[str | Exception]:
+        self.chunks += 1
+        future = self._pool().submit(_translate_chunk, items)
+        return await asyncio.wrap_future(future)
+
+    async def translate(self, text: str, source_lang: str | None, target_lang: str) -> str:
+        result = (await self.translate_batch([(text, source_lang, target_lang)]))[0]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    async def translate_batch(self, items: list[TranslationItem]) -> list[str | BaseException]:
+        """One chunk per worker, decoded in parallel."""
+        self.requests += len(items)
+        size = math.ceil(len(items) / self.workers)
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        outs = await asyncio.gather(*(self._run_chunk(c) for c in chunks), return_exceptions=True)
+        results: list[str | BaseException] = []
+        for chunk, out in zip(chunks, outs):
+            # A crashed worker (BrokenProcessPool) fails its whole chunk
+            results.extend([out] * len(chunk) if isinstance(out, BaseException) else out)
+        return results
+
+    async def warm_up(self) -> None:
+        """Spawn every worker, each loading its model, before traffic."""
+        pool = self._pool()
+        # Submitted together, no task finds an idle worker: one process each
+        await asyncio.gather(
+            *(asyncio.wrap_future(pool.submit(_translate_chunk, [])) for _ in range(self.workers))
+        )
+
+    def local_snapshot(self) -> dict[str, int]:
+        return {"workers": self.workers, "requests": self.requests, "chunks": self.chunks}
+
+    async def close(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(
+                None, lambda: executor.shutdown(wait=True, cancel_futures=True)
+            )
@@ -0,0 +1,92 @@
+"""Per-request generation budget (`max_tokens`) learned from actual usage.
+
+A static `max_tokens` is wrong at both ends: a one-word sentence reserves a
+budget it never uses (vLLM schedules and times out against it), while a
+long full-final retranslation gets truncated. Here the budget of a request
+is derived from its source length:
+
+    budget = base_tokens + chars * (ratio + deviation_factor * deviation)
+
+where `ratio` is the expansion (completion tokens per source character) of
+the language pair, learned online from the `completion_tokens` of every
+answer, and `deviation` its mean absolute deviation (the same estimator as
+TCP's retransmission timeout). The budget is clamped to `[floor, ceiling]`;
+a request truncated below the ceiling is retried once at the ceiling by the
+provider, and the retry's usage feeds the estimate.
+"""
+
+import math
+from dataclasses import dataclass
+
+_MEAN_ALPHA = 0.1
+_DEV_BETA = 0.25
+
+
+@dataclass
+class _PairRatio:
+    mean: float
+    deviation: float
+    samples: int = 0
+
+
+def _pair(source_lang: str | None, target_lang: str) -> tuple[str, str]:
+    return ((source_lang or "").split("-")[0].lower(), target_lang.split("-")[0].lower())
+
+
+class TokenBudget:
+    """Adaptive `max_tokens`, per language pair.
+
+    Args:
+        ceiling: Hard cap (the configured max_tokens).
+        floor: Minimum budget, whatever the source length.
+        base_tokens: Fixed allowance (punctuation, end-of-turn token).
+        initial_ratio / initial_deviation: Prior for unseen pairs, in
+            completion tokens per source character (Gemma averages ~4
+            characters per token on European languages).
+        deviation_factor: Safety margin, in deviations above the mean.
+    """
+
+    def __init__(
+        self,
+        ceiling: int,
+        floor: int = 16,
+        base_tokens: int = 8,
+        initial_ratio: float = 0.3,
+        initial_deviation: float = 0.1,
+        deviation_factor: float = 4.0,
+    ) -> None:
+        self.ceiling = ceiling
+        self.floor = min(floor, ceiling)
+        self.base_tokens = base_tokens
+        self.initial_ratio = initial_ratio
+        self.initial_deviation = initial_deviation
+        self.deviation_factor = deviation_factor
+        self._pairs: dict[tuple[str, str], _PairRatio] = {}
+
+    def budget(self, chars: int, source_lang: str | None, target_lang: str) -> int:
+        """max_tokens for a source text of `chars` characters."""
+        r = self._pairs.get(_pair(source_lang, target_lang))
+        mean, dev = (r.mean, r.deviation) if r else (self.initial_ratio, self.initial_deviation)
+        tokens = math.ceil(self.base_tokens + chars * (mean + self.deviation_factor * dev))
+        return max(self.floor, min(self.ceiling, tokens))
+
+    def observe(
+        self, chars: int, source_lang: str | None, target_lang: str, completion_tokens: int
+    ) -> None:
+        """Learn from a complete (not truncated) answer."""
+        if chars <= 0 or completion_tokens <= 0:
+            return
+        ratio = completion_tokens / chars
+        key = _pair(source_lang, target_lang)
+        r = self._pairs.get(key)
+        if r is None:
+            r = self._pairs[key] = _PairRatio(self.initial_ratio, self.initial_deviation)
+        r.deviation += _DEV_BETA * (abs(ratio - r.mean) - r.deviation)
+        r.mean += _MEAN_ALPHA * (ratio - r.mean)
+        r.samples += 1
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        return {
+            f"{src}-{tgt}": {"ratio": round(r.mean, 3), "deviation": round(r.deviation, 3)}
+            for (src, tgt), r in self._pairs.items()
+        }
@@ -0,0 +1,146 @@
+"""Replay provider: serves a provider journal back, deterministically.
+
+Each request is matched on (text, source, target, prefill prefix) against
+the records of a journal written by `JournalProvider`, and answered with
+the recorded result (or error) after the recorded latency, token usage
+included. A request repeated N times gets the recorded answers in journal
+order, cycling. Lets scheduler and pipeline changes be benchmarked against
+real model timing and outputs (benchmark/replay_capture.py, staging)
+without a GPU.
+
+A request absent from the journal (e.g. a pipeline change cut sentences
+differently) is echoed, after the latency predicted for its length by a
+linear fit of the journal (latency = a + b * chars), and counted as a miss.
+"""
+
+import asyncio
+import logging
+import statistics
+from collections import defaultdict
+from typing import Any, AsyncIterator
+
+from translator.journal import read_journal
+from translator.providers.base import TranslationProvider, UntranslatedText, report_usage
+
+logger = logging.getLogger(__name__)
+
+_Key = tuple[str, str | None, str, str]
+
+
+class ReplayedError(RuntimeError):
+    """A provider error recorded in the journal, raised again."""
+
+
+class ReplayProvider(TranslationProvider):
+    """Serves the answers of a provider journal with their recorded latency.
+
+    Args:
+        path: Journal file (rotated files are read too).
+        records: Journal records, instead of a path (tests).
+    """
+
+    def __init__(self, path: str = "", records: list[dict[str, Any]] | None = None) -> None:
+        # Import here to allow non-replay configs to skip validation
+        if records is None:
+            if not path:
+                from translator.config import REPLAY_JOURNAL_PATH
+
+                path = REPLAY_JOURNAL_PATH
+            if not path:
+                raise ValueError("REPLAY_JOURNAL_PATH is required (a provider journal)")
+            records = list(read_journal(path))
+        self._records: dict[_Key, list[dict[str, Any]]] = defaultdict(list)
+        for rec in records:
+            key = self._key(rec["text"], rec["src"], rec["tgt"], rec.get("prefix", ""))
+            self._records[key].append(rec)
+        self._cursor: dict[_Key, int] = defaultdict(int)
+        self._fit = self._fit_latency(records)
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.misses = 0
+        logger.info(
+            "[replay] %d records, %d distinct requests; misses: %.0f ms + %.2f ms/char",
+            len(records), len(self._records), *self._fit,
+        )
+
+    @staticmethod
+    def _key(text: str, src: str | None, tgt: str, prefix: str = "") -> _Key:
+        return (" ".join(text.split()), src, tgt, prefix)
+
+    @staticmethod
+    def _fit_latency(records: list[dict[str, Any]]) -> tuple[float, float]:
+        """(intercept ms, slope ms/char) of latency against source length."""
+        points = [(len(r["text"]), r["latency_ms"]) for r in records if "result" in r]
+        if not points:
+            return 0.0, 0.0
+        chars, latency = zip(*points)
+        if len(set(chars)) < 2:
+            return statistics.median(latency), 0.0
+        slope, intercept = statistics.linear_regression(chars, latency)
+        return max(0.0, intercept), max(0.0, slope)
+
+    def _next(self, text: str, src: str | None, tgt: str, prefix: str = "") -> dict[str, Any]:
+        self.requests += 1
+        key = self._key(text, src, tgt, prefix)
+        recorded = self._records.get(key)
+        if not recorded:
+            self.misses += 1
+            intercept, slope = self._fit
+            return {"result": text, "latency_ms": intercept + slope * len(text)}
+        rec = recorded[self._cursor[key] % len(recorded)]
+        self._cursor[key] += 1
+        return rec
+
+    def _answer(self, rec: dict[str, Any]) -> str:
+        prompt_tokens = rec.get("prompt_tokens", 0)
+        completion_tokens = rec.get("completion_tokens", 0)
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        report_usage(prompt_tokens, completion_tokens)
+        if "error" in rec:
+            raise ReplayedError(rec["error"])
+        return UntranslatedText(rec["result"]) if rec.get("untranslated") else rec["result"]
+
+    async def translate(self, text: str, source_lang: str | None, target_lang: str) -> str:
+        rec = self._next(text, source_lang, target_lang)
+        await asyncio.sleep(rec["latency_ms"] / 1000)
+        return self._answer(rec)
+
+    async def translate_continue(
+        self, text: str, source_lang: str | None, target_lang: str, prefix: str
+    ) -> str:
+        if self._key(text, source_lang, target_lang, prefix) not in self._records:
+            return await self.translate(text, source_lang, target_lang)
+        rec = self._next(text, source_lang, target_lang, prefix)
+        await asyncio.sleep(rec["latency_ms"] / 1000)
+        return self._answer(rec)
+
+    async def translate_stream(
+        self, text: str, source_lang: str | None, target_lang: str
+    ) -> AsyncIterator[str]:
+        """Recorded result word by word: first word at the recorded
+        time-to-first-token, the others spread over the rest of the latency."""
+        rec = self._next(text, source_lang, target_lang)
+        latency_s = rec["latency_ms"] / 1000
+        ttft_s = min(rec.get("ttft_ms", rec["latency_ms"]) / 1000, latency_s)
+        await asyncio.sleep(ttft_s)
+        answer = self._answer(rec)
+        piece_type = type(answer)  # UntranslatedText is kept on every piece
+        words = answer.split(" ")
+        step = (latency_s - ttft_s) / max(1, len(words) - 1)
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(step)
+            yield piece_type(word if i == 0 else " " + word)
+
+    def usage_snapshot(self) -> dict[str, int]:
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "truncated": 0,
+        }
+
+    def replay_snapshot(self) -> dict[str, int]:
+        return {"requests": self.requests, "misses": self.misses}
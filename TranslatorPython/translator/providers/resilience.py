@@ -0,0 +1,308 @@
+"""Resilient provider: circuit breaker, budgeted retries, fallback chain.
+
+Without it, a backend outage turns every translation into a full timeout
+held on a scheduler slot. Here, per stage of the chain (the main provider,
+then each fallback):
+
+- a circuit breaker opens after `breaker_failures` consecutive failures:
+  requests skip the stage immediately for `breaker_open_s`, then ONE trial
+  request is let through (half-open) and decides whether it closes again;
+- failed requests are retried with exponential backoff and full jitter, at
+  most `max_retries` times, and only while the retry budget allows it:
+  every request earns `retry_budget` retry credits (0.1 = at most 10%
+  extra requests), so retries cannot multiply the load of an outage;
+- a request that still fails moves on to the next stage. The chain
+  typically ends with `PassthroughProvider` (source text tagged as
+  UntranslatedText).
+
+InvalidRequestError (e.g. no source language) is never retried nor counted
+as a failure. Other errors, malformed backend responses (DecodeError, a
+ValueError) included, are backend failures.
+
+A prefilled tail (`translate_continue`) is tried once on the main stage,
+if its circuit allows it, without a verdict: whatever its failure (outage,
+or a backend rejecting `continue_final_message`), the tail is then
+translated in full by `translate()`, breaker, retries and fallbacks
+included.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from translator.providers.base import (
+    InvalidRequestError,
+    ProviderWrapper,
+    TranslationItem,
+    TranslationProvider,
+)
+
+logger = logging.getLogger(__name__)
+
+# Credit cap: a quiet period can't bank a burst of retries
+_MAX_CREDIT = 10.0
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when every stage of the chain is unavailable."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open trial."""
+
+    def __init__(self, failures: int = 5, open_s: float = 10.0) -> None:
+        self.failures = failures
+        self.open_s = open_s
+        self.consecutive = 0
+        self.opened_at: float | None = None
+        self.trial = False  # a half-open trial request is in flight
+        self.opens = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.open_s:
+            return "open"
+        return "half-open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.trial:
+            self.trial = True
+            return True
+        return False
+
+    def success(self) -> None:
+        self.consecutive = 0
+        self.opened_at = None
+        self.trial = False
+
+    def failure(self) -> None:
+        self.consecutive += 1
+        # Failures of requests already in flight don't extend an open circuit
+        if self.trial or (self.opened_at is None and self.consecutive >= self.failures):
+            self.opened_at = time.monotonic()
+            self.opens += 1
+        self.trial = False
+
+    def release(self) -> None:
+        """The request ended without a verdict (cancelled)."""
+        self.trial = False
+
+
+@dataclass
+class _Stage:
+    name: str
+    provider: TranslationProvider
+    breaker: CircuitBreaker
+
+
+@dataclass
+class ResilienceStats:
+    retries: int = 0
+    retries_denied: int = 0  # retry due but no budget left
+    fallbacks: int = 0       # requests answered by a fallback stage
+    rejected: int = 0        # no stage available (all circuits open)
+
+
+class ResilientProvider(ProviderWrapper):
+    """Wraps a provider with a circuit breaker, retries and fallbacks.
+
+    Args:
+        inner: Main provider.
+        fallbacks: Providers tried in order when the previous ones fail.
+        max_retries: Retries per stage and request.
+        retry_budget: Max retries, as a fraction of requests.
+        backoff_base_s / backoff_max_s: Full-jitter exponential backoff.
+        breaker_failures: Consecutive failures that open a stage's circuit.
+        breaker_open_s: Time a circuit stays open before a trial request.
+    """
+
+    def __init__(
+        self,
+        inner: TranslationProvider,
+        fallbacks: list[TranslationProvider] | None = None,
+        max_retries: int = 2,
+        retry_budget: float = 0.1,
+        backoff_base_s: float = 0.1,
+        backoff_max_s: float = 2.0,
+        breaker_failures: int = 5,
+        breaker_open_s: float = 10.0,
+    ) -> None:
+        super().__init__(inner)
+        self.max_retries = max_retries
+        self.retry_budget = retry_budget
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self._stages = [
+            _Stage(type(p).__name__, p, CircuitBreaker(breaker_failures, breaker_open_s))
+            for p in [inner, *(fallbacks or [])]
+        ]
+        self._credit = 0.0
+        self.stats = ResilienceStats()
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max_s, self.backoff_base_s * 2 ** attempt))
+
+    def _may_retry(self, attempt: int) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if self._credit < 1.0:
+            self.stats.retries_denied += 1
+            return False
+        self._credit -= 1.0
+        self.stats.retries += 1
+        return True
+
+    async def _call_stage(self, stage: _Stage, text: str, source_lang: str, target_lang: str) -> str:
+        attempt = 0
+        while True:
+            if not stage.breaker.allow():
+                raise CircuitOpenError(f"circuit open: {stage.name}")
+            try:
+                result = await stage.provider.translate(text, source_lang, target_lang)
+            except InvalidRequestError:
+                stage.breaker.release()
+                raise
+            except Exception:
+                stage.breaker.failure()
+                if not self._may_retry(attempt):
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                stage.breaker.release()
+                raise
+            stage.breaker.success()
+            return result
+
+    async def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        self._credit = min(_MAX_CREDIT, self._credit + self.retry_budget)
+        error: Exception | None = None
+        for i, stage in enumerate(self._stages):
+            try:
+                result = await self._call_stage(stage, text, source_lang, target_lang)
+            except InvalidRequestError:
+                raise
+            except Exception as exc:
+                if not isinstance(exc, CircuitOpenError):
+                    logger.warning("[resilience] %s failed: %s", stage.name, exc)
+                error = exc
+                continue
+            if i > 0:
+                self.stats.fallbacks += 1
+            return result
+        if isinstance(error, CircuitOpenError):
+            self.stats.rejected += 1
+        raise error
+
+    async def translate_continue(
+        self, text: str, source_lang: str | None, target_lang: str, prefix: str
+    ) -> str:
+        stage = self._stages[0]
+        if stage.breaker.allow():
+            try:
+                result = await stage.provider.translate_continue(
+                    text, source_lang, target_lang, prefix
+                )
+            except Exception as exc:
+                stage.breaker.release()
+                logger.warning("[resilience] %s prefill failed, full translation: %s", stage.name, exc)
+            except BaseException:
+                stage.breaker.release()
+                raise
+            else:
+                stage.breaker.success()
+                return result
+        return await self.translate(text, source_lang, target_lang)
+
+    async def translate_batch(self, items: list[TranslationItem]) -> list[str | BaseException]:
+        """Batch on the main stage; failed items go through translate()."""
+        stage = self._stages[0]
+        results: list[str | BaseException]
+        if stage.breaker.allow():
+            try:
+                results = await stage.provider.translate_batch(items)
+            except Exception as exc:
+                stage.breaker.failure()
+                results = [exc] * len(items)
+            except BaseException:
+                stage.breaker.release()
+                raise
+            else:
+                stage.breaker.success()
+        else:
+            results = [CircuitOpenError(f"circuit open: {stage.name}")] * len(items)
+        failed = [
+            i for i, r in enumerate(results)
+            if isinstance(r, Exception) and not isinstance(r, InvalidRequestError)
+        ]
+        if failed:
+            retried = await asyncio.gather(
+                *(self.translate(*items[i]) for i in failed), return_exceptions=True
+            )
+            for i, result in zip(failed, retried):
+                results[i] = result
+        return results
+
+    async def translate_stream(
+        self, text: str, source_lang: str | None, target_lang: str
+    ) -> AsyncIterator[str]:
+        """Streams from the first available stage.
+
+        A stage failing before its first piece hands over to the next one;
+        once a piece has been yielded the stream is committed to its stage
+        and a later failure propagates (no retry, no fallback).
+        """
+        error: Exception = CircuitOpenError("every circuit is open")
+        for i, stage in enumerate(self._stages):
+            if not stage.breaker.allow():
+                continue
+            started = False
+            try:
+                async for piece in stage.provider.translate_stream(text, source_lang, target_lang):
+                    started = True
+                    yield piece
+            except InvalidRequestError:
+                stage.breaker.release()
+                raise
+            except Exception as exc:
+                stage.breaker.failure()
+                if started:
+                    raise
+                logger.warning("[resilience] %s stream failed: %s", stage.name, exc)
+                error = exc
+                continue
+            except BaseException:
+                stage.breaker.release()
+                raise
+            stage.breaker.success()
+            if i > 0:
+                self.stats.fallbacks += 1
+            return
+        if isinstance(error, CircuitOpenError):
+            self.stats.rejected += 1
+        raise error
+
+    def resilience_snapshot(self) -> dict:
+        return {
+            "retries": self.stats.retries,
+            "retries_denied": self.stats.retries_denied,
+            "fallbacks": self.stats.fallbacks,
+            "rejected": self.stats.rejected,
+            "circuits": " ".join(f"{s.name}={s.breaker.state}" for s in self._stages),
+        }
+
+    async def close(self) -> None:
+        for stage in self._stages[1:]:
+            close = getattr(stage.provider, "close", None)
+            if close is not None:
+                await close()
+        await super().close()
@@ -0,0 +1,254 @@
+"""Routing provider: language pairs served by their own provider and pool.
+
+Some pairs are slow or badly served by the main model (e.g. `mt`, `ga` on
+the 4B model). Routed to another provider instance or endpoint, each route
+gets its own concurrency cap: the scheduler holds a routed request on its
+route's limiter (`route_limiter`) instead of the global one, so a slow pool
+queues behind itself and never takes slots away from the main pairs.
+
+Routes are written `PAIRS|PROVIDER|ENDPOINT|MAX_CONCURRENT`, separated by
+`;` (`TRANSLATION_ROUTES`):
+
+    *>mt,*>ga|translategemma|http://gpu-b:8000|2; fr>en|translategemma|http://gpu-c:8000
+
+PAIRS are comma-separated `source>target` canonical languages, `*`
+matching any; a bare `mt` means `*>mt`. ENDPOINT (optional) is passed to the
+provider as `endpoint=`. MAX_CONCURRENT defaults to 8. The first matching
+route wins; unrouted pairs go to the default provider, under the global cap.
+
+The router sits above the hedging and resilience wrappers: each route has
+its own circuit breaker and hedge latencies (`from_specs(wrap=...)`), so a
+failing `mt` backend opens its own circuit, not the main pairs'.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable
+
+from translator.limiter import ConcurrencyLimiter
+from translator.providers.base import ProviderWrapper, TranslationItem, TranslationProvider
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_ROUTE_CONCURRENCY = 8
+
+
+@dataclass
+class RouteSpec:
+    """One parsed route of the routing table."""
+
+    pairs: list[tuple[str, str]]
+    provider: str
+    endpoint: str = ""
+    max_concurrent: int = _DEFAULT_ROUTE_CONCURRENCY
+
+    @property
+    def name(self) -> str:
+        return ",".join(f"{src}>{tgt}" for src, tgt in self.pairs)
+
+
+def parse_routes(spec: str) -> list[RouteSpec]:
+    """Parse a `TRANSLATION_ROUTES` table (see module docstring)."""
+    routes = []
+    for entry in spec.split(";"):
+        if not entry.strip():
+            continue
+        fields = [f.strip() for f in entry.split("|")]
+        if len(fields) < 2 or len(fields) > 4 or not fields[1]:
+            raise ValueError(f"Invalid route {entry.strip()!r}: expected PAIRS|PROVIDER[|ENDPOINT[|MAX]]")
+        pairs = []
+        for pair in fields[0].split(","):
+            src, _, tgt = pair.strip().rpartition(">")
+            if not tgt:
+                raise ValueError(f"Invalid language pair {pair.strip()!r} in route {entry.strip()!r}")
+            pairs.append((src.strip().lower() or "*", tgt.strip().lower()))
+        routes.append(
+            RouteSpec(
+                pairs=pairs,
+                provider=fields[1],
+                endpoint=fields[2] if len(fields) > 2 else "",
+                max_concurrent=(
+                    int(fields[3]) if len(fields) > 3 and fields[3] else _DEFAULT_ROUTE_CONCURRENCY
+                ),
+            )
+        )
+    return routes
+
+
+@dataclass(eq=False)
+class Route:
+    """A routed provider with its own concurrency pool and counters."""
+
+    name: str
+    pairs: list[tuple[str, str]]
+    provider: TranslationProvider
+    limiter: ConcurrencyLimiter
+    requests: int = 0
+    errors: int = 0
+
+    def matches(self, src: str, tgt: str) -> bool:
+        return any(
+            (s == "*" or s == src) and (t == "*" or t == tgt) for s, t in self.pairs
+        )
+
+
+class RoutingProvider(ProviderWrapper):
+    """Sends each language pair to its route's provider, or to `inner`.
+
+    Attributes the router does not define (`usage_snapshot`, `capacity`,
+    ...) are the default provider's: the global cap still sizes the
+    default pool only.
+
+    Args:
+        inner: Default provider (unrouted pairs).
+        routes: Routed providers, first match wins.
+    """
+
+    def __init__(self, inner: TranslationProvider, routes: list[Route]) -> None:
+        super().__init__(inner)
+        self.routes = routes
+        self._resolved: dict[tuple[str, str], Route | None] = {}
+
+    @classmethod
+    def from_specs(
+        cls,
+        inner: TranslationProvider,
+        specs: list[RouteSpec],
+        wrap: Callable[[TranslationProvider], TranslationProvider] | None = None,
+    ) -> "RoutingProvider":
+        """Build the routed providers of a parsed routing table.
+
+        `wrap` decorates each routed provider, as `inner` was (per-route
+        journal, hedging and circuit breaker).
+        """
+        from translator.providers import load_provider
+
+        routes = []
+        for spec in specs:
+            kwargs = {"endpoint": spec.endpoint} if spec.endpoint else {}
+            provider = load_provider(spec.provider, **kwargs)
+            routes.append(
+                Route(
+                    name=spec.name,
+                    pairs=spec.pairs,
+                    provider=wrap(provider) if wrap is not None else provider,
+                    limiter=ConcurrencyLimiter(spec.max_concurrent),
+                )
+            )
+            logger.info(
+                "[router] %s -> %s%s (max %d in flight)",
+                spec.name, spec.provider, f" @ {spec.endpoint}" if spec.endpoint else "",
+                spec.max_concurrent,
+            )
+        return cls(inner, routes)
+
+    def _route(self, source_lang: str | None, target_lang: str) -> Route | None:
+        pair = (
+            self.inner.canonical_lang(source_lang) if source_lang else "*",
+            self.inner.canonical_lang(target_lang),
+        )
+        if pair not in self._resolved:
+            self._resolved[pair] = next((r for r in self.routes if r.matches(*pair)), None)
+        return self._resolved[pair]
+
+    def route_limiter(self, source_lang: str | None, target_lang: str) -> ConcurrencyLimiter | None:
+        """Concurrency pool of a routed pair (None = the global pool)."""
+        route = self._route(source_lang, target_lang)
+        return route.limiter if route is not None else None
+
+    async def _counted(self, route: Route | None, coro):
+        if route is None:
+            return await coro
+        route.requests += 1
+        try:
+            return await coro
+        except Exception:
+            route.errors += 1
+            raise
+
+    async def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        route = self._route(source_lang, target_lang)
+        provider = route.provider if route is not None else self.inner
+        return await self._counted(route, provider.translate(text, source_lang, target_lang))
+
+    async def translate_continue(
+        self, text: str, source_lang: str | None, target_lang: str, prefix: str
+    ) -> str:
+        route = self._route(source_lang, target_lang)
+        provider = route.provider if route is not None else self.inner
+        return await self._counted(
+            route, provider.translate_continue(text, source_lang, target_lang, prefix)
+        )
+
+    async def translate_batch(self, items: list[TranslationItem]) -> list[str | BaseException]:
+        """One batch per provider: routed items never ride the default batch."""
+        groups: dict[Route | None, list[int]] = {}
+        for i, (_, src, tgt) in enumerate(items):
+            groups.setdefault(self._route(src, tgt), []).append(i)
+
+        async def run(route: Route | None, indexes: list[int]) -> list[str | BaseException]:
+            provider = route.provider if route is not None else self.inner
+            batch = [items[i] for i in indexes]
+            try:
+                results = await provider.translate_batch(batch)
+            except Exception as exc:
+                results = [exc] * len(batch)
+            if route is not None:
+                route.requests += len(batch)
+                route.errors += sum(isinstance(r, BaseException) for r in results)
+            return results
+
+        outcomes = await asyncio.gather(*(run(route, idx) for route, idx in groups.items()))
+        results: list[str | BaseException] = [None] * len(items)  # type: ignore[list-item]
+        for indexes, group_results in zip(groups.values(), outcomes):
+            for i, result in zip(indexes, group_results):
+                results[i] = result
+        return results
+
+    async def translate_stream(
+        self, text: str, source_lang: str | None, target_lang: str
+    ) -> AsyncIterator[str]:
+        route = self._route(source_lang, target_lang)
+        if route is None:
+            async for piece in self.inner.translate_stream(text, source_lang, target_lang):
+                yield piece
+            return
+        route.requests += 1
+        try:
+            async for piece in route.provider.translate_stream(text, source_lang, target_lang):
+                yield piece
+        except Exception:
+            route.errors += 1
+            raise
+
+    def lookup(self, text: str, source_lang: str | None, target_lang: str) -> str | None:
+        route = self._route(source_lang, target_lang)
+        provider = route.provider if route is not None else self.inner
+        return provider.lookup(text, source_lang, target_lang)
+
+    async def warm_up(self) -> None:
+        providers = [self.inner, *(r.provider for r in self.routes)]
+        warms = [getattr(p, "warm_up", None) for p in providers]
+        await asyncio.gather(*(warm() for warm in warms if warm is not None))
+
+    def routes_snapshot(self) -> dict[str, dict]:
+        snapshot = {}
+        for r in self.routes:
+            snapshot[r.name] = {
+                "requests": r.requests,
+                "errors": r.errors,
+                "inflight": r.limiter.inflight,
+                "limit": r.limiter.limit,
+            }
+            resilience = getattr(r.provider, "resilience_snapshot", None)
+            if resilience is not None:
+                snapshot[r.name]["circuits"] = resilience()["circuits"]
+        return snapshot
+
+    async def close(self) -> None:
+        for route in self.routes:
+            close = getattr(route.provider, "close", None)
+            if close is not None:
+                await close()
+        await super().close()
@@ -0,0 +1,128 @@
+"""Simulated provider: production-like timing without a GPU.
+
+Returns the source text unchanged, after a latency drawn from a model fitted
+on the TranslateGemma benchmarks (benchmark/results/latency_results.csv):
+
+    latency = (base + per_token * out_tokens * (1 + overhead * (inflight - 1)))
+              * jitter
+
+- out_tokens is estimated from the text length (translation ~ source length);
+- inflight counts the requests running in this provider when the request
+  starts: decode slows down as the backend batches more sequences;
+- jitter is log-normal with mean 1 (sigma 0 = deterministic).
+
+Faults are injected per request: with probability `error_rate` the request
+fails (SimulatedError, a transient error) after its latency; with
+probability `stall_rate` it hangs for `stall_s` first, as a stuck backend
+would. Lets the scheduler, limiter, hedging and resilience layers be
+exercised in staging under realistic timing.
+"""
+
+import asyncio
+import random
+
+from translator.budget import est_tokens
+from translator.providers.base import TranslationProvider
+
+
+class SimulatedError(RuntimeError):
+    """Injected transient provider failure."""
+
+
+class SimulatedProvider(TranslationProvider):
+    """Echo with simulated latency, errors and stalls.
+
+    Parameters left to None are read from the SIMULATED_* settings.
+
+    Args:
+        base_ms: Fixed cost of a request (prefill, HTTP, scheduling).
+        per_token_ms: Decode time per output token, alone on the backend.
+        concurrency_overhead: Decode slowdown per other in-flight request.
+        jitter_sigma: Sigma of the log-normal latency multiplier.
+        error_rate: Probability that a request fails.
+        stall_rate: Probability that a request hangs for `stall_s` first.
+        stall_s: Duration of a stall.
+        seed: Seed of the random draws (reproducible runs).
+    """
+
+    def __init__(
+        self,
+        base_ms: float | None = None,
+        per_token_ms: float | None = None,
+        concurrency_overhead: float | None = None,
+        jitter_sigma: float | None = None,
+        error_rate: float | None = None,
+        stall_rate: float | None = None,
+        stall_s: float | None = None,
+        seed: int | None = None,
+    ) -> None:
+        params = (
+            base_ms, per_token_ms, concurrency_overhead, jitter_sigma,
+            error_rate, stall_rate, stall_s,
+        )
+        # Import here to allow non-simulated configs to skip validation
+        if any(param is None for param in params):
+            from translator import config
+
+            if base_ms is None:
+                base_ms = config.SIMULATED_BASE_MS
+            if per_token_ms is None:
+                per_token_ms = config.SIMULATED_PER_TOKEN_MS
+            if concurrency_overhead is None:
+                concurrency_overhead = config.SIMULATED_CONCURRENCY_OVERHEAD
+            if jitter_sigma is None:
+                jitter_sigma = config.SIMULATED_JITTER_SIGMA
+            if error_rate is None:
+                error_rate = config.SIMULATED_ERROR_RATE
+            if stall_rate is None:
+                stall_rate = config.SIMULATED_STALL_RATE
+            if stall_s is None:
+                stall_s = config.SIMULATED_STALL_S
+        if not (0.0 <= error_rate <= 1.0 and 0.0 <= stall_rate <= 1.0):
+            raise ValueError("error_rate and stall_rate must be within [0, 1]")
+        self.base_s = base_ms / 1000
+        self.per_token_s = per_token_ms / 1000
+        self.concurrency_overhead = concurrency_overhead
+        self.jitter_sigma = jitter_sigma
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall_s = stall_s
+        self._random = random.Random(seed)
+        self.inflight = 0
+        self.requests = 0
+        self.errors = 0
+        self.stalls = 0
+
+    def latency(self, text: str, inflight: int = 1) -> float:
+        """Draw the latency of one request (seconds)."""
+        decode = self.per_token_s * est_tokens(len(text))
+        decode *= 1 + self.concurrency_overhead * max(0, inflight - 1)
+        jitter = 1.0
+        if self.jitter_sigma > 0:
+            # mu = -sigma^2 / 2: the multiplier has mean 1
+            jitter = self._random.lognormvariate(-self.jitter_sigma ** 2 / 2, self.jitter_sigma)
+        return (self.base_s + decode) * jitter
+
+    async def translate(self, text: str, source_lang: str | None, target_lang: str) -> str:
+        self.requests += 1
+        self.inflight += 1
+        try:
+            delay = self.latency(text, self.inflight)
+            if self._random.random() < self.stall_rate:
+                self.stalls += 1
+                delay += self.stall_s
+            await asyncio.sleep(delay)
+            if self._random.random() < self.error_rate:
+                self.errors += 1
+                raise SimulatedError("simulated provider failure")
+            return text
+        finally:
+            self.inflight -= 1
+
+    def simulated_snapshot(self) -> dict[str, int]:
+        return {
+            "inflight": self.inflight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "stalls": self.stalls,
+        }
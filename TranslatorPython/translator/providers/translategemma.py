@@ -1,28 +1,87 @@
 """TranslateGemma provider: vLLM-backed translation via OpenAI-compatible API."""
 
+import asyncio
 import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
 
 import httpx
 
-from translator.providers.base import TranslationProvider
+from translator import codec
+from translator.providers.base import (
+    InvalidRequestError,
+    TranslationItem,
+    TranslationProvider,
+    report_usage,
+)
+from translator.providers.endpoints import EndpointPool
+from translator.providers.max_tokens import TokenBudget
+from translator.providers.transport import TransportMeter, TransportSettings, build_client
 
 logger = logging.getLogger(__name__)
 
+# Stand-in source text, located in the server-rendered chat prompt of a
+# language pair to find where batched texts go
+_TEXT_SENTINEL = "@@LINTO_TEXT@@"
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+@dataclass
+class _Lease:
+    """An endpoint slot held for one request."""
+
+    url: str
+    tokens: int = 0  # completion tokens, for the endpoint latency model
+
+
+@dataclass
+class _StreamOutcome:
+    """How a streamed completion ended."""
+
+    truncated: bool = False
+    tokens: int = 0  # completion tokens
+
 
 class TranslateGemmaProvider(TranslationProvider):
-    """Translates text using TranslateGemma via a vLLM endpoint."""
+    """Translates text using TranslateGemma via one or several vLLM endpoints.
+
+    `endpoint` may list several servers (comma-separated): requests are then
+    balanced by an EndpointPool (least outstanding requests, per-endpoint
+    concurrency cap, health ejection).
+    """
 
     def __init__(
         self,
-        endpoint: str = "",
+        endpoint: str | list[str] = "",
         model: str = "Infomaniak-AI/vllm-translategemma-4b-it",
-        max_tokens: int = 160,
+        max_tokens: int = 512,
+        adaptive_max_tokens: bool = True,
         temperature: float = 0.0,
+        endpoint_max_concurrent: int = 8,
+        eject_after_failures: int = 3,
+        eject_seconds: float = 5.0,
+        transport: TransportSettings | None = None,
+        client: httpx.AsyncClient | None = None,
     ) -> None:
         # Import here to allow non-translategemma configs to skip validation
         if not endpoint:
             from translator.config import (
+                MAX_CONCURRENT_TRANSLATIONS,
+                TRANSLATEGEMMA_ADAPTIVE_MAX_TOKENS,
+                TRANSLATEGEMMA_EJECT_AFTER_FAILURES,
+                TRANSLATEGEMMA_EJECT_SECONDS,
                 TRANSLATEGEMMA_ENDPOINT,
+                TRANSLATEGEMMA_ENDPOINT_MAX_CONCURRENT,
+                TRANSLATEGEMMA_HTTP2,
+                TRANSLATEGEMMA_HTTP_CONNECT_TIMEOUT,
+                TRANSLATEGEMMA_HTTP_KEEPALIVE_EXPIRY,
+                TRANSLATEGEMMA_HTTP_MAX_CONNECTIONS,
+                TRANSLATEGEMMA_HTTP_POOL_TIMEOUT,
+                TRANSLATEGEMMA_HTTP_READ_TIMEOUT_BASE,
+                TRANSLATEGEMMA_HTTP_READ_TIMEOUT_PER_TOKEN,
                 TRANSLATEGEMMA_MAX_TOKENS,
                 TRANSLATEGEMMA_MODEL,
                 TRANSLATEGEMMA_TEMPERATURE,
@@ -31,81 +90,446 @@ class TranslateGemmaProvider(TranslationProvider):
             endpoint = TRANSLATEGEMMA_ENDPOINT
             model = TRANSLATEGEMMA_MODEL
             max_tokens = TRANSLATEGEMMA_MAX_TOKENS
+            adaptive_max_tokens = TRANSLATEGEMMA_ADAPTIVE_MAX_TOKENS
             temperature = TRANSLATEGEMMA_TEMPERATURE
+            endpoint_max_concurrent = (
+                TRANSLATEGEMMA_ENDPOINT_MAX_CONCURRENT or MAX_CONCURRENT_TRANSLATIONS
+            )
+            eject_after_failures = TRANSLATEGEMMA_EJECT_AFTER_FAILURES
+            eject_seconds = TRANSLATEGEMMA_EJECT_SECONDS
+            transport = TransportSettings(
+                max_connections=TRANSLATEGEMMA_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry_s=TRANSLATEGEMMA_HTTP_KEEPALIVE_EXPIRY,
+                http2=TRANSLATEGEMMA_HTTP2,
+                connect_timeout_s=TRANSLATEGEMMA_HTTP_CONNECT_TIMEOUT,
+                pool_timeout_s=TRANSLATEGEMMA_HTTP_POOL_TIMEOUT,
+                read_timeout_base_s=TRANSLATEGEMMA_HTTP_READ_TIMEOUT_BASE,
+                read_timeout_per_token_s=TRANSLATEGEMMA_HTTP_READ_TIMEOUT_PER_TOKEN,
+            )
 
-        if not endpoint:
+        urls = endpoint.split(",") if isinstance(endpoint, str) else list(endpoint)
+        urls = [u.strip() for u in urls if u.strip()]
+        if not urls:
             raise ValueError(
                 "TRANSLATEGEMMA_ENDPOINT is required (e.g. http://host:8000)"
             )
 
-        self.endpoint: str = endpoint.rstrip("/")
         self.model: str = model
-        self.max_tokens: int = max_tokens
+        self.max_tokens: int = max_tokens  # ceiling when adaptive
+        self.budget: TokenBudget | None = TokenBudget(max_tokens) if adaptive_max_tokens else None
         self.temperature: float = temperature
-        self._client: httpx.AsyncClient = httpx.AsyncClient(timeout=30.0)
+        # (src, tgt) -> server-rendered chat prompt, split around the text
+        self._chat_prompts: dict[tuple[str, str], asyncio.Task] = {}
+        self.transport: TransportSettings = transport or TransportSettings()
+        self._client: httpx.AsyncClient = client or build_client(
+            self.transport, endpoint_max_concurrent * len(urls)
+        )
+        self._meter = TransportMeter()
+        self.pool = EndpointPool(
+            urls,
+            max_concurrent=endpoint_max_concurrent,
+            client=self._client,
+            eject_after_failures=eject_after_failures,
+            eject_base_s=eject_seconds,
+            # A single endpoint has nobody to be balanced against
+            monitor_interval_s=5.0 if len(urls) > 1 else 0.0,
+        )
         # Cumulative token usage, reported by the pipeline stats loop
         self.prompt_tokens: int = 0
         self.completion_tokens: int = 0
         self.requests: int = 0
         self.truncated: int = 0
+        self.batches: int = 0
+        self.streams: int = 0
+        self.prefills: int = 0
+        self.budget_retries: int = 0
 
-    async def translate(self, text: str, source_lang: str | None, target_lang: str) -> str:
+    @staticmethod
+    def _prompt(text: str, source_lang: str | None, target_lang: str) -> str:
         # TranslateGemma uses short codes (fr, en, de) not BCP-47 (fr-FR)
         if not source_lang:
-            raise ValueError("source_lang is required for translation")
+            raise InvalidRequestError("source_lang is required for translation")
         src = source_lang.split("-")[0]
         tgt = target_lang.split("-")[0]
+        return f"<<<source>>>{src}<<<target>>>{tgt}<<<text>>>{text}"
 
-        prompt = f"<<<source>>>{src}<<<target>>>{tgt}<<<text>>>{text}"
+    async def _render_chat_prompt(self, source_lang: str, target_lang: str) -> tuple[str, str]:
+        """The server's chat template applied to a pair's prompt, split around the text.
 
-        payload = {
-            "model": self.model,
-            "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": self.max_tokens,
-            "temperature": self.temperature,
-        }
-
-        try:
+        vLLM renders it (`/tokenize` with `messages`, then `/detokenize`),
+        so batched prompts are exactly what `/v1/chat/completions` would
+        build: TranslateGemma's template is what turns the
+        `<<<source>>>...` markers into the model's instructions.
+        """
+        messages = [{"role": "user", "content": self._prompt(_TEXT_SENTINEL, source_lang, target_lang)}]
+        async with self._lease() as lease:
+            timeout = self.transport.timeout_for(0)
             response = await self._client.post(
-                f"{self.endpoint}/v1/chat/completions",
-                json=payload,
+                f"{lease.url}/tokenize",
+                content=codec.dumps(
+                    {"model": self.model, "messages": messages, "add_generation_prompt": True}
+                ),
+                headers=_JSON_HEADERS,
+                timeout=timeout,
+                extensions=self._meter.extensions(),
             )
             response.raise_for_status()
-            data = response.json()
+            tokens = codec.loads(response.content)["tokens"]
+            response = await self._client.post(
+                f"{lease.url}/detokenize",
+                content=codec.dumps({"model": self.model, "tokens": tokens}),
+                headers=_JSON_HEADERS,
+                timeout=timeout,
+                extensions=self._meter.extensions(),
+            )
+            response.raise_for_status()
+            rendered = codec.loads(response.content)["prompt"]
+        if rendered.count(_TEXT_SENTINEL) != 1:
+            raise ValueError(f"chat template did not keep the source text verbatim: {rendered!r}")
+        head, _, tail = rendered.partition(_TEXT_SENTINEL)
+        return head, tail
+
+    async def _completion_prompt(self, text: str, source_lang: str | None, target_lang: str) -> str:
+        """Raw /v1/completions prompt of an item: its chat prompt, as the server renders it."""
+        if not source_lang:
+            raise InvalidRequestError("source_lang is required for translation")
+        pair = (source_lang.split("-")[0], target_lang.split("-")[0])
+        task = self._chat_prompts.get(pair)
+        if task is None:
+            task = asyncio.ensure_future(self._render_chat_prompt(*pair))
+            task.add_done_callback(lambda t, pair=pair: self._chat_prompt_rendered(pair, t))
+            self._chat_prompts[pair] = task
+        head, tail = await asyncio.shield(task)
+        return f"{head}{text}{tail}"
+
+    def _chat_prompt_rendered(self, pair: tuple[str, str], task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is None:
+            return
+        exc = task.exception()
+        unsupported = isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 404
+        logger.warning(
+            "TranslateGemma cannot render batch prompts for %s>%s (%s): %s",
+            *pair, exc, "batches sent as single requests" if unsupported else "retried next batch",
+        )
+        if not unsupported and self._chat_prompts.get(pair) is task:
+            del self._chat_prompts[pair]
+
+    @property
+    def capacity(self) -> int:
+        """Total concurrency the endpoints accept (sum of per-endpoint caps)."""
+        return self.pool.capacity
+
+    @asynccontextmanager
+    async def _lease(self) -> AsyncIterator[_Lease]:
+        """Hold a pool endpoint for one request and report its outcome."""
+        ep = await self.pool.acquire()
+        lease = _Lease(ep.url)
+        ok: bool | None = None  # None = no health signal (cancelled)
+        t0 = time.monotonic()
+        try:
+            yield lease
+            ok = True
         except httpx.HTTPStatusError as exc:
+            # 4xx is our request's fault, not the endpoint's
+            ok = None if exc.response.status_code < 500 else False
             logger.error(
-                "TranslateGemma API error: %s %s",
+                "TranslateGemma API error (%s): %s %s",
+                ep.url,
                 exc.response.status_code,
                 exc.response.reason_phrase,
             )
             raise
         except Exception:
-            logger.exception("TranslateGemma request failed")
+            ok = False
+            logger.exception("TranslateGemma request failed (%s)", ep.url)
             raise
+        finally:
+            await self.pool.release(ep, ok, time.monotonic() - t0, lease.tokens)
 
-        choice = data["choices"][0]
-        if choice.get("finish_reason") == "length":
+    async def _post(self, path: str, payload: dict) -> dict:
+        async with self._lease() as lease:
+            response = await self._client.post(
+                f"{lease.url}{path}",
+                content=codec.dumps(payload),
+                headers=_JSON_HEADERS,
+                timeout=self.transport.timeout_for(payload["max_tokens"]),
+                extensions=self._meter.extensions(),
+            )
+            response.raise_for_status()
+            data = codec.loads(response.content)
+            lease.tokens = (data.get("usage") or {}).get("completion_tokens", 0) or 0
+            return data
+
+    def _max_tokens(self, text: str, source_lang: str | None, target_lang: str) -> int:
+        if self.budget is None:
+            return self.max_tokens
+        return self.budget.budget(len(text), source_lang, target_lang)
+
+    def _learn(self, text: str, source_lang: str | None, target_lang: str, data: dict) -> None:
+        if self.budget is not None:
+            tokens = (data.get("usage") or {}).get("completion_tokens", 0) or 0
+            self.budget.observe(len(text), source_lang, target_lang, tokens)
+
+    @staticmethod
+    def _is_truncated(choice: dict) -> bool:
+        return choice.get("finish_reason") == "length"
+
+    def _check_truncated(self, choice: dict, text: str, max_tokens: int) -> None:
+        if self._is_truncated(choice):
             self.truncated += 1
             logger.warning(
                 "TranslateGemma output truncated at max_tokens=%d (input %d chars): "
                 "the published translation is incomplete",
-                self.max_tokens, len(text),
+                max_tokens, len(text),
             )
+
+    def _record_usage(self, data: dict, requests: int) -> None:
         usage = data.get("usage") or {}
-        self.requests += 1
-        self.prompt_tokens += usage.get("prompt_tokens", 0) or 0
-        self.completion_tokens += usage.get("completion_tokens", 0) or 0
+        prompt_tokens = usage.get("prompt_tokens", 0) or 0
+        completion_tokens = usage.get("completion_tokens", 0) or 0
+        self.requests += requests
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        report_usage(prompt_tokens, completion_tokens)
 
+    async def translate(self, text: str, source_lang: str | None, target_lang: str) -> str:
+        max_tokens = self._max_tokens(text, source_lang, target_lang)
+        return await self._translate_chat(text, source_lang, target_lang, max_tokens)
+
+    async def _translate_chat(
+        self, text: str, source_lang: str | None, target_lang: str, max_tokens: int
+    ) -> str:
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": self._prompt(text, source_lang, target_lang)}],
+            "max_tokens": max_tokens,
+            "temperature": self.temperature,
+        }
+        data = await self._post("/v1/chat/completions", payload)
+        self._record_usage(data, 1)
+
+        choice = data["choices"][0]
+        if self._is_truncated(choice) and max_tokens < self.max_tokens:
+            # The learned budget was too tight: once more at the ceiling
+            self.budget_retries += 1
+            return await self._translate_chat(text, source_lang, target_lang, self.max_tokens)
+        self._check_truncated(choice, text, max_tokens)
+        if not self._is_truncated(choice):
+            self._learn(text, source_lang, target_lang, data)
         return choice["message"]["content"].strip()
 
+    async def translate_stream(
+        self, text: str, source_lang: str | None, target_lang: str
+    ) -> AsyncIterator[str]:
+        """Chat completion streamed over SSE: yields content deltas as decoded.
+
+        Streams get the adaptive budget too. Pieces already yielded cannot
+        be taken back, so a stream truncated below the ceiling is resumed
+        rather than retried: the decoded text is prefilled
+        (`continue_final_message`) and the rest streamed at the ceiling.
+        """
+        messages = [{"role": "user", "content": self._prompt(text, source_lang, target_lang)}]
+        max_tokens = self._max_tokens(text, source_lang, target_lang)
+        decoded: list[str] = []
+        outcome = _StreamOutcome()
+        async for piece in self._stream_chat(messages, max_tokens, outcome):
+            decoded.append(piece)
+            yield piece
+        tokens = outcome.tokens
+        if outcome.truncated and max_tokens < self.max_tokens:
+            self.budget_retries += 1
+            messages = [*messages, {"role": "assistant", "content": "".join(decoded)}]
+            max_tokens = self.max_tokens
+            outcome = _StreamOutcome()
+            async for piece in self._stream_chat(messages, max_tokens, outcome, continue_final=True):
+                yield piece
+            tokens += outcome.tokens
+        if outcome.truncated:
+            self._check_truncated({"finish_reason": "length"}, text, max_tokens)
+        else:
+            self._learn(text, source_lang, target_lang, {"usage": {"completion_tokens": tokens}})
+        self.streams += 1
+
+    async def _stream_chat(
+        self,
+        messages: list[dict],
+        max_tokens: int,
+        outcome: _StreamOutcome,
+        continue_final: bool = False,
+    ) -> AsyncIterator[str]:
+        """One chat completion over SSE; `outcome` is filled once it ends."""
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": self.temperature,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        if continue_final:
+            payload["add_generation_prompt"] = False
+            payload["continue_final_message"] = True
+        async with self._lease() as lease:
+            async with self._client.stream(
+                "POST",
+                f"{lease.url}/v1/chat/completions",
+                content=codec.dumps(payload),
+                headers=_JSON_HEADERS,
+                timeout=self.transport.timeout_for(max_tokens),
+                extensions=self._meter.extensions(),
+            ) as response:
+                response.raise_for_status()
+                usage: dict = {}
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = codec.loads(data)
+                    usage = chunk.get("usage") or usage
+                    for choice in chunk.get("choices") or []:
+                        outcome.truncated = outcome.truncated or self._is_truncated(choice)
+                        content = (choice.get("delta") or {}).get("content")
+                        if content:
+                            yield content
+                outcome.tokens = lease.tokens = usage.get("completion_tokens", 0) or 0
+                self._record_usage({"usage": usage}, 1)
+
+    async def translate_continue(
+        self, text: str, source_lang: str | None, target_lang: str, prefix: str
+    ) -> str:
+        """Assistant prefill: `prefix` opens the model turn, only the rest is decoded.
+
+        Uses vLLM's `continue_final_message`. A continuation truncated at its
+        budget falls back to a full translation at the ceiling.
+        """
+        prefix = prefix.rstrip()
+        if not prefix:
+            return await self.translate(text, source_lang, target_lang)
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "user", "content": self._prompt(text, source_lang, target_lang)},
+                {"role": "assistant", "content": prefix},
+            ],
+            "max_tokens": self._max_tokens(text, source_lang, target_lang),
+            "temperature": self.temperature,
+            "add_generation_prompt": False,
+            "continue_final_message": True,
+        }
+        data = await self._post("/v1/chat/completions", payload)
+        self._record_usage(data, 1)
+        self.prefills += 1
+        choice = data["choices"][0]
+        if self._is_truncated(choice):
+            self.budget_retries += 1
+            return await self._translate_chat(text, source_lang, target_lang, self.max_tokens)
+        # The continuation carries its own leading space (or punctuation)
+        return (prefix + choice["message"]["content"]).strip()
+
+    async def translate_batch(self, items: list[TranslationItem]) -> list[str | BaseException]:
+        """One multi-prompt /v1/completions request for the whole batch.
+
+        vLLM schedules the prompts together, so the batch pays the fixed
+        per-request overhead once instead of once per item. Each prompt is
+        the server-rendered chat prompt of its item (rendered once per
+        language pair, then cached); if it cannot be rendered, the batch is
+        sent as single chat requests. The batch budget is the largest item
+        budget; items truncated below the ceiling are retried individually
+        at the ceiling.
+        """
+        if len(items) == 1:
+            return await super().translate_batch(items)
+        results: list[str | BaseException] = [RuntimeError("missing choice")] * len(items)
+        prompts: list[str] = []
+        slots: list[int] = []  # prompt index -> item index
+        rendered = await asyncio.gather(
+            *(self._completion_prompt(*item) for item in items), return_exceptions=True
+        )
+        for i, prompt in enumerate(rendered):
+            if isinstance(prompt, InvalidRequestError):
+                results[i] = prompt  # missing source language: this item only
+            elif isinstance(prompt, BaseException):
+                return await super().translate_batch(items)
+            else:
+                prompts.append(prompt)
+                slots.append(i)
+        if not prompts:
+            return results
+
+        max_tokens = max(self._max_tokens(*items[i]) for i in slots)
+        payload = {
+            "model": self.model,
+            "prompt": prompts,
+            "max_tokens": max_tokens,
+            "temperature": self.temperature,
+            # The rendered chat prompt already holds the BOS token
+            "add_special_tokens": False,
+        }
+        data = await self._post("/v1/completions", payload)
+        self._record_usage(data, len(prompts))
+        self.batches += 1
+
+        retry: list[int] = []
+        for choice in data["choices"]:
+            i = slots[choice["index"]]
+            if self._is_truncated(choice) and max_tokens < self.max_tokens:
+                retry.append(i)
+                continue
+            self._check_truncated(choice, items[i][0], max_tokens)
+            results[i] = choice["text"].strip()
+        # Usage is per request: per-item ratios are only known for a uniform pair
+        pairs = {(items[i][1], items[i][2]) for i in slots}
+        if len(pairs) == 1 and not retry and self.budget is not None:
+            src, tgt = next(iter(pairs))
+            chars = sum(len(items[i][0]) for i in slots)
+            tokens = (data.get("usage") or {}).get("completion_tokens", 0) or 0
+            self.budget.observe(chars, src, tgt, tokens)
+        if retry:
+            self.budget_retries += len(retry)
+            retried = await asyncio.gather(
+                *(self._translate_chat(*items[i], self.max_tokens) for i in retry),
+                return_exceptions=True,
+            )
+            for i, result in zip(retry, retried):
+                results[i] = result
+        return results
+
+    async def warm_up(self) -> None:
+        """Open a connection to every endpoint (health probe) before traffic."""
+        async def probe(url: str) -> None:
+            try:
+                response = await self._client.get(
+                    f"{url}/health",
+                    timeout=self.transport.timeout_for(0),
+                    extensions=self._meter.extensions(),
+                )
+                response.raise_for_status()
+            except httpx.HTTPError as exc:
+                logger.warning("TranslateGemma warm-up: %s not ready (%s)", url, exc)
+
+        await asyncio.gather(*(probe(ep.url) for ep in self.pool.endpoints))
+
     def usage_snapshot(self) -> dict[str, int]:
         return {
             "requests": self.requests,
             "prompt_tokens": self.prompt_tokens,
             "completion_tokens": self.completion_tokens,
             "truncated": self.truncated,
+            "batches": self.batches,
+            "streams": self.streams,
+            "prefills": self.prefills,
+            "budget_retries": self.budget_retries,
         }
 
+    def transport_snapshot(self) -> dict[str, float]:
+        return self._meter.snapshot()
+
+    def endpoints_snapshot(self) -> list[dict]:
+        return self.pool.snapshot()
+
     async def close(self) -> None:
-        """Close the underlying HTTP client."""
+        """Stop the endpoint monitor and close the underlying HTTP client."""
+        await self.pool.close()
         await self._client.aclose()
@@ -0,0 +1,110 @@
+"""HTTP transport for the vLLM-backed providers: pool limits, HTTP/2, timeouts.
+
+The httpx defaults (20 keep-alive connections, flat 30 s timeout) don't fit
+a translator that runs MAX_CONCURRENT_TRANSLATIONS requests per endpoint:
+bursts above the keep-alive pool churn connections (and TLS handshakes),
+and a flat timeout is either too short for long finals or far too long for
+one-word sentences. Here:
+
+- the pool is sized from the concurrency the provider will actually use;
+- HTTP/2 multiplexing is optional (needs the `h2` package, falls back to
+  HTTP/1.1 with a warning when missing);
+- connect, pool-acquisition and read timeouts are separate, and the read
+  timeout scales with the generation budget of each request;
+- the time requests spend waiting for a pooled connection is measured through
+  the httpcore trace extension, as is the number of connections opened.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Extra connections for the endpoint monitor (/metrics, /health)
+_MONITOR_CONNECTIONS = 2
+
+
+@dataclass
+class TransportSettings:
+    max_connections: int = 0            # 0 = derived from the concurrency
+    keepalive_expiry_s: float = 60.0
+    http2: bool = False
+    connect_timeout_s: float = 5.0
+    pool_timeout_s: float = 10.0
+    read_timeout_base_s: float = 5.0
+    read_timeout_per_token_s: float = 0.1
+
+    def timeout_for(self, max_tokens: int) -> httpx.Timeout:
+        """Per-request timeout: the read budget grows with the tokens to generate."""
+        read = self.read_timeout_base_s + self.read_timeout_per_token_s * max_tokens
+        return httpx.Timeout(
+            connect=self.connect_timeout_s,
+            read=read,
+            write=self.connect_timeout_s,
+            pool=self.pool_timeout_s,
+        )
+
+
+def build_client(settings: TransportSettings, concurrency: int) -> httpx.AsyncClient:
+    """AsyncClient whose keep-alive pool holds every concurrent request."""
+    max_connections = settings.max_connections or concurrency + _MONITOR_CONNECTIONS
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=settings.keepalive_expiry_s,
+    )
+    timeout = settings.timeout_for(0)
+    if settings.http2:
+        try:
+            return httpx.AsyncClient(limits=limits, timeout=timeout, http2=True)
+        except ImportError:
+            logger.warning("HTTP/2 requested but the 'h2' package is missing: using HTTP/1.1")
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+class TransportMeter:
+    """Pool-wait and connection counters, fed by the httpcore trace extension."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.pool_wait_s_total = 0.0
+        self.pool_wait_s_max = 0.0
+        self.connections_opened = 0
+
+    def extensions(self) -> dict:
+        """Request extensions measuring the wait for a pooled connection.
+
+        A request has its connection once it either starts opening a new
+        one or starts sending headers on a reused one.
+        """
+        t0 = time.monotonic()
+        measured = False
+
+        async def trace(event: str, info: dict) -> None:
+            nonlocal measured
+            if event == "connection.connect_tcp.started":
+                self.connections_opened += 1
+            if not measured and (
+                event == "connection.connect_tcp.started"
+                or event.endswith(".send_request_headers.started")
+            ):
+                measured = True
+                wait = time.monotonic() - t0
+                self.requests += 1
+                self.pool_wait_s_total += wait
+                self.pool_wait_s_max = max(self.pool_wait_s_max, wait)
+
+        return {"trace": trace}
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "requests": self.requests,
+            "pool_wait_ms_avg": (
+                round(self.pool_wait_s_total / self.requests * 1000, 1) if self.requests else 0.0
+            ),
+            "pool_wait_ms_max": round(self.pool_wait_s_max * 1000, 1),
+            "connections_opened": self.connections_opened,
+        }
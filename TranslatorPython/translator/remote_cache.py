@@ -0,0 +1,350 @@
+"""Shared translation memory: a remote cache tier common to all replicas.
+
+Replicas running under the same `TRANSLATOR_NAME` otherwise translate the
+same common phrases each on their own. Third tier behind the in-memory
+`TranslationCache` and the local `TranslationStore`:
+
+- reads are bounded by a short deadline (`deadline_s`): a slow or
+  unreachable cache answers "miss" in time and is never worth more latency
+  than that; `CachedProvider` runs them concurrently with the provider call;
+- writes are fire-and-forget (bounded number in flight, extra ones dropped);
+- errors never propagate: the cache is an optimization, not a dependency.
+
+`RespCache` speaks the Redis protocol (RESP2: Redis, Valkey, KeyDB...) over
+one pipelined asyncio connection, without a client library.
+`MemoryRemoteCache` is the in-process fake used by tests and benchmarks.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from urllib.parse import unquote, urlparse
+
+from translator.cache import CacheKey
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_PORT = 6379
+_RECONNECT_DELAY_S = 1.0
+
+
+@dataclass
+class RemoteCacheStats:
+    hits: int = 0
+    misses: int = 0
+    timeouts: int = 0         # reads past the deadline (counted as misses too)
+    errors: int = 0
+    writes: int = 0
+    dropped_writes: int = 0   # too many writes in flight
+    read_s: float = 0.0       # total read latency, deadline included
+    max_read_s: float = 0.0
+    reads: int = 0
+
+
+class RemoteCache(ABC):
+    """Deadline-bounded, instrumented remote translation memory.
+
+    Args:
+        deadline_s: Max wait for a read; past it, the read is a miss.
+        namespace: Key prefix: replicas sharing it share translations.
+        ttl_s: Expiry of written translations (0 = never).
+        max_pending_writes: Writes in flight beyond this are dropped.
+    """
+
+    def __init__(
+        self,
+        deadline_s: float = 0.02,
+        namespace: str = "linto-translator",
+        ttl_s: float = 7 * 24 * 3600,
+        max_pending_writes: int = 1000,
+    ) -> None:
+        self.deadline_s = deadline_s
+        self.namespace = namespace
+        self.ttl_s = ttl_s
+        self.max_pending_writes = max_pending_writes
+        self._writes: set[asyncio.Task] = set()
+        self._closed = False
+        self.stats = RemoteCacheStats()
+
+    def remote_key(self, key: CacheKey) -> str:
+        """Bounded-size remote key of a translation (hash of text and languages)."""
+        digest = hashlib.sha1("\x1f".join(key).encode()).hexdigest()
+        return f"{self.namespace}:{digest}"
+
+    @abstractmethod
+    async def _get_many(self, keys: list[str]) -> list[str | None]:
+        ...
+
+    @abstractmethod
+    async def _put(self, key: str, value: str) -> None:
+        ...
+
+    async def get_many(self, keys: list[CacheKey]) -> list[str | None]:
+        """Remote translations for `keys` (None = unknown). Never raises."""
+        if not keys or self._closed:
+            return [None] * len(keys)
+        t0 = time.monotonic()
+        try:
+            found = await asyncio.wait_for(
+                self._get_many([self.remote_key(k) for k in keys]), self.deadline_s
+            )
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            found = [None] * len(keys)
+        except Exception as exc:
+            self.stats.errors += 1
+            logger.debug("[remote-cache] read failed: %s", exc)
+            found = [None] * len(keys)
+        elapsed = time.monotonic() - t0
+        self.stats.reads += 1
+        self.stats.read_s += elapsed
+        self.stats.max_read_s = max(self.stats.max_read_s, elapsed)
+        for value in found:
+            if value is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        return found
+
+    async def get(self, key: CacheKey) -> str | None:
+        return (await self.get_many([key]))[0]
+
+    def put(self, key: CacheKey, value: str) -> None:
+        """Write in the background; the caller never waits for it."""
+        if self._closed:
+            return
+        if len(self._writes) >= self.max_pending_writes:
+            self.stats.dropped_writes += 1
+            return
+        task = asyncio.get_running_loop().create_task(self._put(self.remote_key(key), value))
+        self._writes.add(task)
+        task.add_done_callback(self._write_done)
+
+    def _write_done(self, task: asyncio.Task) -> None:
+        self._writes.discard(task)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.stats.errors += 1
+            logger.debug("[remote-cache] write failed: %s", task.exception())
+        else:
+            self.stats.writes += 1
+
+    async def close(self) -> None:
+        """Let writes in flight finish, then release the connection."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writes:
+            await asyncio.wait(set(self._writes), timeout=1.0)
+        for task in self._writes:
+            task.cancel()
+
+    def snapshot(self) -> dict[str, float]:
+        s = self.stats
+        lookups = s.hits + s.misses
+        return {
+            "hits": s.hits,
+            "misses": s.misses,
+            "hit_rate": s.hits / lookups if lookups else 0.0,
+            "timeouts": s.timeouts,
+            "errors": s.errors,
+            "writes": s.writes,
+            "dropped_writes": s.dropped_writes,
+            "avg_read_ms": 1000 * s.read_s / s.reads if s.reads else 0.0,
+            "max_read_ms": 1000 * s.max_read_s,
+        }
+
+
+class MemoryRemoteCache(RemoteCache):
+    """In-process fake: a dict, optionally shared (two "replicas") and slow.
+
+    Args:
+        data: Backing dict; pass the same one to several instances.
+        latency_s: Simulated round trip of each read and write.
+    """
+
+    def __init__(
+        self, data: dict[str, str] | None = None, latency_s: float = 0.0, **kwargs
+    ) -> None:
+        super().__init__(**kwargs)
+        self.data = data if data is not None else {}
+        self.latency_s = latency_s
+
+    async def _get_many(self, keys: list[str]) -> list[str | None]:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        return [self.data.get(k) for k in keys]
+
+    async def _put(self, key: str, value: str) -> None:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        self.data[key] = value
+
+
+class RespError(Exception):
+    """Error reply of the server (`-ERR ...`)."""
+
+
+def _encode_command(*args: str | bytes | int) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+async def _read_reply(reader: asyncio.StreamReader):
+    line = await reader.readuntil(b"\r\n")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        return RespError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        size = int(body)
+        if size < 0:
+            return None
+        data = await reader.readexactly(size + 2)
+        return data[:-2].decode()
+    if kind == b"*":
+        count = int(body)
+        if count < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(count)]
+    raise ConnectionError(f"invalid RESP reply {line[:32]!r}")
+
+
+class RespCache(RemoteCache):
+    """Redis-protocol backend: one pipelined connection, reconnected lazily.
+
+    Commands are written as they come and their replies matched in order
+    by a reader task, so concurrent reads never wait for each other's
+    round trip. A read abandoned at its deadline still has its reply
+    consumed. After a connection failure, reconnection is attempted at most
+    once per second; reads in between are immediate misses.
+
+    Args:
+        url: `redis://[:password@]host[:port][/db]`.
+    """
+
+    def __init__(self, url: str, connect_timeout_s: float = 1.0, **kwargs) -> None:
+        super().__init__(**kwargs)
+        parsed = urlparse(url)
+        if parsed.scheme != "redis" or not parsed.hostname:
+            raise ValueError(f"Invalid remote cache URL {url!r} (expected redis://host:port/db)")
+        self.host = parsed.hostname
+        self.port = parsed.port or _DEFAULT_PORT
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.connect_timeout_s = connect_timeout_s
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._replies: deque[asyncio.Future] = deque()
+        self._connecting: asyncio.Task | None = None
+        self._retry_at = 0.0
+
+    async def _connect(self) -> None:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.connect_timeout_s
+        )
+        setup = []
+        if self.password:
+            setup.append(_encode_command("AUTH", self.password))
+        if self.db:
+            setup.append(_encode_command("SELECT", self.db))
+        if setup:
+            writer.write(b"".join(setup))
+            for _ in setup:
+                reply = await asyncio.wait_for(_read_reply(reader), self.connect_timeout_s)
+                if isinstance(reply, RespError):
+                    writer.close()
+                    raise reply
+        self._writer = writer
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_loop(reader))
+        logger.info("[remote-cache] connected to %s:%d/%d", self.host, self.port, self.db)
+
+    def _connect_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self._retry_at = time.monotonic() + _RECONNECT_DELAY_S
+            logger.warning(
+                "[remote-cache] cannot connect to %s:%d: %s", self.host, self.port, task.exception()
+            )
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                reply = await _read_reply(reader)
+                fut = self._replies.popleft()
+                if not fut.done():
+                    fut.set_result(reply)
+        except (
+            ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+            IndexError, ValueError,
+        ) as exc:
+            self._disconnect(exc)
+
+    def _disconnect(self, exc: BaseException) -> None:
+        if self._writer is not None:
+            logger.warning("[remote-cache] connection to %s:%d lost: %s", self.host, self.port, exc)
+            self._writer.close()
+            self._writer = None
+        self._retry_at = time.monotonic() + _RECONNECT_DELAY_S
+        while self._replies:
+            fut = self._replies.popleft()
+            if not fut.done():
+                fut.set_exception(ConnectionError(str(exc)))
+
+    async def _command(self, *args: str | bytes | int):
+        if self._writer is None:
+            if time.monotonic() < self._retry_at:
+                raise ConnectionError("remote cache unavailable")
+            if self._connecting is None or self._connecting.done():
+                self._connecting = asyncio.get_running_loop().create_task(self._connect())
+                self._connecting.add_done_callback(self._connect_done)
+            try:
+                # Shielded: a read giving up at its deadline doesn't abort the connection
+                await asyncio.shield(self._connecting)
+            except (OSError, asyncio.TimeoutError, RespError) as exc:
+                raise ConnectionError(f"remote cache connect failed: {exc}") from exc
+        fut = asyncio.get_running_loop().create_future()
+        self._replies.append(fut)
+        self._writer.write(_encode_command(*args))
+        reply = await fut
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    async def _get_many(self, keys: list[str]) -> list[str | None]:
+        if len(keys) == 1:
+            return [await self._command("GET", keys[0])]
+        return await self._command("MGET", *keys)
+
+    async def _put(self, key: str, value: str) -> None:
+        if self.ttl_s > 0:
+            await self._command("SET", key, value, "EX", int(self.ttl_s))
+        else:
+            await self._command("SET", key, value)
+
+    async def close(self) -> None:
+        await super().close()
+        if self._connecting is not None and not self._connecting.done():
+            self._connecting.cancel()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def open_remote_cache(url: str, **kwargs) -> RemoteCache:
+    """Remote cache backend for `url` (`redis://...`, or `memory://` for the fake)."""
+    if url.startswith("memory://"):
+        return MemoryRemoteCache(**kwargs)
+    return RespCache(url, **kwargs)
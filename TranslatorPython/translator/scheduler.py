@@ -6,41 +6,96 @@ Every provider request goes through here. Two kinds of work:
   key (FIFO via per-key lock) so frozen translations complete in order;
   awaitable by the caller.
 - submit_tail(key, text, version, on_done): translation of the current tail.
-  Latest-wins slot: at most ONE tail request in flight per key; while it runs,
-  newer texts overwrite the pending slot; on completion the newest pending is
-  fired, at most once every `min_tail_interval_ms`.
+  Latest-wins slot: at most ONE tail request in flight per key; a newer text
+  cancels the in-flight one (its result could no longer be published) and
+  waits in the pending slot, fired at most once every `min_tail_interval_ms`.
+  Given a `prefix` (known start of the translation), the provider only
+  decodes the rest (`translate_continue`).
 
-A global semaphore (`max_concurrent`) caps the total number of in-flight
+Cancellation is task cancellation: a cancelled caller aborts its provider
+call (HTTP request included) and frees its semaphore slot at once, unless
+an identical request still shares the call. `cancel_key` cancels the tail
+work of a key; callers cancel their own freezes. When a final arrives,
+`drop_pending_tail` then `settle_tail` keep an in-flight tail that already
+translates the final's remainder: it completes (its `on_done` runs) instead
+of being aborted and paid for again.
+
+A global limiter (`max_concurrent`) caps the total number of in-flight
 provider requests for the whole process: demand can no longer diverge when
-the backend slows down.
+the backend slows down. With `adaptive_max_concurrent > 0` the cap adapts
+to the backend's latency between `adaptive_min_concurrent` and
+`adaptive_max_concurrent`, starting from `max_concurrent`
+(`translator.limiter`). With `token_budget > 0`, requests are also charged
+their estimated prompt + completion tokens against a token bucket refilling
+at that many tokens/second (`translator.budget`), before taking a slot.
+A provider routing some language pairs to their own pools
+(`route_limiter`, `translator.providers.router`) holds those requests on
+the pool's limiter instead: a slow pool never takes global slots, and its
+requests are not charged to the token budget, which is the default
+provider's.
+
+Identical concurrent requests `(text, src, tgt)` share one in-flight provider
+call (singleflight): mirrored channels and bot-distributed sessions carrying
+the same audio cost one request, not one per key.
+
+With `batch_window_ms > 0`, admitted requests are coalesced by a
+`MicroBatcher` and reach the provider as `translate_batch()` calls.
+
+With `stream_interval_ms > 0`, a freeze given an `on_progress` callback is
+translated through `translate_stream()` (never batched): the callback
+receives the growing translation, cut at word boundaries, at most once per
+interval, while decoding continues.
 """
 
 import asyncio
 import logging
+import time
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
-from typing import Any, Awaitable, Callable
+from typing import Any, AsyncIterator, Awaitable, Callable
 
-from translator.providers.base import TranslationProvider
+from translator.batcher import MicroBatcher
+from translator.budget import TokenBucket, est_tokens, request_tokens
+from translator.limiter import ConcurrencyLimiter
+from translator.providers.base import TranslationProvider, UntranslatedText
 
 logger = logging.getLogger(__name__)
 
 # on_done(version, source_text, translated_text) — async
 TailCallback = Callable[[int, str, str], Awaitable[None]]
+# on_progress(partial_translation) — async, complete words only
+ProgressCallback = Callable[[str], Awaitable[None]]
 
 
 @dataclass
 class _TailSlot:
-    pending: tuple[str, str, str, int, TailCallback] | None = None  # text, src, tgt, version, cb
+    pending: tuple[str, str, str, int, TailCallback, str] | None = None  # text, src, tgt, version, cb, prefix
     runner: asyncio.Task | None = None
+    call: asyncio.Task | None = None  # in-flight tail translation
+    call_text: str = ""  # its source text
     last_fire: float = float("-inf")
 
 
+@dataclass
+class _Flight:
+    """One in-flight provider call, shared by every identical request."""
+
+    task: asyncio.Task
+    waiters: int = 0
+    listeners: list[ProgressCallback] | None = None  # streamed flights only
+
+
 @dataclass
 class SchedulerStats:
     freezes: int = 0
     tails: int = 0
     tail_superseded: int = 0  # pending texts overwritten before being sent
     errors: int = 0
+    singleflight_hits: int = 0  # requests served by an identical in-flight call
+    cancelled: int = 0  # provider calls aborted before completion (wasted work)
+    cancelled_queued: int = 0  # cancelled while waiting for the budget or a slot (no work lost)
+    streams: int = 0
+    stream_updates: int = 0  # progress callbacks fired
 
 
 class TranslationScheduler:
@@ -49,30 +104,192 @@ class TranslationScheduler:
         provider: TranslationProvider,
         max_concurrent: int = 8,
         min_tail_interval_ms: int = 1000,
+        batch_window_ms: int = 0,
+        batch_max_size: int = 16,
+        stream_interval_ms: int = 0,
+        token_budget: float = 0.0,
+        adaptive_min_concurrent: int = 1,
+        adaptive_max_concurrent: int = 0,
     ) -> None:
         self.provider = provider
-        self._sem = asyncio.Semaphore(max_concurrent)
+        self._limiter = ConcurrencyLimiter(
+            max_concurrent, min_limit=adaptive_min_concurrent, max_limit=adaptive_max_concurrent
+        )
+        self._route_limiter = getattr(provider, "route_limiter", None)
+        self._bucket = TokenBucket(token_budget) if token_budget > 0 else None
         self.max_concurrent = max_concurrent
         self.min_tail_interval_s = min_tail_interval_ms / 1000.0
+        self.stream_interval_s = stream_interval_ms / 1000.0
         self._key_locks: dict[str, asyncio.Lock] = {}
         self._tails: dict[str, _TailSlot] = {}
         self.stats = SchedulerStats()
         self.inflight = 0
+        self._flights: dict[tuple[str, str | None, str, str], _Flight] = {}
+        self._batcher: MicroBatcher | None = (
+            MicroBatcher(provider, batch_window_ms, batch_max_size)
+            if batch_window_ms > 0
+            else None
+        )
 
-    async def _translate(self, text: str, src_lang: str | None, tgt_lang: str) -> str:
-        async with self._sem:
+    async def _translate(
+        self,
+        text: str,
+        src_lang: str | None,
+        tgt_lang: str,
+        on_progress: ProgressCallback | None = None,
+        prefix: str = "",
+    ) -> str:
+        """Singleflight front: join an identical in-flight call or start one.
+
+        The shared call is cancelled only when its LAST waiter is cancelled.
+        Answers known to the provider without backend work (cache) are
+        returned before admission.
+        """
+        known = self.provider.lookup(text, src_lang, tgt_lang)
+        if known is not None:
+            return known
+        stream = on_progress is not None and self.stream_interval_s > 0
+        flight_key = (text, src_lang, tgt_lang, prefix)
+        flight = self._flights.get(flight_key)
+        if flight is None:
+            if stream:
+                listeners: list[ProgressCallback] = []
+                coro = self._stream_provider(text, src_lang, tgt_lang, listeners)
+            else:
+                listeners = None
+                coro = self._call_provider(text, src_lang, tgt_lang, prefix)
+            flight = _Flight(asyncio.create_task(coro), listeners=listeners)
+            self._flights[flight_key] = flight
+            flight.task.add_done_callback(
+                lambda task, k=flight_key, f=flight: self._end_flight(k, f)
+            )
+        else:
+            self.stats.singleflight_hits += 1
+        if stream and flight.listeners is not None:
+            flight.listeners.append(on_progress)
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+            if stream and flight.listeners is not None:
+                flight.listeners.remove(on_progress)
+
+    def _end_flight(self, flight_key: tuple[str, str | None, str, str], flight: _Flight) -> None:
+        if self._flights.get(flight_key) is flight:
+            del self._flights[flight_key]
+        if not flight.task.cancelled():
+            flight.task.exception()  # retrieved by waiters, or nobody is left to care
+
+    async def _admit(self, tokens: int, limiter: ConcurrencyLimiter) -> None:
+        # Routed pools are bounded by their own cap, not the global budget
+        if self._bucket is not None and limiter is self._limiter:
+            await self._bucket.acquire(tokens)
+
+    @asynccontextmanager
+    async def _admitted(self, tokens: int, limiter: ConcurrencyLimiter) -> AsyncIterator[None]:
+        """Token budget, then a concurrency slot. A request cancelled while it
+        waits for either counts as `cancelled_queued`, not `cancelled`."""
+        queued = True
+        try:
+            await self._admit(tokens, limiter)
+            async with limiter.slot(tokens):
+                queued = False
+                yield
+        except asyncio.CancelledError:
+            if queued:
+                self.stats.cancelled_queued += 1
+            raise
+
+    def _limiter_for(self, src_lang: str | None, tgt_lang: str) -> ConcurrencyLimiter:
+        """The routed pool of this pair, or the global limiter."""
+        if self._route_limiter is not None:
+            routed = self._route_limiter(src_lang, tgt_lang)
+            if routed is not None:
+                return routed
+        return self._limiter
+
+    async def _call_provider(
+        self, text: str, src_lang: str | None, tgt_lang: str, prefix: str = ""
+    ) -> str:
+        # A prefilled prefix is not decoded
+        tokens = request_tokens(text) - est_tokens(len(prefix))
+        async with self._admitted(tokens, self._limiter_for(src_lang, tgt_lang)):
             self.inflight += 1
             try:
+                if prefix:
+                    return await self.provider.translate_continue(text, src_lang, tgt_lang, prefix)
+                if self._batcher is not None:
+                    return await self._batcher.submit(text, src_lang, tgt_lang)
                 return await self.provider.translate(text, src_lang, tgt_lang)
+            except asyncio.CancelledError:
+                self.stats.cancelled += 1
+                raise
+            finally:
+                self.inflight -= 1
+
+    async def _stream_provider(
+        self,
+        text: str,
+        src_lang: str | None,
+        tgt_lang: str,
+        listeners: list[ProgressCallback],
+    ) -> str:
+        async with self._admitted(request_tokens(text), self._limiter_for(src_lang, tgt_lang)):
+            self.inflight += 1
+            self.stats.streams += 1
+            try:
+                acc = ""
+                untranslated = False
+                shown = ""
+                last_emit = float("-inf")
+                async for piece in self.provider.translate_stream(text, src_lang, tgt_lang):
+                    # Words are known complete once more text follows them:
+                    # the last piece of the stream is never a progress update.
+                    cut = max(acc.rfind(" "), acc.rfind("\n"))
+                    partial = acc[:cut].strip() if cut > 0 else ""
+                    now = time.monotonic()
+                    if (
+                        len(partial) > len(shown)
+                        and now - last_emit >= self.stream_interval_s
+                    ):
+                        shown, last_emit = partial, now
+                        self.stats.stream_updates += 1
+                        for listener in list(listeners):
+                            try:
+                                await listener(partial)
+                            except Exception:
+                                logger.exception("[scheduler] stream progress callback failed")
+                    acc += piece
+                    untranslated = untranslated or isinstance(piece, UntranslatedText)
+                return UntranslatedText(acc.strip()) if untranslated else acc.strip()
+            except asyncio.CancelledError:
+                self.stats.cancelled += 1
+                raise
             finally:
                 self.inflight -= 1
 
-    async def freeze(self, key: str, text: str, src_lang: str | None, tgt_lang: str) -> str:
-        """Translate a frozen sentence. FIFO per key, bounded globally."""
+    async def freeze(
+        self,
+        key: str,
+        text: str,
+        src_lang: str | None,
+        tgt_lang: str,
+        on_progress: ProgressCallback | None = None,
+    ) -> str:
+        """Translate a frozen sentence. FIFO per key, bounded globally.
+
+        `on_progress` receives the growing translation when streaming is
+        enabled; it is not called for cached or whole answers.
+        """
         lock = self._key_locks.setdefault(key, asyncio.Lock())
         async with lock:
             self.stats.freezes += 1
-            return await self._translate(text, src_lang, tgt_lang)
+            return await self._translate(text, src_lang, tgt_lang, on_progress)
 
     def submit_tail(
         self,
@@ -82,12 +299,19 @@ class TranslationScheduler:
         tgt_lang: str,
         version: int,
         on_done: TailCallback,
+        prefix: str = "",
     ) -> None:
-        """Latest-wins tail translation. Never more than one in flight per key."""
+        """Latest-wins tail translation. Never more than one in flight per key.
+
+        `prefix`: known start of the translation, prefilled (not decoded).
+        """
         slot = self._tails.setdefault(key, _TailSlot())
         if slot.pending is not None:
             self.stats.tail_superseded += 1
-        slot.pending = (text, src_lang, tgt_lang, version, on_done)
+        if slot.call is not None and not slot.call.done() and not slot.call.cancelling():
+            slot.call.cancel()  # superseded: its result would be dropped as stale
+            self.stats.tail_superseded += 1
+        slot.pending = (text, src_lang, tgt_lang, version, on_done, prefix)
         if slot.runner is None or slot.runner.done():
             slot.runner = asyncio.create_task(self._run_tail(key, slot))
 
@@ -100,16 +324,24 @@ class TranslationScheduler:
                     await asyncio.sleep(wait)
                 if slot.pending is None:
                     return
-                text, src, tgt, version, on_done = slot.pending
+                text, src, tgt, version, on_done, prefix = slot.pending
                 slot.pending = None
                 slot.last_fire = loop.time()
                 self.stats.tails += 1
+                slot.call = asyncio.ensure_future(self._translate(text, src, tgt, prefix=prefix))
+                slot.call_text = text
                 try:
-                    translated = await self._translate(text, src, tgt)
+                    translated = await slot.call
+                except asyncio.CancelledError:
+                    if asyncio.current_task().cancelling():
+                        raise  # the runner itself (purge_key)
+                    continue  # the call only: superseded or cancel_key
                 except Exception:
                     self.stats.errors += 1
                     logger.exception("[scheduler] tail translation failed key=%s", key)
                     continue
+                finally:
+                    slot.call = None
                 try:
                     await on_done(version, text, translated)
                 except Exception:
@@ -118,10 +350,34 @@ class TranslationScheduler:
             pass
 
     def cancel_key(self, key: str) -> None:
-        """Drop any pending (not yet fired) tail for this key."""
+        """Drop the pending tail of this key and abort the in-flight one."""
         slot = self._tails.get(key)
         if slot is not None:
             slot.pending = None
+            if slot.call is not None and not slot.call.done():
+                slot.call.cancel()
+
+    def drop_pending_tail(self, key: str) -> None:
+        """Drop the pending tail of this key; the in-flight one runs on."""
+        slot = self._tails.get(key)
+        if slot is not None:
+            slot.pending = None
+
+    async def settle_tail(self, key: str, text: str) -> None:
+        """Wait for the in-flight tail if it translates `text` (word-wise), else abort it.
+
+        Once this returns, a translation of `text` by the tail has reached
+        its `on_done`, or no tail work is left for the key.
+        """
+        slot = self._tails.get(key)
+        if slot is None or slot.call is None or slot.call.done():
+            return
+        if " ".join(slot.call_text.split()) != " ".join(text.split()):
+            self.cancel_key(key)
+            return
+        slot.pending = None
+        if slot.runner is not None:
+            await asyncio.wait({slot.runner})
 
     def purge_key(self, key: str) -> None:
         """Forget all per-key structures (segment/session over)."""
@@ -134,10 +390,24 @@ class TranslationScheduler:
             self._key_locks.pop(key, None)
 
     def snapshot(self) -> dict[str, Any]:
-        return {
+        snap = {
             "inflight": self.inflight,
+            "limit": self._limiter.limit,
             "freezes": self.stats.freezes,
             "tails": self.stats.tails,
             "tail_superseded": self.stats.tail_superseded,
             "errors": self.stats.errors,
+            "singleflight_hits": self.stats.singleflight_hits,
+            "cancelled": self.stats.cancelled,
+            "cancelled_queued": self.stats.cancelled_queued,
         }
+        if self.stream_interval_s > 0:
+            snap["streams"] = self.stats.streams
+            snap["stream_updates"] = self.stats.stream_updates
+        if self._batcher is not None:
+            snap.update(self._batcher.snapshot())
+        if self._bucket is not None:
+            bucket = self._bucket.snapshot()
+            snap["budget_throttled"] = bucket["throttled"]
+            snap["budget_wait_s"] = bucket["wait_s"]
+        return snap
@@ -0,0 +1,320 @@
+"""Persistent translation memory: SQLite (WAL) store for warm restarts.
+
+Second tier behind the in-memory `TranslationCache`: translations survive a
+restart of the service, so a redeploy during live sessions doesn't send a
+burst of retranslations to the backend.
+
+The event loop never touches the disk. SQLite runs on two dedicated worker
+threads, each with its own connection (connections are thread-affine):
+
+- the database is opened lazily, on first use;
+- reads are awaited through the reader thread (an indexed point lookup). WAL
+  readers don't wait for the writer: a lookup never queues behind a flush
+  or a compaction;
+- writes are buffered in memory and flushed in batches on the writer
+  thread, one transaction per flush, fire-and-forget from the caller's
+  point of view. Buffered and in-flight writes are served from memory;
+- reads served by either tier (`touch`) are buffered the same way and
+  flushed as `hits`/`last_used` updates: compaction keeps what is served,
+  and the warm load starts from what is read most;
+- past `max_entries`, the least recently used rows are deleted and the WAL is
+  checkpointed (compaction), so the file stays bounded.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from translator.cache import CacheKey
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    text TEXT NOT NULL,
+    src TEXT NOT NULL,
+    tgt TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 1,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (text, src, tgt)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used);
+"""
+
+_UPSERT = """
+INSERT INTO translations (text, src, tgt, translation, last_used) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (text, src, tgt) DO UPDATE SET
+    translation = excluded.translation,
+    hits = hits + 1,
+    last_used = excluded.last_used
+"""
+
+_TOUCH = """
+UPDATE translations SET hits = hits + ?, last_used = MAX(last_used, ?)
+WHERE text = ? AND src = ? AND tgt = ?
+"""
+
+
+@dataclass
+class StoreStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    compactions: int = 0
+    errors: int = 0
+
+
+class TranslationStore:
+    """SQLite-backed translation memory, accessed off the event loop.
+
+    Args:
+        path: Database file (created if missing, parent directory included).
+        max_entries: Row budget; compaction trims back to it.
+        flush_interval_s: Max delay before buffered writes hit the disk.
+        flush_batch: Flush immediately once this many writes are buffered.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_entries: int = 200000,
+        flush_interval_s: float = 1.0,
+        flush_batch: int = 256,
+    ) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.flush_interval_s = flush_interval_s
+        self.flush_batch = flush_batch
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="translation-store")
+        self._reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="translation-store-read")
+        self._conn: sqlite3.Connection | None = None  # writer thread only
+        self._read_conn: sqlite3.Connection | None = None  # reader thread only
+        self._rows = 0  # writer thread only
+        self._pending: dict[CacheKey, tuple[str, float]] = {}
+        self._writing: list[dict[CacheKey, tuple[str, float]]] = []  # flushes in flight
+        self._touched: dict[CacheKey, tuple[int, float]] = {}  # reads: count, last
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Future] = set()
+        self._closed = False
+        self.stats = StoreStats()
+
+    # --------------------------------------------------------- worker threads
+
+    def _open(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, isolation_level=None, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = self._open()
+            self._rows = conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            self._conn = conn
+            logger.info("[store] opened %s (%d translations)", self.path, self._rows)
+        return self._conn
+
+    def _read_db(self) -> sqlite3.Connection:
+        if self._read_conn is None:
+            self._read_conn = self._open()
+        return self._read_conn
+
+    def _get_sync(self, keys: list[CacheKey]) -> list[str | None]:
+        db = self._read_db()
+        out: list[str | None] = []
+        for text, src, tgt in keys:
+            row = db.execute(
+                "SELECT translation FROM translations WHERE text = ? AND src = ? AND tgt = ?",
+                (text, src, tgt),
+            ).fetchone()
+            out.append(row[0] if row else None)
+        return out
+
+    def _write_sync(
+        self,
+        rows: list[tuple[str, str, str, str, float]],
+        touches: list[tuple[int, float, str, str, str]],
+    ) -> None:
+        db = self._db()
+        db.execute("BEGIN")
+        try:
+            db.executemany(_UPSERT, rows)
+            db.executemany(_TOUCH, touches)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        # Upserts of existing keys don't grow the table: recount only when
+        # the estimate says compaction may be due.
+        self._rows += len(rows)
+        if self._rows > self.max_entries:
+            self._rows = db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            if self._rows > self.max_entries:
+                self._compact_sync(db)
+
+    def _compact_sync(self, db: sqlite3.Connection) -> None:
+        # Trim 10% below the budget so compaction doesn't run on every flush
+        target = int(self.max_entries * 0.9)
+        db.execute(
+            "DELETE FROM translations WHERE (text, src, tgt) IN ("
+            " SELECT text, src, tgt FROM translations ORDER BY last_used ASC LIMIT ?)",
+            (self._rows - target,),
+        )
+        db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        logger.info("[store] compacted %d -> %d translations", self._rows, target)
+        self._rows = target
+        self.stats.compactions += 1
+
+    def _load_sync(self, limit: int) -> list[tuple[CacheKey, str]]:
+        rows = self._read_db().execute(
+            "SELECT text, src, tgt, translation FROM translations "
+            "ORDER BY hits DESC, last_used DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [((text, src, tgt), translation) for text, src, tgt, translation in rows]
+
+    def _close_sync(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _close_read_sync(self) -> None:
+        if self._read_conn is not None:
+            self._read_conn.close()
+            self._read_conn = None
+
+    # ------------------------------------------------------------- event loop
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _read(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._reader, fn, *args)
+
+    def _buffered(self, key: CacheKey) -> str | None:
+        """A write not yet committed: buffered, or being flushed."""
+        for batch in (self._pending, *reversed(self._writing)):
+            entry = batch.get(key)
+            if entry is not None:
+                return entry[0]
+        return None
+
+    async def get_many(self, keys: list[CacheKey]) -> list[str | None]:
+        """Stored translations for `keys` (None = unknown). Never raises."""
+        found: list[str | None] = []
+        missing: list[int] = []
+        for i, key in enumerate(keys):
+            buffered = self._buffered(key)
+            found.append(buffered)
+            if buffered is None:
+                missing.append(i)
+        if missing and not self._closed:
+            try:
+                stored = await self._read(self._get_sync, [keys[i] for i in missing])
+            except Exception:
+                self.stats.errors += 1
+                logger.exception("[store] read failed")
+                stored = [None] * len(missing)
+            for i, value in zip(missing, stored):
+                found[i] = value
+        for key, value in zip(keys, found):
+            if value is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+                self.touch(key)
+        return found
+
+    async def get(self, key: CacheKey) -> str | None:
+        return (await self.get_many([key]))[0]
+
+    async def load(self, limit: int) -> list[tuple[CacheKey, str]]:
+        """The `limit` most used translations, to warm the memory tier."""
+        if limit <= 0 or self._closed:
+            return []
+        try:
+            return await self._read(self._load_sync, limit)
+        except Exception:
+            self.stats.errors += 1
+            logger.exception("[store] warm load failed")
+            return []
+
+    def put(self, key: CacheKey, value: str) -> None:
+        """Buffer a write; it reaches the disk at the next flush."""
+        if self._closed:
+            return
+        self._pending[key] = (value, time.time())
+        self._schedule_flush()
+
+    def touch(self, key: CacheKey) -> None:
+        """Record a read of `key` (any tier); it reaches the disk at the next flush."""
+        if self._closed:
+            return
+        count, _ = self._touched.get(key, (0, 0.0))
+        self._touched[key] = (count + 1, time.time())
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if len(self._pending) + len(self._touched) >= self.flush_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.flush_interval_s, self._flush
+            )
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending and not self._touched:
+            return
+        rows = [(t, s, g, value, ts) for (t, s, g), (value, ts) in self._pending.items()]
+        touches = [(n, ts, t, s, g) for (t, s, g), (n, ts) in self._touched.items()]
+        batch = self._pending
+        self._writing.append(batch)
+        self._pending = {}
+        self._touched = {}
+        fut = asyncio.ensure_future(self._run(self._write_sync, rows, touches))
+        self._flushes.add(fut)
+        fut.add_done_callback(lambda f, b=batch: self._flush_done(f, b))
+
+    def _flush_done(self, fut: asyncio.Future, batch: dict[CacheKey, tuple[str, float]]) -> None:
+        self._flushes.discard(fut)
+        self._writing.remove(batch)
+        n = len(batch)
+        if fut.cancelled():
+            return
+        if fut.exception() is not None:
+            self.stats.errors += 1
+            logger.error("[store] write of %d translations failed: %s", n, fut.exception())
+        else:
+            self.stats.writes += n
+
+    async def close(self) -> None:
+        """Flush buffered writes and close the database."""
+        if self._closed:
+            return
+        self._flush()
+        self._closed = True
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self._run(self._close_sync)
+        await self._read(self._close_read_sync)
+        self._executor.shutdown(wait=False)
+        self._reader.shutdown(wait=False)
+
+    def snapshot(self) -> dict[str, int]:
+        return {
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "writes": self.stats.writes,
+            "compactions": self.stats.compactions,
+            "errors": self.stats.errors,
+        }